@@ -1,6 +1,8 @@
 import sys
 import os
 
+import pytest
+
 
 # Определяем корневую директорию проекта
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -38,3 +40,23 @@ pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(autouse=True, scope='session')
+def metrics_dir(tmp_path_factory):
+    # Файлы метрик тестов — во временном каталоге прогона, а не в METRICS_DIR
+    from api import metrics
+    store = metrics.store
+    metrics.store = metrics.MetricsStore(
+        str(tmp_path_factory.mktemp('metrics'))
+    )
+    yield
+    metrics.store = store
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Кэши живут в памяти процесса и не очищаются вместе с базой
+    from django.core.cache import caches
+    for cache in caches.all():
+        cache.clear()
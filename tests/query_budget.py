@@ -0,0 +1,39 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def count_queries(func, *args, **kwargs):
+    """Выполняет ``func`` и возвращает число выполненных SQL-запросов."""
+    with CaptureQueriesContext(connection) as context:
+        func(*args, **kwargs)
+    return len(context.captured_queries)
+
+
+def assert_query_budget(request, add_rows, rows=(1, 10), budget=None):
+    """Проверяет, что число запросов не растет вместе с числом записей.
+
+    ``request`` выполняет запрос к эндпоинту, ``add_rows(count)`` добавляет
+    в базу ``count`` записей. Запрос выполняется после каждого наполнения;
+    число запросов должно совпадать для всех объемов данных и, если задан
+    ``budget``, не превышать его. Перед замерами выполняется пробный запрос,
+    чтобы прогреть кэши (например, кэш аутентификации).
+    """
+    request()
+    counts = []
+    added = 0
+    for total in rows:
+        add_rows(total - added)
+        added = total
+        counts.append(count_queries(request))
+
+    assert len(set(counts)) == 1, (
+        'Число SQL-запросов растет вместе с числом записей '
+        f'({dict(zip(rows, counts))}). Проверьте, что связанные объекты '
+        'загружаются через `select_related`/`prefetch_related`.'
+    )
+    if budget is not None:
+        assert counts[0] <= budget, (
+            f'Эндпоинт выполняет {counts[0]} SQL-запросов, '
+            f'допустимо не более {budget}.'
+        )
+    return counts[0]
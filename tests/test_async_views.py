@@ -0,0 +1,199 @@
+import asyncio
+import threading
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import resolve
+
+from api.views import PostViewSet
+from yatube_api.asgi import application
+
+
+async def asgi_messages(method, path, query_string='', headers=(),
+                        body=b'', on_send=None):
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query_string.encode(),
+        'headers': [
+            (b'host', b'testserver'),
+            (b'content-length', str(len(body)).encode()),
+            *headers,
+        ],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 50000),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+        if on_send is not None:
+            on_send(message)
+
+    await application(scope, receive, send)
+    return messages
+
+
+async def asgi_request(method, path, query_string='', headers=(), body=b''):
+    messages = await asgi_messages(method, path, query_string, headers, body)
+    return messages[0]['status'], b''.join(
+        message.get('body', b'') for message in messages[1:]
+    )
+
+
+def asgi_get(path, query_string=''):
+    return async_to_sync(asgi_request)('GET', path, query_string)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncViews:
+
+    @pytest.mark.parametrize('path', [
+        '/api/v1/posts/', '/api/v1/groups/',
+    ])
+    def test_read_views_are_async(self, path):
+        match = resolve(path, urlconf='yatube_api.urls_asgi')
+        assert asyncio.iscoroutinefunction(match.func), (
+            f'Под ASGI `{path}` должен обрабатываться async-представлением.'
+        )
+
+    def test_routes_follow_router(self):
+        from api.async_urls import urlpatterns
+        from api.urls import router
+        routes = [
+            (str(pattern.pattern), pattern.name, pattern.callback.actions)
+            for pattern in router.urls
+            if getattr(pattern.callback, 'actions', None)
+        ]
+        async_routes = [
+            (str(pattern.pattern), pattern.name, pattern.callback.actions)
+            for pattern in urlpatterns
+            if asyncio.iscoroutinefunction(pattern.callback)
+        ]
+        assert routes and async_routes == routes, (
+            'Асинхронные маршруты должны строиться из всех маршрутов '
+            'DefaultRouter.'
+        )
+
+    def test_same_response_as_sync(self, client, post, post_2,
+                                   comment_1_post, group_1):
+        for path, query in (
+            ('/api/v1/posts/', ''),
+            ('/api/v1/posts/', 'limit=1&offset=1'),
+            (f'/api/v1/posts/{post.id}/', ''),
+            (f'/api/v1/posts/{post.id}/comments/', ''),
+            ('/api/v1/groups/', ''),
+        ):
+            status, body = asgi_get(path, query)
+            expected = client.get(f'{path}?{query}')
+            assert status == HTTPStatus.OK
+            assert body == expected.content, (
+                f'Ответ ASGI для `{path}` должен совпадать с WSGI.'
+            )
+        status, _ = asgi_get('/api/v1/posts/100500/')
+        assert status == HTTPStatus.NOT_FOUND
+
+    def test_writes_still_work(self, token):
+        status, _ = async_to_sync(asgi_request)(
+            'POST', '/api/v1/posts/',
+            headers=[
+                (b'authorization', f'Token {token}'.encode()),
+                (b'content-type', b'application/json'),
+            ],
+            body='{"text": "Пост"}'.encode(),
+        )
+        assert status == HTTPStatus.CREATED
+
+    def test_authenticated_reads(self, user_client, token, another_user):
+        user_client.post('/api/v1/follow/',
+                         data={'following': another_user.username})
+        for path in ('/api/v1/follow/', '/api/v1/feed/'):
+            status, body = async_to_sync(asgi_request)(
+                'GET', path,
+                headers=[(b'authorization', f'Token {token}'.encode())],
+            )
+            assert status == HTTPStatus.OK
+            assert body == user_client.get(path).content
+
+    def test_reads_run_concurrently(self, post, monkeypatch):
+        # Оба запроса должны одновременно находиться внутри вьюсета;
+        # в общем потоке thread_sensitive второй ждал бы первый
+        barrier = threading.Barrier(2, timeout=5)
+        list_view = PostViewSet.list
+
+        def waiting_list(self, request, *args, **kwargs):
+            barrier.wait()
+            return list_view(self, request, *args, **kwargs)
+
+        monkeypatch.setattr(PostViewSet, 'list', waiting_list)
+
+        async def both():
+            return await asyncio.gather(
+                asgi_request('GET', '/api/v1/posts/'),
+                asgi_request('GET', '/api/v1/posts/'),
+            )
+
+        statuses = [status for status, _ in async_to_sync(both)()]
+        assert statuses == [HTTPStatus.OK, HTTPStatus.OK], (
+            'Чтения под ASGI должны выполняться параллельно.'
+        )
+
+    @pytest.mark.parametrize('query, headers', [
+        ('stream=1', ()),
+        ('', ((b'accept', b'application/x-ndjson'),)),
+    ])
+    def test_streaming(self, client, post, post_2, query, headers):
+        status, body = async_to_sync(asgi_request)(
+            'GET', '/api/v1/posts/', query, headers=headers
+        )
+        expected = client.get(
+            f'/api/v1/posts/?{query}',
+            **{f'HTTP_{name.decode().upper()}': value.decode()
+               for name, value in headers}
+        )
+        assert status == HTTPStatus.OK, (
+            'Потоковый ответ под ASGI не должен обращаться к базе в '
+            'цикле событий.'
+        )
+        assert body == b''.join(expected.streaming_content)
+
+    def test_streaming_sends_chunks(self, post, post_2, another_post,
+                                    monkeypatch):
+        # Каждая запись — отдельная порция ответа
+        monkeypatch.setattr(PostViewSet, 'stream_buffer_size', 1)
+        iter_rows = PostViewSet.iter_rows
+        read = []
+
+        def counting_rows(self, queryset):
+            for row in iter_rows(self, queryset):
+                read.append(row)
+                yield row
+
+        monkeypatch.setattr(PostViewSet, 'iter_rows', counting_rows)
+        read_before_send = []
+
+        def on_send(message):
+            if message.get('body'):
+                read_before_send.append(len(read))
+
+        messages = async_to_sync(asgi_messages)(
+            'GET', '/api/v1/posts/', 'stream=1', on_send=on_send
+        )
+        assert messages[0]['status'] == HTTPStatus.OK
+        bodies = [message for message in messages[1:] if message.get('body')]
+        assert len(bodies) == 5 and all(
+            message['more_body'] for message in bodies
+        ), 'Порции потокового ответа должны отправляться по одной.'
+        assert read_before_send == [0, 1, 2, 3, 3], (
+            'Следующая запись должна читаться после отправки предыдущей, '
+            'а не весь ответ заранее.'
+        )
@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import (
+    CachedJWTAuthentication,
+    CachedTokenAuthentication,
+    jwt_user_cache,
+    token_cache,
+)
+from tests.query_budget import count_queries
+
+
+@pytest.fixture(autouse=True)
+def cached_authentication(monkeypatch):
+    # Классы аутентификации вьюсетов вычисляются при импорте, поэтому
+    # подменяем их напрямую, как это сделала бы настройка
+    monkeypatch.setattr(APIView, 'authentication_classes', [
+        CachedTokenAuthentication,
+        CachedJWTAuthentication,
+    ])
+    token_cache.clear()
+    jwt_user_cache.clear()
+
+
+@pytest.fixture
+def jwt_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCachedAuthentication:
+    url = '/api/v1/follow/'
+
+    @pytest.mark.parametrize('client_name', ('user_client', 'jwt_client'))
+    def test_auth_lookup_cached(self, request, client_name):
+        client = request.getfixturevalue(client_name)
+        first = count_queries(client.get, self.url)
+        second = count_queries(client.get, self.url)
+        assert second == first - 1, (
+            'Повторный запрос с тем же токеном не должен обращаться к базе '
+            'для аутентификации.'
+        )
+
+    @pytest.mark.parametrize('client_name', ('user_client', 'jwt_client'))
+    def test_deactivation_invalidates(self, request, user, client_name):
+        client = request.getfixturevalue(client_name)
+        assert client.get(self.url).status_code == HTTPStatus.OK
+        user.is_active = False
+        user.save()
+        assert client.get(self.url).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Деактивированный пользователь не должен проходить '
+            'аутентификацию из кэша.'
+        )
+
+    def test_password_change_invalidates(self, user_client, user):
+        user_client.get(self.url)
+        user.set_password('new_secure_password_456')
+        user.save()
+        assert len(token_cache) == 0
+
+    def test_token_delete_invalidates(self, user_client, user):
+        assert user_client.get(self.url).status_code == HTTPStatus.OK
+        Token.objects.filter(user=user).delete()
+        assert user_client.get(self.url).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Удаленный токен не должен проходить аутентификацию из кэша.'
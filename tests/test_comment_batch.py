@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Comment
+from tests.test_indexes import list_plans
+
+
+@pytest.fixture
+def many_comments(post, another_post, user, another_user):
+    return [
+        Comment.objects.create(post=target, author=author,
+                               text=f'Комментарий {index}')
+        for index in range(4)
+        for target, author in ((post, user), (another_post, another_user))
+    ]
+
+
+def comment_ids(items):
+    return [item['id'] for item in items]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCommentBatch:
+
+    def test_latest_per_post(self, client, post, post_2, another_post,
+                             many_comments):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                f'/api/v1/comments/?posts={post.id},{another_post.id},'
+                f'{post_2.id}&limit=2'
+            )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert list(data) == [str(post.id), str(another_post.id),
+                              str(post_2.id)]
+        for target in (post, another_post):
+            expected = list(Comment.objects.filter(post=target).values_list(
+                'id', flat=True))[-2:]
+            assert comment_ids(data[str(target.id)]) == expected, (
+                'Для каждой публикации должны вернуться последние '
+                '`limit` комментариев в порядке создания.'
+            )
+        assert data[str(post_2.id)] == []
+        assert data[str(post.id)][0]['author'] == post.author.username
+        selects = [query['sql'] for query in context.captured_queries
+                   if 'posts_comment' in query['sql']]
+        assert len(selects) == 1, (
+            'Комментарии всех публикаций должны читаться одним запросом.'
+        )
+        assert 'ROW_NUMBER() OVER' in selects[0]
+
+    def test_uses_index(self, client, post, another_post, many_comments):
+        plans = list_plans(
+            client, f'/api/v1/comments/?posts={post.id},{another_post.id}'
+        )
+        assert any('comment_post_created_idx' in step
+                   for _, plan in plans for step in plan), (
+            'Окно должно читать комментарии по индексу (post, created).'
+        )
+
+    def test_matches_nested_list(self, client, post, comment_1_post,
+                                 comment_2_post):
+        batch = client.get(f'/api/v1/comments/?posts={post.id}').json()
+        nested = client.get(f'/api/v1/posts/{post.id}/comments/').json()
+        assert batch[str(post.id)] == nested, (
+            'Комментарии должны совпадать с ответом '
+            '`/posts/{id}/comments/`.'
+        )
+
+    @pytest.mark.parametrize('query', [
+        '', 'posts=', 'posts=1,abc', 'posts=1&limit=0', 'posts=1&limit=100',
+        'posts=99999999999999999999', 'posts=0', 'posts=1,-2',
+        pytest.param('posts=' + ','.join(map(str, range(1, 200))),
+                     id='too-many-posts'),
+    ])
+    def test_invalid_params(self, client, query):
+        response = client.get(f'/api/v1/comments/?{query}')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Запрос `?{query}` должен приводить к ответу 400.'
+        )
+
+    def test_read_only(self, user_client, post):
+        response = user_client.post('/api/v1/comments/',
+                                    data={'text': 'Текст', 'post': post.id})
+        assert response.status_code == HTTPStatus.METHOD_NOT_ALLOWED
@@ -0,0 +1,67 @@
+from http import HTTPStatus
+
+import pytest
+
+from posts.models import Comment, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalGet:
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/posts/',
+        '/api/v1/posts/{post.id}/',
+        '/api/v1/posts/{post.id}/comments/',
+        '/api/v1/groups/',
+    ))
+    def test_etag_not_modified(self, user_client, post, comment_1_post,
+                               group_1, url):
+        url = url.format(post=post)
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response.get('ETag')
+        assert etag and etag.startswith('"'), (
+            f'Ответ на GET-запрос к `{url}` должен содержать строгий ETag.'
+        )
+        assert response.get('Last-Modified'), (
+            f'Ответ на GET-запрос к `{url}` должен содержать Last-Modified.'
+        )
+
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'GET-запрос к `{url}` с актуальным `If-None-Match` должен '
+            'возвращать ответ со статусом 304.'
+        )
+        assert response['ETag'] == etag
+
+    def test_if_modified_since(self, user_client, post):
+        url = f'/api/v1/posts/{post.id}/'
+        last_modified = user_client.get(url)['Last-Modified']
+        response = user_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_etag_changes_on_update(self, user_client, post):
+        url = f'/api/v1/posts/{post.id}/'
+        etag = user_client.get(url)['ETag']
+        user_client.patch(url, data={'text': 'Измененный текст'})
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'После изменения публикации прежний ETag не должен совпадать.'
+        )
+
+    def test_list_etag_changes_on_delete(self, user_client, post,
+                                         comment_1_post, comment_2_post):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        etag = user_client.get(url)['ETag']
+        Comment.objects.filter(pk=comment_1_post.pk).delete()
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Удаление комментария должно менять ETag списка.'
+        )
+
+    def test_list_etag_changes_on_create(self, user_client, user, post):
+        url = '/api/v1/posts/'
+        etag = user_client.get(url)['ETag']
+        Post.objects.create(text='Новая публикация', author=user)
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
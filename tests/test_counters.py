@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from posts.models import Comment, Follow, Post, UserStats
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCounters:
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_comment_count(self, user_client, post):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        response = user_client.post(url, data={'text': 'Комментарий'})
+        user_client.post(url, data={'text': 'Еще комментарий'})
+        post.refresh_from_db()
+        assert post.comment_count == 2, (
+            'Создание комментария должно увеличивать `comment_count`.'
+        )
+
+        user_client.delete(f'{url}{response.json()["id"]}/')
+        data = user_client.get(f'/api/v1/posts/{post.id}/').json()
+        assert data['comment_count'] == 1, (
+            'Удаление комментария должно уменьшать `comment_count`, '
+            'а ответ публикации — содержать актуальное значение.'
+        )
+
+    def test_user_counters(self, user_client, user, another_user):
+        user_client.post('/api/v1/posts/', data={'text': 'Пост'})
+        user_client.post('/api/v1/follow/',
+                         data={'following': another_user.username})
+        assert self.stats(user).posts_count == 1
+        assert self.stats(user).following_count == 1
+        assert self.stats(another_user).followers_count == 1, (
+            'Подписка должна увеличивать счетчик подписчиков автора.'
+        )
+
+        Follow.objects.get(user=user).delete()
+        Post.objects.filter(author=user).delete()
+        assert self.stats(user).posts_count == 0
+        assert self.stats(user).following_count == 0
+        assert self.stats(another_user).followers_count == 0, (
+            'Удаление подписки должно уменьшать счетчики.'
+        )
+
+    def test_user_endpoint(self, client, user, post, another_user):
+        Follow.objects.create(user=another_user, following=user)
+        response = client.get(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert (
+            data['posts_count'],
+            data['followers_count'],
+            data['following_count'],
+        ) == (1, 1, 0), (
+            'Профиль пользователя должен содержать счетчики публикаций, '
+            'подписчиков и подписок.'
+        )
+
+    def test_reconcile_counters(self, user, post, another_user):
+        Comment.objects.bulk_create([
+            Comment(author=user, post=post, text='Без сигналов')
+            for _ in range(3)
+        ])
+        UserStats.objects.filter(user=user).update(posts_count=7)
+        UserStats.objects.filter(user=another_user).delete()
+        Follow.objects.bulk_create([
+            Follow(user=another_user, following=user)
+        ])
+
+        call_command('reconcile_counters')
+
+        post.refresh_from_db()
+        assert post.comment_count == 3, (
+            'Команда `reconcile_counters` должна пересчитать '
+            '`comment_count`.'
+        )
+        assert self.stats(user).posts_count == 1
+        assert self.stats(user).followers_count == 1
+        assert self.stats(another_user).following_count == 1, (
+            'Команда `reconcile_counters` должна создавать недостающие '
+            'счетчики пользователей.'
+        )
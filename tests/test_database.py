@@ -0,0 +1,81 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import OperationalError, connections
+
+from api import database
+from api.views import PostViewSet
+from posts.models import Post
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(database, 'DATABASE_LOCK_BACKOFF', 0)
+
+
+def flaky(failures, error='database is locked'):
+    calls = []
+
+    def func():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise OperationalError(error)
+        return len(calls)
+    return func, calls
+
+
+@pytest.mark.django_db(transaction=True)
+class TestDatabaseProfile:
+
+    def test_pragmas_on_new_connection(self, monkeypatch):
+        monkeypatch.setattr(database, 'SQLITE_PRAGMAS', {
+            'cache_size': -1234, 'temp_store': 'MEMORY',
+        })
+        connection = connections.create_connection('default')
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA cache_size')
+                cache_size, = cursor.fetchone()
+                cursor.execute('PRAGMA temp_store')
+                temp_store, = cursor.fetchone()
+        finally:
+            connection.close()
+        assert (cache_size, temp_store) == (-1234, 2), (
+            'PRAGMA из `SQLITE_PRAGMAS` должны выполняться при открытии '
+            'соединения.'
+        )
+
+    def test_retry_on_lock(self, no_backoff):
+        func, calls = flaky(2)
+        assert database.run_with_retry(func) == 3, (
+            'Запись должна повторяться при блокировке базы.'
+        )
+
+        func, calls = flaky(10)
+        with pytest.raises(OperationalError):
+            database.run_with_retry(func)
+        assert len(calls) == database.DATABASE_LOCK_RETRIES + 1
+
+        func, calls = flaky(1, error='no such table: posts_post')
+        with pytest.raises(OperationalError):
+            database.run_with_retry(func)
+        assert len(calls) == 1, 'Прочие ошибки базы не повторяются.'
+
+    def test_viewset_create_retried(self, user_client, monkeypatch,
+                                    no_backoff):
+        perform_create = PostViewSet.perform_create
+        calls = []
+
+        def locked_once(self, serializer):
+            perform_create(self, serializer)
+            calls.append(1)
+            if len(calls) == 1:
+                # Публикация уже записана: откат должен ее убрать
+                raise OperationalError('database is locked')
+
+        monkeypatch.setattr(PostViewSet, 'perform_create', locked_once)
+        response = user_client.post('/api/v1/posts/', data={'text': 'Пост'})
+        assert response.status_code == HTTPStatus.CREATED
+        assert Post.objects.count() == 1, (
+            'Повтор записи после блокировки не должен создавать дубликаты.'
+        )
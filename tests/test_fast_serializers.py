@@ -0,0 +1,53 @@
+import pytest
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from api.fast_serializers import FastListSerializer, build_plan
+from api.serializers import CommentSerializer, PostSerializer
+from posts.models import Comment, Post
+
+
+def render_both(serializer_class, queryset):
+    request = APIRequestFactory().get('/api/v1/posts/')
+    context = {'request': request}
+    fast = serializer_class(queryset, many=True, context=context)
+    assert isinstance(fast, FastListSerializer)
+    assert build_plan(fast.child) is not None, (
+        'Все поля сериализатора должны поддерживаться быстрым путем.'
+    )
+    regular = serializers.ListSerializer(
+        queryset, child=serializer_class(), context=context
+    )
+    renderer = JSONRenderer()
+    return renderer.render(fast.data), renderer.render(regular.data)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFastSerializers:
+
+    @pytest.mark.parametrize('evaluate', (False, True))
+    def test_posts_identical(self, post, post_2, another_post, evaluate):
+        Post.objects.filter(pk=post.pk).update(
+            image_variants={'thumb': 'posts/variants/1/thumb.jpg'}
+        )
+        queryset = Post.objects.select_related('author', 'group')
+        if evaluate:
+            queryset = list(queryset)
+        fast, regular = render_both(PostSerializer, queryset)
+        assert fast == regular, (
+            'Быстрая сериализация публикаций должна давать тот же JSON, '
+            'что и обычный сериализатор.'
+        )
+
+    @pytest.mark.parametrize('evaluate', (False, True))
+    def test_comments_identical(self, comment_1_post, comment_2_post,
+                                comment_1_another_post, evaluate):
+        queryset = Comment.objects.select_related('author')
+        if evaluate:
+            queryset = list(queryset)
+        fast, regular = render_both(CommentSerializer, queryset)
+        assert fast == regular, (
+            'Быстрая сериализация комментариев должна давать тот же JSON, '
+            'что и обычный сериализатор.'
+        )
@@ -0,0 +1,76 @@
+from http import HTTPStatus
+
+import pytest
+
+from posts import feed
+from posts.models import FeedEntry, Follow, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFeedAPI:
+    url = '/api/v1/feed/'
+
+    def follow(self, client, author):
+        response = client.post('/api/v1/follow/',
+                               data={'following': author.username})
+        assert response.status_code == HTTPStatus.CREATED
+
+    def test_feed_not_auth(self, client):
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            f'GET-запрос неавторизованного пользователя к `{self.url}` '
+            'должен возвращать ответ со статусом 401.'
+        )
+
+    def test_follow_backfills_feed(self, user_client, user, another_post):
+        self.follow(user_client, another_post.author)
+
+        response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [item['id'] for item in data['results']] == [
+            another_post.id
+        ], (
+            'После подписки в ленте должны появиться публикации автора.'
+        )
+
+    def test_new_post_fans_out(self, user_client, user, another_user,
+                               another_post):
+        self.follow(user_client, another_user)
+        new_post = Post.objects.create(text='Новая', author=another_user)
+        feed.fan_out_post(new_post)
+        # Собственные публикации и публикации чужих авторов в ленту
+        # не попадают
+        Post.objects.create(text='Своя', author=user)
+
+        data = user_client.get(self.url).json()
+        assert [item['id'] for item in data['results']] == [
+            new_post.id, another_post.id
+        ], 'Лента должна содержать публикации авторов из подписок.'
+
+    def test_create_post_via_api_fans_out(self, user_client, user,
+                                          another_user):
+        Follow.objects.create(user=another_user, following=user)
+        response = user_client.post('/api/v1/posts/', data={'text': 'Пост'})
+        assert FeedEntry.objects.filter(
+            user=another_user, post_id=response.json()['id']
+        ).exists(), (
+            'Новая публикация должна попадать в ленты подписчиков автора.'
+        )
+
+    def test_pull_author_feed(self, user_client, user, another_user,
+                              monkeypatch):
+        monkeypatch.setattr(feed, 'FEED_FANOUT_LIMIT', 0)
+        self.follow(user_client, another_user)
+        new_post = Post.objects.create(text='Новая', author=another_user)
+        feed.fan_out_post(new_post)
+        assert not FeedEntry.objects.filter(post=new_post).exists(), (
+            'Публикации авторов сверх порога подписчиков не должны '
+            'раскладываться при записи.'
+        )
+
+        data = user_client.get(self.url).json()
+        assert [item['id'] for item in data['results']] == [new_post.id], (
+            'Публикации авторов с fan-out-on-read должны появляться в ленте '
+            'при чтении.'
+        )
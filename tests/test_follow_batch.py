@@ -0,0 +1,122 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts import follows
+from posts.models import FeedEntry, Follow, UserStats
+
+
+@pytest.fixture(params=['returning', 'orm'])
+def follow_backend(request, monkeypatch):
+    if request.param == 'orm':
+        monkeypatch.setattr(follows, '_returning_supported', lambda: False)
+    return request.param
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFollowWrites:
+    url = '/api/v1/follow/'
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_create_single_insert(self, user_client, another_user):
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                self.url, data={'following': another_user.username}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        follow_queries = [
+            query['sql'] for query in context.captured_queries
+            if 'posts_follow' in query['sql']
+            and not query['sql'].startswith('UPDATE')
+        ]
+        assert follow_queries[0].startswith('INSERT'), (
+            'Подписка должна создаваться без предварительных проверок '
+            'существования.'
+        )
+        assert self.stats(another_user).followers_count == 1
+
+    def test_create_errors(self, user_client, user, another_user):
+        user_client.post(self.url, data={'following': another_user.username})
+        for data in (
+            {'following': another_user.username},
+            {'following': user.username},
+            {'following': 'nobody'},
+        ):
+            response = user_client.post(self.url, data=data)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Повторная подписка, подписка на себя и на несуществующего '
+                'пользователя должны возвращать ответ со статусом 400.'
+            )
+        assert Follow.objects.count() == 1
+
+    @pytest.mark.parametrize('body', ['[]', '["bob"]', '"bob"', '1'])
+    def test_create_not_object(self, user_client, another_user, body):
+        response = user_client.post(self.url, data=body,
+                                    content_type='application/json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Тело запроса не в виде объекта должно приводить к ответу 400.'
+        )
+        assert Follow.objects.count() == 0
+
+    def test_delete(self, user_client, user, another_user, another_post,
+                    follow_backend):
+        user_client.post(self.url, data={'following': another_user.username})
+        assert FeedEntry.objects.filter(user=user).exists()
+
+        url = f'{self.url}{another_user.username}/'
+        response = user_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT, (
+            f'DELETE-запрос к `{url}` должен удалять подписку.'
+        )
+        assert not Follow.objects.exists()
+        assert not FeedEntry.objects.filter(user=user).exists(), (
+            'После отписки публикации автора должны пропасть из ленты.'
+        )
+        assert self.stats(user).following_count == 0
+        assert self.stats(another_user).followers_count == 0
+        assert user_client.delete(url).status_code == HTTPStatus.NOT_FOUND
+
+    def test_batch(self, user_client, user, another_user,
+                   django_user_model, follow_backend):
+        authors = [
+            django_user_model.objects.create_user(username=f'author_{index}')
+            for index in range(3)
+        ]
+        usernames = [author.username for author in authors]
+        Follow.objects.create(user=user, following=authors[0])
+
+        response = user_client.post(f'{self.url}batch/', data={
+            'follow': [*usernames, user.username, 'nobody'],
+            'unfollow': [another_user.username],
+        }, format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'followed': 2, 'unfollowed': 0}, (
+            'Пакетная подписка должна пропускать существующие подписки, '
+            'себя и несуществующих пользователей.'
+        )
+        assert self.stats(user).following_count == 3
+
+        response = user_client.post(f'{self.url}batch/', data={
+            'unfollow': usernames[:2],
+        }, format='json')
+        assert response.json() == {'followed': 0, 'unfollowed': 2}
+        assert list(
+            Follow.objects.values_list('following__username', flat=True)
+        ) == usernames[2:]
+        assert self.stats(user).following_count == 1
+        assert self.stats(authors[0]).followers_count == 0
+
+    def test_batch_limit(self, user_client, settings):
+        response = user_client.post(f'{self.url}batch/', data={
+            'follow': [f'user_{index}' for index in range(101)],
+        }, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Число имен в пакетном запросе должно быть ограничено.'
+        )
+        response = user_client.post(f'{self.url}batch/', data={},
+                                    format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
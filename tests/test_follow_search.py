@@ -0,0 +1,57 @@
+import pytest
+from django.core.management import call_command
+
+from posts import user_search
+from posts.models import Follow, UserSearchName
+
+
+@pytest.fixture
+def authors(user, django_user_model):
+    names = ('Alice', 'alicia', 'Bob', 'malice', 'Борис')
+    authors = [
+        django_user_model.objects.create_user(username=name)
+        for name in names
+    ]
+    Follow.objects.bulk_create(
+        [Follow(user=user, following=author) for author in authors]
+    )
+    return authors
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFollowSearch:
+    url = '/api/v1/follow/'
+
+    def search(self, client, query):
+        response = client.get(self.url, data={'search': query})
+        return sorted(item['following'] for item in response.json())
+
+    def test_prefix_search(self, user_client, authors):
+        assert self.search(user_client, 'ali') == ['Alice', 'alicia'], (
+            'Поиск подписок должен находить авторов по началу имени '
+            'без учета регистра.'
+        )
+        assert self.search(user_client, 'бор') == ['Борис']
+        assert self.search(user_client, 'lice') == [], (
+            'Без таблицы триграмм поиск выполняется только по префиксу.'
+        )
+
+    def test_trigram_search(self, user_client, authors, monkeypatch):
+        monkeypatch.setattr(user_search, 'FOLLOW_SEARCH_TRIGRAMS', True)
+        call_command('rebuild_username_index')
+        assert self.search(user_client, 'lice') == ['Alice', 'malice'], (
+            'С таблицей триграмм поиск должен находить имя по подстроке.'
+        )
+        assert self.search(user_client, 'ab') == [], (
+            'Короткие запросы ищутся по префиксу.'
+        )
+
+    def test_username_change_reindexes(self, user_client, authors):
+        author = authors[2]
+        author.username = 'Robert'
+        author.save()
+        assert self.search(user_client, 'rob') == ['Robert'], (
+            'Индекс имен должен обновляться при смене имени пользователя.'
+        )
+        author.save(update_fields=['last_login'])
+        assert UserSearchName.objects.get(user=author).name == 'robert'
@@ -0,0 +1,70 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from posts import images
+from posts.imaging import render_variants
+from posts.models import Post
+
+
+def make_jpeg(size=(1600, 1200)):
+    exif = Image.Exif()
+    exif[0x010F] = 'Камера'  # Make
+    exif[0x0112] = 6  # Orientation: поворот на 90°
+    buffer = BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, 'JPEG', exif=exif)
+    return buffer.getvalue()
+
+
+def test_render_variants_strips_metadata():
+    variants = render_variants(make_jpeg())
+    assert set(variants) == {'thumb', 'medium', 'webp'}
+    for name, (_, content) in variants.items():
+        with Image.open(BytesIO(content)) as image:
+            assert max(image.size) <= 1080
+            assert not image.getexif(), (
+                f'Вариант `{name}` не должен содержать метаданных EXIF.'
+            )
+    with Image.open(BytesIO(variants['thumb'][1])) as image:
+        assert image.size == (240, 320), (
+            'Изображение должно поворачиваться по EXIF-ориентации.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImagePipeline:
+
+    @pytest.fixture(autouse=True)
+    def media_root(self, settings, tmp_path, monkeypatch):
+        settings.MEDIA_ROOT = tmp_path
+        monkeypatch.setattr(images, 'IMAGE_PROCESSING_ASYNC', False)
+
+    def test_upload_builds_variants(self, user_client):
+        upload = SimpleUploadedFile(
+            'photo.jpg', make_jpeg(), content_type='image/jpeg'
+        )
+        response = user_client.post(
+            '/api/v1/posts/', data={'text': 'С фото', 'image': upload}
+        )
+        assert response.status_code == 201
+        post = Post.objects.get(pk=response.json()['id'])
+        assert set(post.image_variants) == {'thumb', 'medium', 'webp'}
+
+        data = user_client.get(f'/api/v1/posts/{post.id}/').json()
+        assert data['image_variants']['webp'].startswith('http'), (
+            'Ответ должен содержать абсолютные ссылки на варианты '
+            'изображения.'
+        )
+
+    def test_replaced_image_is_not_overwritten(self, user, tmp_path):
+        post = Post.objects.create(text='Текст', author=user,
+                                   image='posts/new.jpg')
+        images._store_variants(post.pk, 'posts/old.jpg',
+                               render_variants(make_jpeg()))
+        post.refresh_from_db()
+        assert post.image_variants == {}, (
+            'Результат обработки устаревшего изображения не должен '
+            'сохраняться.'
+        )
@@ -0,0 +1,94 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+from posts.models import Comment, Post
+
+# Таблицы, которые должны читаться только по индексу
+TABLES = ('posts_post', 'posts_comment', 'posts_follow', 'posts_feedentry')
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+
+def query_plan(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def list_plans(client, url):
+    queries = []
+
+    def capture(execute, sql, params, many, context):
+        queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(capture):
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return [
+        (sql, query_plan(sql, params)) for sql, params in queries
+        if sql.startswith('SELECT')
+        and any(f'"{table}"' in sql for table in TABLES)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestIndexes:
+
+    @pytest.mark.parametrize('query', [
+        '', '?limit=2', '?limit=2&offset=1', '?page_size=2'
+    ])
+    def test_post_list_uses_index(self, client, post, post_2,
+                                  another_post, query):
+        plans = list_plans(client, f'/api/v1/posts/{query}')
+        assert plans
+        for sql, plan in plans:
+            assert not any(FULL_SCAN.match(step) for step in plan), (
+                f'Запрос `{sql}` должен читать публикации по индексу, '
+                f'план: {plan}'
+            )
+            if 'ORDER BY' in sql:
+                assert not any('TEMP B-TREE' in step for step in plan), (
+                    'Сортировка публикаций должна идти по индексу.'
+                )
+
+    @pytest.mark.parametrize('query', ['', '?limit=1', '?page_size=1'])
+    def test_comment_list_uses_index(self, client, post, comment_1_post,
+                                     comment_2_post, query):
+        plans = list_plans(client, f'/api/v1/posts/{post.id}/comments/'
+                                   f'{query}')
+        assert plans
+        for sql, plan in plans:
+            assert any('comment_post_created_idx' in step
+                       for step in plan), (
+                f'Комментарии должны выбираться по индексу (post, created), '
+                f'план: {plan}'
+            )
+            assert not any('TEMP B-TREE' in step for step in plan)
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/follow/', '/api/v1/follow/?page_size=1',
+        '/api/v1/feed/?page_size=1',
+    ])
+    def test_user_lists_use_index(self, user_client, user, another_user,
+                                  another_post, url):
+        user_client.post('/api/v1/follow/',
+                         data={'following': another_user.username})
+        for sql, plan in list_plans(user_client, url):
+            assert not any(FULL_SCAN.match(step) for step in plan), (
+                f'Запрос `{sql}` не должен читать всю таблицу, план: {plan}'
+            )
+
+    def test_default_ordering(self, post, post_2, comment_1_post,
+                              comment_2_post):
+        # Даты совпадают: порядок задает id
+        Post.objects.update(pub_date=post.pub_date)
+        Comment.objects.update(created=comment_1_post.created)
+        assert list(Post.objects.values_list('id', flat=True)) == [
+            post_2.id, post.id
+        ], 'Публикации должны идти от новых к старым, затем по id.'
+        assert list(Comment.objects.values_list('id', flat=True)) == [
+            comment_1_post.id, comment_2_post.id
+        ]
@@ -0,0 +1,88 @@
+import json
+import logging
+import re
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import instrumentation
+from tests.test_async_views import asgi_request
+
+
+@pytest.fixture
+def sample_all(monkeypatch):
+    monkeypatch.setattr(instrumentation, 'PERFORMANCE_SAMPLE_RATE', 1)
+
+
+def timings(response):
+    return dict(
+        re.findall(r'(\w+);dur=([\d.]+)', response['Server-Timing'])
+    )
+
+
+def log_records(caplog):
+    return [
+        json.loads(record.getMessage()) for record in caplog.records
+        if record.name == 'api.performance'
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestInstrumentation:
+
+    def test_server_timing_and_log(self, client, post, sample_all, caplog):
+        caplog.set_level(logging.INFO, logger='api.performance')
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/posts/')
+        assert response.status_code == HTTPStatus.OK
+        assert set(timings(response)) == {
+            'db', 'serialize', 'render', 'total'
+        }, 'Ответ должен содержать заголовок `Server-Timing`.'
+        assert f'"{len(context)} queries"' in response['Server-Timing']
+
+        record, = log_records(caplog)
+        assert record['view'] == 'PostViewSet.list', (
+            'В логе должно быть имя действия вьюсета.'
+        )
+        assert record['queries'] == len(context)
+        assert record['serialize_ms'] > 0 and record['render_ms'] > 0
+
+    def test_action_names(self, user_client, post, sample_all, caplog):
+        caplog.set_level(logging.INFO, logger='api.performance')
+        user_client.post(f'/api/v1/posts/{post.id}/comments/',
+                         data={'text': 'Комментарий'})
+        user_client.head(f'/api/v1/posts/{post.id}/')
+        assert [record['view'] for record in log_records(caplog)] == [
+            'CommentViewSet.create', 'PostViewSet.retrieve'
+        ]
+
+    def test_sampling(self, client, monkeypatch, caplog):
+        monkeypatch.setattr(instrumentation, 'PERFORMANCE_SAMPLE_RATE', 0)
+        caplog.set_level(logging.INFO, logger='api.performance')
+        response = client.get('/api/v1/posts/')
+        assert 'Server-Timing' not in response, (
+            'Запросы вне выборки не должны замеряться.'
+        )
+        assert not log_records(caplog)
+
+    def test_asgi_queries_counted(self, post, sample_all, caplog):
+        caplog.set_level(logging.INFO, logger='api.performance')
+        async_to_sync(asgi_request)('GET', '/api/v1/posts/')
+        record, = log_records(caplog)
+        assert record['view'] == 'PostViewSet.list'
+        assert record['queries'] > 0, (
+            'Запросы к базе из потоков async-представлений тоже '
+            'должны учитываться.'
+        )
+
+    def test_reconnect_counts_once(self):
+        # При переподключении та же обертка снова получает connection_created
+        instrumentation.install_query_recorder(None, connection)
+        instrumentation.install_query_recorder(None, connection)
+        assert connection.execute_wrappers.count(
+            instrumentation.record_query) == 1, (
+            'После переподключения запросы не должны считаться дважды.'
+        )
@@ -0,0 +1,160 @@
+import os
+import re
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+
+from api import instrumentation, metrics
+from api.views import PostViewSet
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = metrics.MetricsStore(str(tmp_path))
+    monkeypatch.setattr(metrics, 'store', store)
+    monkeypatch.setattr(metrics, 'METRICS_ENABLED', True)
+    cache.clear()
+    return store
+
+
+def scrape(client):
+    response = client.get('/metrics')
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    return dict(
+        re.findall(r'^(\w+(?:\{.*\})?) (\S+)$',
+                   response.content.decode(), re.MULTILINE)
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestMetrics:
+
+    def test_requests_by_action(self, client, user_client, post, store,
+                                monkeypatch):
+        monkeypatch.setattr(instrumentation, 'PERFORMANCE_SAMPLE_RATE', 1)
+        client.get('/api/v1/posts/')
+        client.get('/api/v1/posts/')
+        user_client.post(f'/api/v1/posts/{post.id}/comments/',
+                         data={'text': 'Комментарий'})
+        user_client.get('/api/v1/follow/')
+        client.post('/api/v1/jwt/create/',
+                    data={'username': 'nobody', 'password': 'wrong'})
+        samples = scrape(client)
+
+        expected = {
+            'yatube_http_requests_total{view="posts.list",status="200"}': '2',
+            'yatube_http_requests_total{view="comments.create",'
+            'status="201"}': '1',
+            'yatube_http_requests_total{view="follow.list",status="200"}': '1',
+            'yatube_http_requests_total{view="jwt_create",status="401"}': '1',
+        }
+        for sample, value in expected.items():
+            assert samples.get(sample) == value, (
+                f'В `/metrics` должен быть счетчик `{sample}`.'
+            )
+        assert samples[
+            'yatube_http_request_duration_seconds_bucket'
+            '{view="posts.list",le="+Inf"}'
+        ] == '2', 'Гистограмма времени должна учитывать каждый запрос.'
+        assert samples[
+            'yatube_db_queries_per_request_count{view="posts.list"}'
+        ] == '2'
+
+    def test_unsampled_requests(self, client, post, store, monkeypatch):
+        monkeypatch.setattr(instrumentation, 'PERFORMANCE_SAMPLE_RATE', 0)
+        seen = []
+        list_view = PostViewSet.list
+
+        def recording_list(self, request, *args, **kwargs):
+            seen.append(instrumentation.get_metrics())
+            return list_view(self, request, *args, **kwargs)
+
+        monkeypatch.setattr(PostViewSet, 'list', recording_list)
+        client.get('/api/v1/posts/')
+        samples = scrape(client)
+        assert samples[
+            'yatube_http_requests_total{view="posts.list",status="200"}'
+        ] == '1'
+        assert samples[
+            'yatube_http_request_duration_seconds_count{view="posts.list"}'
+        ] == '1', 'Время ответа учитывается для каждого запроса.'
+        assert not any('yatube_db_queries_per_request_count' in sample
+                       for sample in samples), (
+            'SQL-запросы замеряются только для запросов из выборки.'
+        )
+        assert seen == [None], (
+            'Вне выборки обертки SQL и сериализации не должны работать.'
+        )
+
+    def test_histogram_is_cumulative(self, store):
+        store.increment_many([
+            *metrics.db_queries.amounts(('posts.list',), 1),
+            *metrics.db_queries.amounts(('posts.list',), 4),
+            *metrics.db_queries.amounts(('posts.list',), 500),
+        ])
+        text = metrics.exposition()
+        assert ('yatube_db_queries_per_request_bucket'
+                '{view="posts.list",le="1"} 1') in text
+        assert ('yatube_db_queries_per_request_bucket'
+                '{view="posts.list",le="5"} 2') in text
+        assert ('yatube_db_queries_per_request_bucket'
+                '{view="posts.list",le="+Inf"} 3') in text
+        assert ('yatube_db_queries_per_request_sum'
+                '{view="posts.list"} 505') in text
+
+    def write_worker_file(self, path, pid, amount):
+        other = metrics.MmapValues(str(path / f'{pid}.metrics'))
+        for key, _ in metrics.requests_total.amounts(
+                ('groups.list', '200')):
+            other.increment(key, amount)
+        other.close()
+
+    def test_processes_are_summed(self, client, store, tmp_path,
+                                  monkeypatch):
+        # Файл другого, живого воркера
+        self.write_worker_file(tmp_path, 99999, 3)
+        monkeypatch.setattr(metrics, 'is_alive', lambda pid: pid == 99999)
+        client.get('/api/v1/groups/')
+        samples = scrape(client)
+        assert samples[
+            'yatube_http_requests_total{view="groups.list",status="200"}'
+        ] == '4', 'Метрики всех процессов должны суммироваться.'
+
+    def test_dead_processes_are_pruned(self, client, store, tmp_path,
+                                       monkeypatch):
+        self.write_worker_file(tmp_path, 99998, 5)
+        self.write_worker_file(tmp_path, 99999, 3)
+        alive = {99998, 99999}
+        monkeypatch.setattr(metrics, 'is_alive', lambda pid: pid in alive)
+        alive.discard(99998)
+        assert scrape(client)[
+            'yatube_http_requests_total{view="groups.list",status="200"}'
+        ] == '3', 'Файлы завершившихся процессов не должны учитываться.'
+        alive.discard(99999)
+        # Так же новый процесс чистит каталог при создании своего файла
+        store.prune()
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            f'{os.getpid()}.metrics'
+        ]
+        monkeypatch.undo()
+        assert metrics.is_alive(os.getpid())
+
+    def test_file_grows(self, store):
+        store.increment_many(
+            (metrics._key('sample', (str(index),)), 1)
+            for index in range(5000)
+        )
+        values = store.collect()
+        assert len(values) == 5000
+        assert values[metrics._key('sample', ('4999',))] == 1
+
+    def test_cache_hit_ratio(self, client, group_1, store):
+        for _ in range(4):
+            client.get('/api/v1/groups/')
+        samples = scrape(client)
+        assert samples[
+            'yatube_cache_requests_total{cache="response",result="hit"}'
+        ] == '3'
+        assert samples['yatube_cache_hit_ratio{cache="response"}'] == '0.75'
@@ -0,0 +1,109 @@
+import base64
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCursorPagination:
+    url = '/api/v1/posts/'
+
+    @pytest.fixture
+    def many_posts(self, user):
+        return [
+            Post.objects.create(text=f'Публикация {index}', author=user)
+            for index in range(7)
+        ]
+
+    def test_cursor_pages_cover_all_posts(self, user_client, many_posts):
+        response = user_client.get(f'{self.url}?page_size=3')
+        assert response.status_code == HTTPStatus.OK, (
+            f'GET-запрос к `{self.url}?page_size=3` должен возвращать '
+            'ответ со статусом 200.'
+        )
+        data = response.json()
+        for key in ('next', 'previous', 'results'):
+            assert key in data, (
+                f'Ответ курсорной пагинации должен содержать ключ `{key}`.'
+            )
+        assert 'count' not in data, (
+            'Курсорная пагинация не должна выполнять подсчёт записей.'
+        )
+        assert data['previous'] is None
+
+        seen = [item['id'] for item in data['results']]
+        while data['next']:
+            data = user_client.get(data['next']).json()
+            seen.extend(item['id'] for item in data['results'])
+
+        expected = list(
+            Post.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True)
+        )
+        assert seen == expected, (
+            'Последовательный обход страниц по ссылке `next` должен '
+            'вернуть все публикации ровно один раз в порядке '
+            '(`pub_date`, `id`) по убыванию.'
+        )
+
+    def test_previous_link_returns_same_page(self, user_client, many_posts):
+        first = user_client.get(f'{self.url}?page_size=3').json()
+        second = user_client.get(first['next']).json()
+        back = user_client.get(second['previous']).json()
+        assert back['results'] == first['results'], (
+            'Переход по ссылке `previous` должен возвращать предыдущую '
+            'страницу.'
+        )
+
+    def test_cursor_page_does_not_count(self, user_client, many_posts):
+        with CaptureQueriesContext(connection) as context:
+            user_client.get(f'{self.url}?page_size=3')
+        assert not any(
+            'COUNT(' in query['sql'].upper()
+            for query in context.captured_queries
+        ), 'Курсорная пагинация не должна выполнять запрос COUNT(*).'
+
+    def test_invalid_cursor(self, user_client, many_posts):
+        response = user_client.get(f'{self.url}?cursor=invalid')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Некорректный курсор должен приводить к ответу со статусом 404.'
+        )
+
+    @pytest.mark.parametrize('position', [
+        [None, 1], [{}, 1], [[], 1], ['2024-01-01T00:00:00+00:00', 'abc'],
+        ['2024-01-01T00:00:00+00:00', 2 ** 80], [1, 1], [True, 1],
+    ])
+    def test_tampered_cursor(self, user_client, many_posts, position):
+        cursor = base64.urlsafe_b64encode(
+            json.dumps({'p': position, 'r': 0}).encode()
+        ).decode()
+        response = user_client.get(f'{self.url}?cursor={cursor}')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            f'Курсор с позицией {position} должен приводить к ответу 404.'
+        )
+
+    def test_limit_offset_compatibility(self, user_client, many_posts):
+        response = user_client.get(f'{self.url}?limit=2&offset=1')
+        data = response.json()
+        assert data['count'] == len(many_posts), (
+            'Режим `limit`/`offset` должен сохранять прежний формат ответа.'
+        )
+        assert len(data['results']) == 2
+
+    def test_comments_cursor(self, user_client, post, comment_1_post,
+                             comment_2_post):
+        url = f'/api/v1/posts/{post.id}/comments/?page_size=1'
+        data = user_client.get(url).json()
+        assert [item['id'] for item in data['results']] == [
+            comment_1_post.id
+        ]
+        data = user_client.get(data['next']).json()
+        assert [item['id'] for item in data['results']] == [
+            comment_2_post.id
+        ]
+        assert data['next'] is None
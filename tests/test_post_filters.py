@@ -0,0 +1,117 @@
+import datetime
+from http import HTTPStatus
+
+import pytest
+
+from posts.models import Post
+from tests.test_indexes import list_plans
+
+
+def ids(response):
+    data = response.json()
+    if isinstance(data, dict):
+        data = data['results']
+    return [item['id'] for item in data]
+
+
+@pytest.fixture
+def dated_posts(user, another_user, group_1, group_2):
+    posts = [
+        Post.objects.create(text='Первая', author=user, group=group_1),
+        Post.objects.create(text='Вторая', author=another_user,
+                            group=group_1),
+        Post.objects.create(text='Третья', author=user, group=group_2),
+        Post.objects.create(text='Четвертая', author=user, group=group_1),
+    ]
+    start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    for day, post in enumerate(posts):
+        Post.objects.filter(pk=post.pk).update(
+            pub_date=start + datetime.timedelta(days=day)
+        )
+    return posts
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostFilters:
+
+    def test_group_and_author(self, client, dated_posts, user, group_1):
+        first, second, third, fourth = dated_posts
+        response = client.get(f'/api/v1/posts/?group={group_1.slug}')
+        assert ids(response) == [fourth.id, second.id, first.id], (
+            'Параметр `group` должен оставлять публикации группы.'
+        )
+        response = client.get(
+            f'/api/v1/posts/?group={group_1.slug}&author={user.username}'
+        )
+        assert ids(response) == [fourth.id, first.id]
+        response = client.get('/api/v1/posts/?group=unknown')
+        assert response.status_code == HTTPStatus.OK
+        assert ids(response) == []
+
+    def test_dates(self, client, dated_posts):
+        first, second, third, fourth = dated_posts
+        response = client.get(
+            '/api/v1/posts/?since=2024-01-02&until=2024-01-04T00:00:00Z'
+        )
+        assert ids(response) == [third.id, second.id], (
+            '`since` и `until` должны задавать полуинтервал дат.'
+        )
+        response = client.get('/api/v1/posts/?since=вчера')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'since' in response.json()
+
+    def test_nested_routes(self, client, dated_posts, user, group_1):
+        first, second, third, fourth = dated_posts
+        response = client.get(f'/api/v1/groups/{group_1.id}/posts/')
+        assert ids(response) == [fourth.id, second.id, first.id]
+        response = client.get(f'/api/v1/users/{user.username}/posts/'
+                              '?until=2024-01-04')
+        assert ids(response) == [third.id, first.id]
+        for group_id in (999, 0, 99999999999999999999):
+            response = client.get(f'/api/v1/groups/{group_id}/posts/')
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Запрос к несуществующей группе {group_id} должен '
+                'приводить к ответу 404.'
+            )
+        assert client.get('/api/v1/users/nobody/posts/').status_code == (
+            HTTPStatus.NOT_FOUND
+        )
+
+    def test_nested_routes_read_only(self, user_client, group_1):
+        response = user_client.post(f'/api/v1/groups/{group_1.id}/posts/',
+                                    data={'text': 'Текст'})
+        assert response.status_code == HTTPStatus.METHOD_NOT_ALLOWED
+
+    def test_cursor_keeps_filters(self, client, dated_posts, group_1):
+        first, second, third, fourth = dated_posts
+        url = f'/api/v1/posts/?group={group_1.slug}&page_size=1'
+        seen = []
+        while url:
+            data = client.get(url).json()
+            seen.extend(item['id'] for item in data['results'])
+            url = data['next']
+        assert seen == [fourth.id, second.id, first.id], (
+            'Курсорная пагинация должна сохранять фильтры.'
+        )
+
+    @pytest.mark.parametrize('query, index', [
+        ('group={slug}&page_size=2', 'post_group_pub_date_idx'),
+        ('group={slug}&since=2024-01-02', 'post_group_pub_date_idx'),
+        ('author={username}&page_size=2', 'post_author_pub_date_idx'),
+        ('since=2024-01-02&until=2024-01-04&page_size=2',
+         'post_pub_date_idx'),
+    ])
+    def test_filters_use_index(self, client, dated_posts, user, group_1,
+                               query, index):
+        query = query.format(slug=group_1.slug, username=user.username)
+        plans = [
+            plan for sql, plan in list_plans(client, f'/api/v1/posts/?{query}')
+            if 'FROM "posts_post"' in sql
+        ]
+        assert plans
+        for plan in plans:
+            assert any(index in step for step in plan), (
+                f'Фильтр `{query}` должен читать индекс `{index}`, '
+                f'план: {plan}'
+            )
+            assert not any('TEMP B-TREE' in step for step in plan)
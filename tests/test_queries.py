@@ -0,0 +1,52 @@
+import pytest
+
+from posts.models import Comment, Follow, Post
+from tests.query_budget import assert_query_budget
+
+
+@pytest.mark.django_db(transaction=True)
+class TestQueryBudget:
+
+    @pytest.fixture
+    def authors(self, django_user_model):
+        def create(count):
+            start = django_user_model.objects.count()
+            return [
+                django_user_model.objects.create_user(
+                    username=f'author_{start + index}', password='pass'
+                )
+                for index in range(count)
+            ]
+        return create
+
+    @pytest.mark.parametrize('query', ('', '?page_size=50', '?limit=50'))
+    def test_posts_list(self, user_client, authors, group_1, query):
+        def add_posts(count):
+            for author in authors(count):
+                Post.objects.create(text='Текст', author=author,
+                                    group=group_1)
+
+        assert_query_budget(
+            lambda: user_client.get(f'/api/v1/posts/{query}'),
+            add_posts,
+        )
+
+    def test_comments_list(self, user_client, post, authors):
+        def add_comments(count):
+            for author in authors(count):
+                Comment.objects.create(text='Текст', author=author, post=post)
+
+        assert_query_budget(
+            lambda: user_client.get(f'/api/v1/posts/{post.id}/comments/'),
+            add_comments,
+        )
+
+    def test_follow_list(self, user_client, user, authors):
+        def add_follows(count):
+            for author in authors(count):
+                Follow.objects.create(user=user, following=author)
+
+        assert_query_budget(
+            lambda: user_client.get('/api/v1/follow/'),
+            add_follows,
+        )
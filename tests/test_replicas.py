@@ -0,0 +1,164 @@
+from collections import Counter
+from http import HTTPStatus
+
+import pytest
+
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from api import replicas
+from api.conditional import ConditionalGetMixin
+
+
+class FakeRequest:
+    def __init__(self, user):
+        self.user = user
+
+
+@pytest.fixture
+def replica_reads(monkeypatch):
+    """Реплика 'replica' ведет в ту же базу; записываем выбор роутера."""
+    chosen = []
+    monkeypatch.setattr(replicas, 'DATABASE_REPLICAS', {'replica': 1})
+    monkeypatch.setattr(replicas.pool, 'choose', lambda: 'replica')
+    db_for_read = replicas.ReplicaRouter.db_for_read
+
+    def record(self, model, **hints):
+        alias = db_for_read(self, model, **hints)
+        chosen.append(alias)
+        # Запрос фактически выполняется в основной базе
+        return None
+
+    monkeypatch.setattr(replicas.ReplicaRouter, 'db_for_read', record)
+    return chosen
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReplicaRouting:
+
+    def test_reads_go_to_replica(self, client, post, replica_reads):
+        response = client.get('/api/v1/posts/')
+        assert response.status_code == HTTPStatus.OK
+        assert 'replica' in replica_reads, (
+            'GET-запросы к публикациям должны читать из реплики.'
+        )
+        replica_reads.clear()
+        client.get('/api/v1/feed/')
+        assert 'replica' not in replica_reads, (
+            'Вьюсеты без ReplicaReadMixin читают из основной базы.'
+        )
+
+    def test_streaming_reads_go_to_replica(self, client, post,
+                                           replica_reads):
+        response = client.get('/api/v1/posts/?stream=1')
+        replica_reads.clear()
+        b''.join(response.streaming_content)
+        assert replica_reads == [], (
+            'Потоковый ответ должен читать из реплики, выбранной для '
+            'запроса, даже после выхода из представления.'
+        )
+
+    def test_validators_and_cache_read_primary(self, client, post, group_1,
+                                               replica_reads, monkeypatch):
+        seen = []
+        get_validators = ConditionalGetMixin.get_validators
+
+        def record(self, request):
+            seen.append(replicas.read_alias())
+            return get_validators(self, request)
+
+        monkeypatch.setattr(ConditionalGetMixin, 'get_validators', record)
+        response = client.get('/api/v1/posts/')
+        assert seen == [None, 'replica'], (
+            'Ответ 304 решается по основной базе, а ETag тела из реплики '
+            'считается по реплике.'
+        )
+        response = client.get('/api/v1/posts/',
+                              HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        seen.clear()
+        replica_reads.clear()
+        response = client.get(f'/api/v1/groups/{group_1.id}/')
+        assert response['X-Cache'] == 'MISS'
+        assert 'replica' not in replica_reads and seen == [None], (
+            'Кэш ответов должен заполняться из основной базы.'
+        )
+
+    def test_pinned_user_bypasses_cache(self, user_client, user, post,
+                                        replica_reads):
+        user_client.get(f'/api/v1/posts/{post.id}/')
+        assert user_client.get(f'/api/v1/posts/{post.id}/')['X-Cache'] == (
+            'HIT'
+        )
+        replicas.pin_to_primary(FakeRequest(user), HttpResponse())
+        user_client.cookies.clear()
+        response = user_client.get(f'/api/v1/posts/{post.id}/')
+        assert not response.has_header('X-Cache'), (
+            'После записи пользователь не должен получать ответы из кэша.'
+        )
+        assert caches['api'].get(f'replica:pin:{user.pk}'), (
+            'Закрепление должно храниться в кэше REPLICA_PIN_CACHE_ALIAS.'
+        )
+
+    def test_reads_pinned_after_write(self, user_client, post,
+                                      replica_reads):
+        response = user_client.post('/api/v1/posts/', data={'text': 'Пост'})
+        assert response.status_code == HTTPStatus.CREATED
+        assert 'replica' not in replica_reads, (
+            'Запись и чтения внутри нее идут в основную базу.'
+        )
+
+        user_client.get('/api/v1/posts/')
+        assert 'replica' not in replica_reads, (
+            'После записи чтения пользователя должны идти в основную базу.'
+        )
+
+        # Клиент без cookie: закрепление по пользователю через кэш
+        user_client.cookies.clear()
+        user_client.get(f'/api/v1/posts/{post.id}/comments/')
+        assert 'replica' not in replica_reads
+
+    def test_pin_expires(self, user_client, post, replica_reads,
+                         monkeypatch):
+        monkeypatch.setattr(replicas, 'is_pinned', lambda request: False)
+        user_client.post('/api/v1/posts/', data={'text': 'Пост'})
+        user_client.get('/api/v1/posts/')
+        assert 'replica' in replica_reads
+
+
+class TestReplicaPool:
+
+    def test_weighted_choice(self, monkeypatch):
+        monkeypatch.setattr(replicas.random, 'choices',
+                            replicas.random.Random(0).choices)
+        pool = replicas.ReplicaPool({'a': 3, 'b': 1, 'off': 0})
+        monkeypatch.setattr(pool, 'check', lambda alias: True)
+        counts = Counter(pool.choose() for _ in range(4000))
+        assert 'off' not in counts
+        assert 2.5 < counts['a'] / counts['b'] < 3.5, (
+            'Реплики должны выбираться пропорционально весам.'
+        )
+
+    def test_unhealthy_replica_skipped(self, monkeypatch):
+        pool = replicas.ReplicaPool({'a': 1, 'b': 1})
+        checks = []
+
+        def check(alias):
+            checks.append(alias)
+            return alias == 'b'
+
+        monkeypatch.setattr(pool, 'check', check)
+        assert {pool.choose() for _ in range(50)} == {'b'}, (
+            'Недоступная реплика должна исключаться из выбора.'
+        )
+        assert checks.count('a') == 1, (
+            'Упавшая реплика не должна проверяться на каждом запросе.'
+        )
+
+        monkeypatch.setattr(pool, 'check', lambda alias: False)
+        pool._checked.clear()
+        pool._down_until.clear()
+        assert pool.choose() is None, (
+            'Без доступных реплик чтения идут в основную базу.'
+        )
@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.cache import get_stats
+from api.views import PostViewSet
+from posts.models import Comment, Group
+
+
+@pytest.mark.django_db(transaction=True)
+class TestResponseCache:
+
+    def test_group_list_cached(self, user_client, group_1):
+        url = '/api/v1/groups/'
+        first = user_client.get(url)
+        second = user_client.get(url)
+        assert first['X-Cache'] == 'MISS'
+        assert second['X-Cache'] == 'HIT', (
+            f'Повторный GET-запрос к `{url}` должен обслуживаться из кэша.'
+        )
+        assert first.json() == second.json()
+
+        stats = get_stats()
+        assert stats['hits'] == 1 and stats['misses'] == 1, (
+            'Кэш должен учитывать попадания и промахи.'
+        )
+
+    def test_group_change_invalidates(self, user_client, group_1):
+        url = '/api/v1/groups/'
+        user_client.get(url)
+        Group.objects.create(title='Новая группа', slug='new_group')
+
+        response = user_client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Изменение группы должно сбрасывать кэш списка групп.'
+        )
+        assert len(response.json()) == Group.objects.count()
+
+    def test_post_detail_invalidation(self, user_client, user, post):
+        url = f'/api/v1/posts/{post.id}/'
+        user_client.get(url)
+        assert user_client.get(url)['X-Cache'] == 'HIT'
+
+        user_client.patch(url, data={'text': 'Новый текст'})
+        response = user_client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['text'] == 'Новый текст', (
+            'После изменения публикации кэш не должен отдавать '
+            'устаревшие данные.'
+        )
+
+        Comment.objects.create(author=user, post=post, text='Комментарий')
+        assert user_client.get(url)['X-Cache'] == 'MISS', (
+            'Новый комментарий должен сбрасывать кэш публикации.'
+        )
+
+    def test_missing_post_not_cached(self, user_client):
+        url = '/api/v1/posts/100500/'
+        assert user_client.get(url).status_code == HTTPStatus.NOT_FOUND
+        assert user_client.get(url).get('X-Cache') != 'HIT', (
+            'Ответы с ошибками не должны попадать в кэш.'
+        )
+
+    def test_key_depends_on_auth(self, client, user_client, group_1):
+        url = '/api/v1/groups/'
+        user_client.get(url)
+        assert client.get(url)['X-Cache'] == 'MISS', (
+            'Ответы для анонимных и аутентифицированных пользователей '
+            'должны кэшироваться раздельно.'
+        )
+
+    def test_invalidation_after_commit(self, monkeypatch, user_client, post):
+        url = f'/api/v1/posts/{post.id}/'
+        user_client.get(url)
+        perform_update = PostViewSet.perform_update
+        reads = []
+
+        def update_with_read(view, serializer):
+            perform_update(view, serializer)
+            # Чтение между сохранением и фиксацией транзакции
+            reads.append(user_client.get(url))
+        monkeypatch.setattr(PostViewSet, 'perform_update', update_with_read)
+        user_client.patch(url, data={'text': 'Новый текст'})
+
+        assert reads[0]['X-Cache'] == 'HIT', (
+            'До фиксации транзакции версия кэша меняться не должна.'
+        )
+        response = user_client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['text'] == 'Новый текст', (
+            'Ответ, сохраненный до фиксации, не должен отдаваться после нее.'
+        )
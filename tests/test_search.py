@@ -0,0 +1,85 @@
+import pytest
+from django.core.management import call_command
+
+from posts import search
+from posts.models import Post
+
+
+@pytest.fixture(params=['fts5', 'tokens'])
+def search_backend(request, monkeypatch):
+    if request.param == 'fts5':
+        if not search.fts5_available():
+            pytest.skip('SQLite собран без FTS5.')
+        backend = search.FTS5Backend()
+    else:
+        backend = search.TokenBackend()
+    monkeypatch.setattr(search, '_backend', backend)
+    return backend
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostSearch:
+    url = '/api/v1/posts/'
+
+    @pytest.fixture
+    def posts(self, user, search_backend):
+        texts = (
+            'Кошка спит на диване',
+            'Собака и кошка играют, кошка убегает, кошка прячется',
+            'Погода сегодня хорошая',
+        )
+        return [Post.objects.create(text=text, author=user)
+                for text in texts]
+
+    def test_search_ranked(self, user_client, posts):
+        response = user_client.get(f'{self.url}?search=КОШКА')
+        ids = [item['id'] for item in response.json()]
+        assert ids == [posts[1].id, posts[0].id], (
+            'Поиск `?search=` должен возвращать подходящие публикации, '
+            'отсортированные по релевантности.'
+        )
+
+    def test_search_all_terms(self, user_client, posts):
+        response = user_client.get(f'{self.url}?search=кошка диване')
+        assert [item['id'] for item in response.json()] == [posts[0].id], (
+            'Публикация должна содержать все слова поискового запроса.'
+        )
+
+    def test_search_syntax_is_escaped(self, user_client, posts):
+        response = user_client.get(f'{self.url}?search="кошка" OR NEAR(')
+        assert response.status_code == 200
+
+    def test_index_follows_updates(self, user_client, posts):
+        post = posts[2]
+        post.text = 'Кошка гуляет'
+        post.save()
+        posts[0].delete()
+
+        response = user_client.get(f'{self.url}?search=кошка')
+        assert {item['id'] for item in response.json()} == {
+            posts[1].id, post.id
+        }, 'Поисковый индекс должен обновляться при изменении публикаций.'
+
+    def test_search_cursor_pagination(self, user_client, posts, user):
+        for index in range(4):
+            Post.objects.create(text=f'кошка номер {index}', author=user)
+        expected = [item['id'] for item in
+                    user_client.get(self.url, {'search': 'кошка'}).json()]
+
+        data = user_client.get(
+            self.url, {'search': 'кошка', 'page_size': 2}
+        ).json()
+        seen = [item['id'] for item in data['results']]
+        while data['next']:
+            data = user_client.get(data['next']).json()
+            seen.extend(item['id'] for item in data['results'])
+        assert seen == expected, (
+            'Результаты поиска должны постранично выдаваться курсором '
+            'в порядке релевантности.'
+        )
+
+    def test_rebuild_command(self, user_client, posts, search_backend):
+        Post.objects.filter(pk=posts[2].pk).update(text='кошка без сигнала')
+        call_command('rebuild_search_index')
+        response = user_client.get(f'{self.url}?search=сигнала')
+        assert [item['id'] for item in response.json()] == [posts[2].id]
@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def selects(context, table):
+    return [query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and f'FROM "{table}"' in query['sql']]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSparseFields:
+
+    def test_fields(self, client, post, post_2):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/posts/?fields=id,author')
+        assert response.status_code == HTTPStatus.OK
+        assert [set(item) for item in response.json()] == [
+            {'id', 'author'}, {'id', 'author'}
+        ], 'Параметр `fields` должен оставлять только указанные поля.'
+        sql = selects(context, 'posts_post')[-1]
+        assert '"posts_post"."text"' not in sql, (
+            'Столбцы невыбранных полей не должны читаться из базы.'
+        )
+
+    def test_expand(self, client, post_2, group_1, user):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                f'/api/v1/posts/{post_2.id}/?expand=group,author'
+            )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['group'] == {
+            'id': group_1.id, 'title': group_1.title,
+            'slug': group_1.slug, 'description': group_1.description,
+            'updated': data['group']['updated'],
+        }, 'Параметр `expand` должен встраивать группу.'
+        assert data['author']['username'] == user.username
+        assert len(selects(context, 'posts_post')) == 2, (
+            'Группа и автор должны читаться соединением, без отдельных '
+            'запросов.'
+        )
+
+    def test_fields_with_expand_in_list(self, client, post, post_2,
+                                        group_1):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                '/api/v1/posts/?fields=id,group&expand=group&limit=10'
+            )
+        results = response.json()['results']
+        assert results == [
+            {'id': post_2.id, 'group': results[0]['group']},
+            {'id': post.id, 'group': None},
+        ]
+        assert results[0]['group']['slug'] == group_1.slug
+        page_sql = selects(context, 'posts_post')[-1]
+        assert 'JOIN "posts_group"' in page_sql
+        assert '"posts_post"."text"' not in page_sql
+        assert 'auth_user' not in page_sql, (
+            'Ненужные связи не должны присоединяться.'
+        )
+
+    def test_comments(self, client, post, comment_1_post):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                f'/api/v1/posts/{post.id}/comments/?fields=id,author'
+                '&expand=author'
+            )
+        assert '"posts_comment"."text"' not in selects(
+            context, 'posts_comment')[-1]
+        data = response.json()
+        assert [set(item) for item in data] == [{'id', 'author'}]
+        assert data[0]['author']['username'] == (
+            comment_1_post.author.username
+        ), 'Комментарий должен встраивать автора.'
+
+    def test_feed(self, user_client, another_user, another_post):
+        user_client.post('/api/v1/follow/',
+                         data={'following': another_user.username})
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(
+                '/api/v1/feed/?fields=id,text&page_size=1'
+            )
+        assert response.json()['results'] == [
+            {'id': another_post.id, 'text': another_post.text}
+        ]
+        sql = selects(context, 'posts_feedentry')[-1]
+        assert '"posts_post"."image"' not in sql
+
+    def test_invalid_names(self, client, post):
+        response = client.get('/api/v1/posts/?fields=id,password')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'fields' in response.json()
+        response = client.get('/api/v1/posts/?expand=comments')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'expand' in response.json()
+
+    def test_writes_ignore_fields(self, user_client, group_1):
+        response = user_client.post(
+            '/api/v1/posts/?fields=id',
+            data={'text': 'Новая публикация', 'group': group_1.id}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['text'] == 'Новая публикация'
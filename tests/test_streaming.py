@@ -0,0 +1,54 @@
+import json
+
+import pytest
+from django.http import StreamingHttpResponse
+
+from posts.models import Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestStreamingList:
+    url = '/api/v1/posts/'
+
+    @pytest.fixture
+    def many_posts(self, user, group_1):
+        return [
+            Post.objects.create(text=f'Публикация {index}', author=user,
+                                group=group_1)
+            for index in range(5)
+        ]
+
+    def test_stream_json_array(self, user_client, many_posts):
+        regular = user_client.get(self.url)
+        response = user_client.get(f'{self.url}?stream=1')
+        assert isinstance(response, StreamingHttpResponse), (
+            'Параметр `stream` должен включать потоковую выдачу списка.'
+        )
+        content = b''.join(response.streaming_content)
+        assert content == regular.content, (
+            'Потоковая выдача должна совпадать с обычным ответом побайтно.'
+        )
+
+    def test_stream_ndjson(self, user_client, many_posts):
+        response = user_client.get(
+            self.url, HTTP_ACCEPT='application/x-ndjson'
+        )
+        assert isinstance(response, StreamingHttpResponse)
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = b''.join(response.streaming_content).splitlines()
+        assert [json.loads(line) for line in lines] == (
+            user_client.get(self.url).json()
+        )
+
+    def test_paginated_request_is_not_streamed(self, user_client,
+                                               many_posts):
+        response = user_client.get(f'{self.url}?stream=1&page_size=2')
+        assert not isinstance(response, StreamingHttpResponse)
+        assert len(response.json()['results']) == 2
+
+    def test_comments_stream(self, user_client, post, comment_1_post,
+                             comment_2_post):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        response = user_client.get(f'{url}?stream=1')
+        content = b''.join(response.streaming_content)
+        assert content == user_client.get(url).content
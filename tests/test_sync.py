@@ -0,0 +1,91 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from posts.models import Change
+
+
+def ids(items):
+    return [item['id'] for item in items]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSync:
+
+    def test_initial_sync(self, client, post, comment_1_post):
+        response = client.get('/api/v1/sync/')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert ids(data['posts']['created']) == [post.id], (
+            'Первая синхронизация должна вернуть все публикации.'
+        )
+        assert data['posts']['created'][0]['comment_count'] == 1
+        assert ids(data['comments']['created']) == [comment_1_post.id]
+        assert data['has_more'] is False and data['next'] is None
+        assert data['token'] == Change.objects.latest('id').id
+
+    def test_changes_since_token(self, user_client, post, post_2,
+                                 comment_1_post):
+        token = user_client.get('/api/v1/sync/').json()['token']
+        user_client.patch(f'/api/v1/posts/{post.id}/',
+                          data={'text': 'Новый текст'})
+        user_client.delete(f'/api/v1/posts/{post_2.id}/')
+        created = user_client.post(f'/api/v1/posts/{post.id}/comments/',
+                                   data={'text': 'Новый'}).json()
+        user_client.delete(
+            f'/api/v1/posts/{post.id}/comments/{comment_1_post.id}/'
+        )
+
+        data = user_client.get(f'/api/v1/sync/?since={token}').json()
+        assert data['posts']['created'] == []
+        assert ids(data['posts']['updated']) == [post.id]
+        assert data['posts']['updated'][0]['text'] == 'Новый текст'
+        assert data['posts']['deleted'] == [post_2.id], (
+            'Удаленная публикация должна прийти надгробием.'
+        )
+        assert ids(data['comments']['created']) == [created['id']]
+        assert data['comments']['deleted'] == [comment_1_post.id]
+
+        data = user_client.get(f'/api/v1/sync/?since={data["token"]}')
+        assert data.json()['posts'] == {
+            'created': [], 'updated': [], 'deleted': []
+        }, 'Повторная синхронизация без изменений должна быть пустой.'
+
+    def test_cascade_delete(self, user_client, post, comment_1_post,
+                            comment_2_post):
+        token = user_client.get('/api/v1/sync/').json()['token']
+        user_client.delete(f'/api/v1/posts/{post.id}/')
+        data = user_client.get(f'/api/v1/sync/?since={token}').json()
+        assert data['posts']['deleted'] == [post.id]
+        assert sorted(data['comments']['deleted']) == [
+            comment_1_post.id, comment_2_post.id
+        ], 'Комментарии удаленной публикации тоже должны прийти надгробиями.'
+
+    def test_pages(self, client, post, post_2, another_post):
+        url, seen, pages = '/api/v1/sync/?limit=2', [], 0
+        while url:
+            data = client.get(url).json()
+            seen += ids(data['posts']['created'])
+            url, pages = data['next'], pages + 1
+        assert sorted(seen) == sorted([post.id, post_2.id, another_post.id])
+        assert pages == 2, 'Страница должна ограничиваться `limit`.'
+
+    def test_invalid_params(self, client):
+        for query in ('since=-1', 'since=abc', 'limit=0',
+                      'since=99999999999999999999'):
+            response = client.get(f'/api/v1/sync/?{query}')
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+            assert query.split('=')[0] in response.json()
+
+    def test_compact(self, user_client, post, post_2):
+        for text in ('Раз', 'Два'):
+            user_client.patch(f'/api/v1/posts/{post.id}/', data={'text': text})
+        user_client.delete(f'/api/v1/posts/{post_2.id}/')
+        call_command('compact_changes')
+        assert list(Change.objects.values_list('object_id', 'action')) == [
+            (post.id, Change.UPDATED), (post_2.id, Change.DELETED)
+        ], 'Сжатие должно оставлять последнюю запись объекта.'
+        data = user_client.get('/api/v1/sync/').json()
+        assert ids(data['posts']['updated']) == [post.id]
+        assert data['posts']['deleted'] == [post_2.id]
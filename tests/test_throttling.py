@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+
+from api import throttling
+
+
+@pytest.fixture
+def rates(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            'user_read': '5/min',
+            'user_write': '3/min',
+            'anon_read': '2/min',
+            'anon_write': '1/min',
+        },
+    }
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(throttling.TokenBucketThrottle, 'timer',
+                        staticmethod(lambda: now[0]))
+    return now
+
+
+@pytest.mark.django_db(transaction=True)
+class TestThrottling:
+    url = '/api/v1/posts/'
+
+    def test_write_budget(self, user_client, post, rates, clock):
+        for _ in range(3):
+            response = user_client.post(self.url, data={'text': 'Пост'})
+            assert response.status_code == HTTPStatus.CREATED
+        response = user_client.post(self.url, data={'text': 'Пост'})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'После исчерпания лимита записи должен возвращаться ответ '
+            'со статусом 429.'
+        )
+        assert int(response['Retry-After']) == 20
+
+        assert user_client.get(self.url).status_code == HTTPStatus.OK, (
+            'Лимиты чтения и записи должны быть раздельными.'
+        )
+        response = user_client.post(f'{self.url}{post.id}/comments/',
+                                    data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Лимит считается отдельно для каждого класса представления.'
+        )
+
+        clock[0] += 20
+        response = user_client.post(self.url, data={'text': 'Пост'})
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Ведро должно пополняться со временем.'
+        )
+        response = user_client.post(self.url, data={'text': 'Пост'})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+    def test_anonymous_by_ip(self, client, rates, clock):
+        for _ in range(2):
+            response = client.get(self.url, REMOTE_ADDR='10.0.0.1')
+            assert response.status_code == HTTPStatus.OK
+        response = client.get(self.url, REMOTE_ADDR='10.0.0.1')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Анонимные запросы должны ограничиваться по IP.'
+        )
+        response = client.get(self.url, REMOTE_ADDR='10.0.0.2')
+        assert response.status_code == HTTPStatus.OK
+
+
+def test_parse_rate():
+    assert throttling.parse_rate('3/min') == (20000000, 40000000)
+    assert throttling.parse_rate('10/s') == (100000, 900000)
@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        # Подключаем обработчики сигналов инвалидации кэша
+        from api import signals  # noqa: F401
+        from api.database import configure_sqlite
+        from api.instrumentation import install_query_recorder
+
+        connection_created.connect(
+            configure_sqlite, dispatch_uid='api.configure_sqlite'
+        )
+        connection_created.connect(
+            install_query_recorder, dispatch_uid='api.install_query_recorder'
+        )
@@ -0,0 +1,23 @@
+from django.urls import URLPattern
+
+from api.async_views import async_view
+from api.urls import router
+
+
+def _async_pattern(pattern):
+    callback = pattern.callback
+    actions = getattr(callback, 'actions', None)
+    if actions is None:
+        # Корень API и прочие представления без actions — синхронные
+        return pattern
+    return URLPattern(
+        pattern.pattern,
+        async_view(callback.cls, actions, **callback.initkwargs),
+        pattern.default_args,
+        pattern.name,
+    )
+
+
+# Маршруты строятся из DefaultRouter api/urls.py, чтобы не расходиться с
+# ним; остальное (токены, JWT) отдают синхронные представления
+urlpatterns = [_async_pattern(pattern) for pattern in router.urls]
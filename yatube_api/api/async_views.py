@@ -0,0 +1,48 @@
+"""Асинхронные обработчики чтения для ASGI.
+
+Под ASGI Django 3.2 выполняет синхронное представление через
+``sync_to_async(thread_sensitive=True)``: все такие запросы процесса идут
+по очереди в одном общем потоке. Обработчики ниже — ``async def``: GET и
+HEAD выполняют тот же вьюсет (пагинация, поиск, кэш, ETag, реплики) в
+пуле потоков с ``thread_sensitive=False``, и чтения идут параллельно.
+ORM Django 3.2 синхронный, поэтому запросы к базе по-прежнему работают в
+потоке, но без общей очереди. Запись идет прежним путем.
+Тело потокового ответа (``?stream=1``, NDJSON) читается уже при отправке,
+порциями в отдельном потоке (см. ``yatube_api.asgi``).
+"""
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+def _read_in_thread(view, request, *args, **kwargs):
+    try:
+        response = view(request, *args, **kwargs)
+        # Рендеринг тоже выполняем в потоке пула
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+    finally:
+        # Соединения потоков пула закрываются по тем же правилам
+        # (CONN_MAX_AGE), что и в конце обычного запроса
+        close_old_connections()
+
+
+def async_view(viewset, actions, **initkwargs):
+    """Асинхронная обертка над вьюсетом для маршрута с ``actions``."""
+    sync_view = viewset.as_view(actions, **initkwargs)
+    read = sync_to_async(_read_in_thread, thread_sensitive=False)
+    write = sync_to_async(sync_view, thread_sensitive=True)
+
+    async def view(request, *args, **kwargs):
+        if request.method in READ_METHODS:
+            return await read(sync_view, request, *args, **kwargs)
+        return await write(request, *args, **kwargs)
+
+    # csrf_exempt в Django 3.2 оборачивает функцию синхронной оберткой
+    view.csrf_exempt = True
+    view.cls = viewset
+    view.actions = actions
+    view.initkwargs = initkwargs
+    return view
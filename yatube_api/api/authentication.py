@@ -0,0 +1,109 @@
+"""Аутентификация с кэшем пользователей внутри процесса.
+
+Стандартные ``TokenAuthentication`` и ``JWTAuthentication`` обращаются к базе
+на каждый запрос. Классы ниже хранят найденных пользователей в ограниченном
+LRU-кэше с временем жизни записи. Сигналы (см. ``api.signals``) удаляют
+записи при изменении или удалении пользователя (деактивация, смена пароля)
+и при удалении токена. Сигналы срабатывают только в процессе, изменившем
+данные, поэтому в остальных процессах устаревшая запись живет не дольше
+``AUTH_CACHE_TTL`` секунд.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from api.metrics import cache_lookup
+
+AUTH_CACHE_SIZE = getattr(settings, 'AUTH_CACHE_SIZE', 1024)
+AUTH_CACHE_TTL = getattr(settings, 'AUTH_CACHE_TTL', 60)
+
+
+class TTLCache:
+    """Потокобезопасный LRU-кэш с ограничением размера и времени жизни."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def pop_user(self, user_id):
+        with self._lock:
+            for key in [key for key, (_, value) in self._data.items()
+                        if value[0].pk == user_id]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+token_cache = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+jwt_user_cache = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+
+
+def invalidate_user(user_id):
+    token_cache.pop_user(user_id)
+    jwt_user_cache.pop_user(user_id)
+
+
+def invalidate_token(key):
+    token_cache.pop(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        cache_lookup('auth_token', cached is not None)
+        if cached is None:
+            cached = super().authenticate_credentials(key)
+            token_cache.set(key, cached)
+        user, token = cached
+        # Копия защищает общий объект от изменений внутри запроса
+        return copy.copy(user), token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        cached = jwt_user_cache.get(user_id) if user_id is not None else None
+        cache_lookup('auth_jwt', cached is not None)
+        if cached is None:
+            cached = (super().get_user(validated_token),)
+            jwt_user_cache.set(user_id, cached)
+        user, = cached
+        return copy.copy(user)
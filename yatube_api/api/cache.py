@@ -0,0 +1,143 @@
+"""Кэш ответов API с инвалидацией по сигналам моделей.
+
+В кэше хранятся уже сериализованные данные ответа. Ключ записи включает
+версии «областей» (например, ``groups`` или ``post:42``): сигналы
+``post_save``/``post_delete`` после фиксации транзакции меняют версию
+области, и все связанные с ней записи перестают находиться без явного
+удаления каждого варианта ключа.
+
+Промах кэша заполняется чтением из основной базы, даже если запрос
+обслуживает реплика: иначе данные отставшей реплики легли бы под новую
+версию области до следующего изменения. Пользователь, закрепленный за
+основной базой после записи (см. ``api.replicas``), кэш не использует.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+from api.metrics import cache_lookup
+from api.replicas import primary_reads
+
+API_CACHE_ALIAS = getattr(settings, 'API_CACHE_ALIAS', 'default')
+API_CACHE_TIMEOUT = getattr(settings, 'API_CACHE_TIMEOUT', 300)
+
+KEY_PREFIX = 'api-cache'
+HITS_KEY = f'{KEY_PREFIX}:stats:hits'
+MISSES_KEY = f'{KEY_PREFIX}:stats:misses'
+
+
+def get_cache():
+    return caches[API_CACHE_ALIAS]
+
+
+def _version_key(scope):
+    return f'{KEY_PREFIX}:version:{scope}'
+
+
+def get_versions(scopes):
+    """Возвращает текущие версии областей, создавая недостающие."""
+    cache = get_cache()
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def invalidate(*scopes):
+    # Версия — метка времени, а не счетчик: после вытеснения ключа из кэша
+    # новая версия не совпадет ни с одной из прежних
+    get_cache().set_many(
+        {_version_key(scope): time.time_ns() for scope in scopes}, None
+    )
+
+
+def _increment(key):
+    cache = get_cache()
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def get_stats():
+    """Счетчики попаданий и промахов для подбора размера кэша."""
+    counters = get_cache().get_many([HITS_KEY, MISSES_KEY])
+    hits = counters.get(HITS_KEY, 0)
+    misses = counters.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
+
+
+def reset_stats():
+    get_cache().delete_many([HITS_KEY, MISSES_KEY])
+
+
+class CachedResponseMixin:
+    """Кэширует ответы безопасных действий вьюсета.
+
+    Вьюсет перечисляет действия в ``cache_actions`` и возвращает области
+    инвалидации из ``get_cache_scopes()``.
+    """
+    cache_actions = ('list', 'retrieve')
+    # Включить, если данные ответа зависят от конкретного пользователя
+    cache_vary_on_user = False
+
+    def get_cache_scopes(self):
+        raise NotImplementedError(
+            '`get_cache_scopes()` must be implemented.'
+        )
+
+    def get_cache_key(self, request):
+        user = request.user
+        parts = [
+            *map(str, get_versions(self.get_cache_scopes())),
+            # Абсолютные ссылки (например, на изображения) зависят от хоста
+            request.get_host(),
+            request.get_full_path(),
+            # Права на чтение и набор данных зависят от аутентификации
+            str(user.pk if self.cache_vary_on_user else
+                user.is_authenticated),
+        ]
+        digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+        return f'{KEY_PREFIX}:{self.basename}:{self.action}:{digest}'
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if (self.action not in self.cache_actions
+                or getattr(self, 'read_pinned', False)):
+            return handler(request, *args, **kwargs)
+        cache = get_cache()
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        cache_lookup('response', data is not None)
+        if data is not None:
+            _increment(HITS_KEY)
+            return Response(data, headers={'X-Cache': 'HIT'})
+        _increment(MISSES_KEY)
+        with primary_reads():
+            response = handler(request, *args, **kwargs)
+        # Потоковые ответы (см. api.streaming) не кэшируются
+        if (response.status_code == status.HTTP_200_OK
+                and not response.streaming):
+            cache.set(key, response.data, API_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
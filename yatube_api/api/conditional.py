@@ -0,0 +1,96 @@
+"""Условные GET-запросы: ETag, Last-Modified и ответ 304.
+
+Валидаторы считаются по индексированному полю ``updated`` одним
+запросом MAX(), без сериализации и хеширования тела ответа. Удаления
+не меняют максимум, поэтому в ETag входят версии областей из кэша
+ответов (см. ``api.cache``), которые сигналы меняют при удалении.
+
+Ответ 304 решается по валидаторам основной базы. Если тело ответа
+прочитано из реплики (а не из кэша ответов), его ETag и Last-Modified
+считаются по той же реплике: валидатор описывает отданные данные, и
+отставшая реплика не может подтвердить клиенту устаревшую копию.
+"""
+import hashlib
+
+from django.db.models import Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from api.cache import get_versions
+from api.replicas import primary_reads, read_alias
+
+
+class ConditionalGetMixin:
+    conditional_actions = ('list', 'retrieve')
+    last_modified_field = 'updated'
+
+    def get_conditional_scopes(self):
+        return []
+
+    def get_validators(self, request):
+        """Возвращает пару (etag, last_modified) или None."""
+        field = self.last_modified_field
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'list':
+            last_modified = queryset.aggregate(
+                last_modified=Max(field)
+            )['last_modified']
+        else:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            last_modified = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            ).values_list(field, flat=True).first()
+            if last_modified is None:
+                return None  # 404 вернет основной обработчик
+        source = '|'.join((
+            request.get_full_path(),
+            last_modified.isoformat() if last_modified else '',
+            *map(str, get_versions(self.get_conditional_scopes())),
+            str(request.user.is_authenticated),
+        ))
+        etag = '"%s"' % hashlib.md5(source.encode()).hexdigest()
+        return etag, last_modified
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        if self.action not in self.conditional_actions:
+            return handler(request, *args, **kwargs)
+        with primary_reads():
+            validators = self.get_validators(request)
+        if validators is None:
+            return handler(request, *args, **kwargs)
+        etag, last_modified = validators
+        response = get_conditional_response(
+            request._request, etag=etag,
+            last_modified=self._timestamp(last_modified)
+        )
+        if response is not None:
+            return self._set_validators(response, etag, last_modified)
+        response = handler(request, *args, **kwargs)
+        # Ответ из кэша (api.cache) уже прочитан из основной базы
+        if read_alias() is not None and not response.has_header('X-Cache'):
+            validators = self.get_validators(request)
+            if validators is None:
+                return response
+            etag, last_modified = validators
+        return self._set_validators(response, etag, last_modified)
+
+    @staticmethod
+    def _timestamp(last_modified):
+        return int(last_modified.timestamp()) if last_modified else None
+
+    def _set_validators(self, response, etag, last_modified):
+        timestamp = self._timestamp(last_modified)
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -0,0 +1,63 @@
+"""Настройка соединений SQLite и повтор записи при блокировке базы.
+
+PRAGMA из ``SQLITE_PRAGMAS`` выполняются для каждого нового соединения
+(сигнал ``connection_created``). Даже с busy timeout SQLite сразу
+возвращает ``database is locked``, если транзакция, уже прочитавшая
+данные, пытается начать запись, пока пишет другой процесс. Такие записи
+повторяются целиком с экспоненциальной задержкой.
+"""
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+
+SQLITE_PRAGMAS = getattr(settings, 'SQLITE_PRAGMAS', {})
+DATABASE_LOCK_RETRIES = getattr(settings, 'DATABASE_LOCK_RETRIES', 8)
+DATABASE_LOCK_BACKOFF = getattr(settings, 'DATABASE_LOCK_BACKOFF', 0.05)
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_lock_error(exc):
+    message = str(exc).lower()
+    return 'database is locked' in message or 'database is busy' in message
+
+
+def run_with_retry(func, *args, **kwargs):
+    """Выполняет ``func`` в транзакции, повторяя ее при блокировке."""
+    for attempt in range(DATABASE_LOCK_RETRIES + 1):
+        try:
+            with transaction.atomic():
+                return func(*args, **kwargs)
+        except OperationalError as exc:
+            # Внутри внешней транзакции повтор не отменит ее чтения
+            if (not is_lock_error(exc)
+                    or attempt == DATABASE_LOCK_RETRIES
+                    or connection.in_atomic_block):
+                raise
+            delay = DATABASE_LOCK_BACKOFF * 2 ** attempt
+            time.sleep(delay * random.uniform(0.5, 1.5))
+
+
+class LockRetryMixin:
+    """Повторяет create/update/destroy вьюсета при блокировке базы.
+
+    Данные запроса DRF разбирает один раз, поэтому каждая попытка заново
+    проходит валидацию и запись с новым сериализатором.
+    """
+
+    def create(self, request, *args, **kwargs):
+        return run_with_retry(super().create, request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        return run_with_retry(super().update, request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        return run_with_retry(super().destroy, request, *args, **kwargs)
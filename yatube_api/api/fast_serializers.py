@@ -0,0 +1,206 @@
+"""Быстрая сериализация списков для чтения.
+
+``FastListSerializer`` один раз разбирает поля дочернего сериализатора
+в «план»: какой столбец прочитать и как преобразовать значение. Для
+``QuerySet`` строки читаются через ``values()`` (автор подтягивается
+соединением ``author__username``), для списка объектов — прямым доступом
+к атрибутам. Результат совпадает с ответом обычного сериализатора побайтно.
+Если среди полей есть неподдерживаемые, используется обычный путь DRF.
+"""
+from collections import OrderedDict
+from operator import attrgetter
+
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.db import models
+from rest_framework import serializers
+
+from api.instrumentation import TimedSerializerMixin
+
+
+class UnsupportedField(Exception):
+    pass
+
+
+class _Row:
+    """Строка ``values()`` с доступом к значениям как к атрибутам."""
+    __slots__ = ('_values',)
+
+    def __init__(self, values):
+        self._values = values
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+def _not_none(convert):
+    # Как и Serializer.to_representation, None не преобразуем
+    def wrapper(value):
+        return None if value is None else convert(value)
+    return wrapper
+
+
+class FieldPlan:
+    __slots__ = ('name', 'columns', 'from_row', 'from_instance')
+
+    def __init__(self, name, columns, from_row, from_instance):
+        self.name = name
+        self.columns = columns
+        self.from_row = from_row
+        self.from_instance = from_instance
+
+
+def _model_field(model, source):
+    try:
+        return model._meta.get_field(source)
+    except Exception:
+        raise UnsupportedField(source)
+
+
+def _plan_method_field(serializer, name, field):
+    columns = getattr(serializer, 'fast_read_columns', {}).get(name)
+    if columns is None:
+        raise UnsupportedField(name)
+    method = getattr(serializer, field.method_name)
+    return FieldPlan(
+        name, tuple(columns),
+        lambda row: method(_Row(row)),
+        method,
+    )
+
+
+def _plan_primary_key(name, field, model_field):
+    column = model_field.attname
+    convert = (
+        field.pk_field.to_representation if field.pk_field
+        else (lambda value: value)
+    )
+    convert = _not_none(convert)
+    get = attrgetter(column)
+    return FieldPlan(
+        name, (column,),
+        lambda row: convert(row[column]),
+        lambda obj: convert(get(obj)),
+    )
+
+
+def _plan_string_related(name, source, model_field):
+    related = model_field.related_model
+    # str(user) для стандартного пользователя — это его username
+    if related.__str__ is not AbstractBaseUser.__str__:
+        raise UnsupportedField(name)
+    column = f'{source}__{related.USERNAME_FIELD}'
+    get = attrgetter(f'{source}.{related.USERNAME_FIELD}')
+    return FieldPlan(
+        name, (column,),
+        lambda row: row[column],
+        lambda obj: get(obj) if getattr(obj, source) else None,
+    )
+
+
+def _plan_file(serializer, name, field, source, model_field):
+    storage = model_field.storage
+    request = serializer.context.get('request')
+    use_url = getattr(field, 'use_url', True)
+
+    def convert(file_name):
+        if not file_name:
+            return None
+        if not use_url:
+            return file_name
+        url = storage.url(file_name)
+        return request.build_absolute_uri(url) if request else url
+
+    get = attrgetter(source)
+    return FieldPlan(
+        name, (source,),
+        lambda row: convert(row[source]),
+        lambda obj: convert(get(obj).name),
+    )
+
+
+SIMPLE_FIELDS = (
+    serializers.IntegerField,
+    serializers.CharField,
+    serializers.BooleanField,
+    serializers.FloatField,
+    serializers.DateTimeField,
+    serializers.DateField,
+    serializers.JSONField,
+    serializers.ReadOnlyField,
+)
+
+
+def _plan_simple(name, field, source):
+    if type(field) not in SIMPLE_FIELDS:
+        raise UnsupportedField(name)
+    convert = _not_none(field.to_representation)
+    get = attrgetter(source)
+    return FieldPlan(
+        name, (source,),
+        lambda row: convert(row[source]),
+        lambda obj: convert(get(obj)),
+    )
+
+
+def _plan_field(serializer, name, field):
+    if isinstance(field, serializers.SerializerMethodField):
+        return _plan_method_field(serializer, name, field)
+    source = field.source
+    if '.' in source or source == '*':
+        raise UnsupportedField(name)
+    model_field = _model_field(serializer.Meta.model, source)
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        return _plan_primary_key(name, field, model_field)
+    if isinstance(field, serializers.StringRelatedField):
+        return _plan_string_related(name, source, model_field)
+    if isinstance(field, serializers.FileField):
+        return _plan_file(serializer, name, field, source, model_field)
+    if isinstance(field, serializers.RelatedField) or isinstance(
+            model_field, models.ForeignObjectRel):
+        raise UnsupportedField(name)
+    return _plan_simple(name, field, source)
+
+
+def build_plan(serializer):
+    """Возвращает план чтения полей или None, если путь не применим."""
+    try:
+        return [
+            _plan_field(serializer, field.field_name, field)
+            for field in serializer._readable_fields
+        ]
+    except UnsupportedField:
+        return None
+
+
+class FastListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+
+    def get_plan(self):
+        if not hasattr(self, '_plan'):
+            self._plan = build_plan(self.child)
+        return self._plan
+
+    def to_representation(self, data):
+        plan = self.get_plan()
+        if plan is None:
+            return super().to_representation(data)
+        if isinstance(data, models.Manager):
+            data = data.all()
+        if isinstance(data, models.QuerySet) and data._result_cache is None:
+            columns = OrderedDict.fromkeys(
+                column for field in plan for column in field.columns
+            )
+            return [
+                OrderedDict(
+                    (field.name, field.from_row(row)) for field in plan
+                )
+                for row in data.values(*columns)
+            ]
+        return [
+            OrderedDict(
+                (field.name, field.from_instance(item)) for field in plan
+            )
+            for item in data
+        ]
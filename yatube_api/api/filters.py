@@ -0,0 +1,125 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from posts.models import Group
+from posts.search import search_posts
+from posts.user_search import search_follows
+
+User = get_user_model()
+
+
+def _parse_moment(value):
+    """Дата и время ISO 8601 или дата (начало суток по UTC)."""
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            moment = day and datetime.datetime.combine(day, datetime.time())
+    except ValueError:
+        moment = None
+    if moment is not None and timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, datetime.timezone.utc)
+    return moment
+
+
+class PostFilter(BaseFilterBackend):
+    """Фильтры публикаций по группе, автору и дате публикации.
+
+    Параметры: ``?group=<slug>``, ``?author=<username>``, ``?since=`` и
+    ``?until=`` (полуинтервал ``[since, until)``). Группа и автор сначала
+    находятся по уникальному индексу, а публикации выбираются по
+    ``group_id``/``author_id``: диапазон по составному индексу
+    ``(group, -pub_date, -id)`` или ``(author, -pub_date, -id)`` в том же
+    порядке, что и сортировка курсора. Вложенные маршруты
+    ``/groups/{group_id}/posts/`` и ``/users/{username}/posts/`` передают
+    группу и автора в ``view.kwargs``; неизвестные группа или автор в пути
+    дают 404, а в параметрах — пустой список.
+    """
+    group_param = 'group'
+    author_param = 'author'
+    since_param = 'since'
+    until_param = 'until'
+
+    def get_group_id(self, request, view):
+        if 'group_id' in view.kwargs:
+            group_id = int(view.kwargs['group_id'])
+            # Номер вне диапазона BIGINT база не принимает в запросе
+            if (not 0 < group_id < 2 ** 63
+                    or not Group.objects.filter(pk=group_id).exists()):
+                raise NotFound('Группа не найдена.')
+            return group_id
+        slug = request.query_params.get(self.group_param)
+        if not slug:
+            return None
+        return Group.objects.filter(slug=slug).values_list(
+            'pk', flat=True).first() or 0
+
+    def get_author_id(self, request, view):
+        if 'username' in view.kwargs:
+            author_id = User.objects.filter(
+                username=view.kwargs['username']
+            ).values_list('pk', flat=True).first()
+            if author_id is None:
+                raise NotFound('Пользователь не найден.')
+            return author_id
+        username = request.query_params.get(self.author_param)
+        if not username:
+            return None
+        return User.objects.filter(username=username).values_list(
+            'pk', flat=True).first() or 0
+
+    def get_moment(self, request, param):
+        value = request.query_params.get(param)
+        if not value:
+            return None
+        moment = _parse_moment(value)
+        if moment is None:
+            raise ValidationError({
+                param: 'Ожидается дата или дата и время в формате ISO 8601.'
+            })
+        return moment
+
+    def filter_queryset(self, request, queryset, view):
+        group_id = self.get_group_id(request, view)
+        author_id = self.get_author_id(request, view)
+        since = self.get_moment(request, self.since_param)
+        until = self.get_moment(request, self.until_param)
+        # 0 — несуществующий id: пустой результат без лишнего запроса
+        if group_id == 0 or author_id == 0:
+            return queryset.none()
+        if group_id is not None:
+            queryset = queryset.filter(group_id=group_id)
+        if author_id is not None:
+            queryset = queryset.filter(author_id=author_id)
+        if since is not None:
+            queryset = queryset.filter(pub_date__gte=since)
+        if until is not None:
+            queryset = queryset.filter(pub_date__lt=until)
+        return queryset
+
+
+class PostSearchFilter(BaseFilterBackend):
+    """Полнотекстовый поиск ``?search=`` с сортировкой по релевантности."""
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return search_posts(queryset, query)
+
+
+class FollowSearchFilter(BaseFilterBackend):
+    """Поиск ``?search=`` по имени автора через индекс имен."""
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return search_follows(queryset, query)
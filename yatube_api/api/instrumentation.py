@@ -0,0 +1,203 @@
+"""Замеры производительности запросов: SQL, сериализация, рендеринг.
+
+``performance_middleware`` для доли запросов ``PERFORMANCE_SAMPLE_RATE``
+создает ``RequestMetrics`` в контекстной переменной. Запросы к базе
+считает обертка ``execute_wrapper``, подключаемая к каждому соединению;
+сериализацию и рендеринг замеряют ``TimedSerializerMixin`` и
+``TimedRendererMixin``. Контекстная переменная переходит в потоки
+``sync_to_async``, поэтому замеры работают и под ASGI. Для запросов вне
+выборки обертки только проверяют переменную.
+
+Итог отдается заголовком ``Server-Timing`` и строкой JSON в логгер
+``api.performance``. Если включены метрики (``api.metrics``), число и
+общее время всех запросов попадают в ``/metrics``, а гистограммы SQL —
+только по запросам из выборки: накладные расходы замеров ограничивает
+``PERFORMANCE_SAMPLE_RATE``.
+"""
+import asyncio
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework import serializers
+
+from api import metrics as exported_metrics
+
+PERFORMANCE_SAMPLE_RATE = getattr(settings, 'PERFORMANCE_SAMPLE_RATE', 0.05)
+
+logger = logging.getLogger('api.performance')
+
+_metrics = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db', 'serialize', 'render')
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.render = 0.0
+
+
+def get_metrics():
+    return _metrics.get()
+
+
+@contextmanager
+def timed(name):
+    metrics = _metrics.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(metrics, name,
+                getattr(metrics, name) + time.perf_counter() - started)
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = _metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db += time.perf_counter() - started
+        metrics.queries += 1
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    # Сигнал приходит при каждом переподключении той же обертки соединения
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedSerializerMixin:
+    """Учитывает построение ``serializer.data`` как время сериализации."""
+
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+class TimedRendererMixin:
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed('render'):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+def view_name(request):
+    """Имя обработчика, например ``PostViewSet.list``."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    func = match.func
+    view_class = getattr(func, 'cls', None) or getattr(
+        func, 'view_class', None)
+    if view_class is None:
+        return match._func_path
+    method = request.method.lower()
+    actions = getattr(func, 'actions', None) or {}
+    # DRF обрабатывает HEAD действием GET
+    action = actions.get(method) or actions.get('get' if method == 'head'
+                                                else method)
+    return f'{view_class.__name__}.{action or method}'
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+def report(request, response, metrics, total):
+    response['Server-Timing'] = ', '.join((
+        f'db;dur={_ms(metrics.db)};desc="{metrics.queries} queries"',
+        f'serialize;dur={_ms(metrics.serialize)}',
+        f'render;dur={_ms(metrics.render)}',
+        f'total;dur={_ms(total)}',
+    ))
+    logger.info(json.dumps({
+        'view': view_name(request),
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'queries': metrics.queries,
+        'db_ms': _ms(metrics.db),
+        'serialize_ms': _ms(metrics.serialize),
+        'render_ms': _ms(metrics.render),
+        'total_ms': _ms(total),
+    }))
+
+
+def _sampled():
+    return (PERFORMANCE_SAMPLE_RATE >= 1
+            or random.random() < PERFORMANCE_SAMPLE_RATE)
+
+
+def _finish(request, response, metrics, started):
+    """Итог запроса; ``metrics`` — None для запросов вне выборки."""
+    total = time.perf_counter() - started
+    if exported_metrics.METRICS_ENABLED:
+        exported_metrics.observe_request(request, response, total, metrics)
+    if metrics is not None:
+        report(request, response, metrics, total)
+
+
+@sync_and_async_middleware
+def performance_middleware(get_response):
+    """Замеряет долю ``PERFORMANCE_SAMPLE_RATE`` запросов.
+
+    При включенных метриках у запросов вне выборки засекается только
+    общее время: обертки SQL и сериализации для них не работают.
+    """
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            if not _sampled():
+                if not exported_metrics.METRICS_ENABLED:
+                    return await get_response(request)
+                started = time.perf_counter()
+                response = await get_response(request)
+                _finish(request, response, None, started)
+                return response
+            metrics = RequestMetrics()
+            token = _metrics.set(metrics)
+            started = time.perf_counter()
+            try:
+                response = await get_response(request)
+            finally:
+                _metrics.reset(token)
+            _finish(request, response, metrics, started)
+            return response
+    else:
+        def middleware(request):
+            if not _sampled():
+                if not exported_metrics.METRICS_ENABLED:
+                    return get_response(request)
+                started = time.perf_counter()
+                response = get_response(request)
+                _finish(request, response, None, started)
+                return response
+            metrics = RequestMetrics()
+            token = _metrics.set(metrics)
+            started = time.perf_counter()
+            try:
+                response = get_response(request)
+            finally:
+                _metrics.reset(token)
+            _finish(request, response, metrics, started)
+            return response
+    return middleware
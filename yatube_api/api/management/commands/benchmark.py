@@ -0,0 +1,56 @@
+import json
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand
+
+from benchmarks import dataset, suite
+from benchmarks.utils import temporary_database
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет эндпоинты API на временной базе заданного масштаба и '
+        'сохраняет задержки, число SQL-запросов и память в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', choices=dataset.SCALES, default='1k',
+            help='Масштаб данных: число публикаций.',
+        )
+        parser.add_argument(
+            '--posts', type=int,
+            help='Число публикаций вместо значения масштаба.',
+        )
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--driver', choices=suite.DRIVERS, action='append',
+            help='client или wsgi; по умолчанию оба.',
+        )
+        parser.add_argument(
+            '--case', action='append',
+            help='Префикс имени эндпоинта, например posts или jwt_.',
+        )
+        parser.add_argument('--output', help='Файл для результатов JSON.')
+        parser.add_argument(
+            '--compare', help='JSON прошлого запуска для сравнения.',
+        )
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            # Файл, а не база в памяти: WSGI-сервер работает в своем потоке
+            with temporary_database(
+                    name=os.path.join(directory, 'benchmark.sqlite3')):
+                results = suite.run(options, write=self.stdout.write)
+        if options['output']:
+            suite.dump(results, options['output'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Результаты записаны в {options['output']}."
+            ))
+        if options['compare']:
+            with open(options['compare']) as file:
+                suite.compare(json.load(file), results,
+                              write=self.stdout.write)
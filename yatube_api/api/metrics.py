@@ -0,0 +1,404 @@
+"""Метрики API в текстовом формате Prometheus (``GET /metrics``).
+
+Каждый процесс пишет значения в собственный файл ``<pid>.metrics`` в
+каталоге ``METRICS_DIR``, отображенный в память (``mmap``): запись — это
+сложение числа по известному смещению без системных вызовов. Обработчик
+``/metrics`` в любом воркере читает файлы всех процессов и суммирует их,
+поэтому результат общий для всех воркеров без внешнего агента.
+
+Формат файла: заголовок из 8 байт (занятый размер), затем записи «длина
+ключа, ключ в JSON, выравнивание до 8 байт, значение double». Новая запись
+сначала дописывается, а затем увеличивается занятый размер, поэтому
+читатель никогда не видит недописанную запись.
+
+Файлы завершившихся процессов (прошлый запуск сервера, перезапущенный
+воркер) не суммируются и удаляются, когда новый процесс создает свой
+файл, как ``mark_process_dead`` в prometheus_client. Сумма счетчиков при
+этом уменьшается, и Prometheus считает это сбросом счетчика, как после
+перезапуска. Процесс проверяется по pid, поэтому каталог должен быть
+свой у каждого узла или контейнера.
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import HttpResponse
+
+METRICS_ENABLED = getattr(settings, 'METRICS_ENABLED', True)
+METRICS_DIR = getattr(
+    settings, 'METRICS_DIR',
+    os.path.join(tempfile.gettempdir(), 'yatube-metrics')
+)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_HEADER = struct.Struct('<Q')
+_KEY_LENGTH = struct.Struct('<I')
+_VALUE = struct.Struct('<d')
+INITIAL_SIZE = 64 * 1024
+
+
+def _padded(length):
+    # Значение double начинается с границы 8 байт
+    return length + (-(_KEY_LENGTH.size + length) % 8)
+
+
+def _entries(data, used):
+    """Перебирает записи файла: (ключ, значение, смещение значения)."""
+    position = _HEADER.size
+    while position < used:
+        length, = _KEY_LENGTH.unpack_from(data, position)
+        position += _KEY_LENGTH.size
+        key = bytes(data[position:position + length]).decode()
+        position += _padded(length)
+        value, = _VALUE.unpack_from(data, position)
+        yield key, value, position
+        position += _VALUE.size
+
+
+class MmapValues:
+    """Значения метрик одного процесса в файле, отображенном в память."""
+
+    def __init__(self, path):
+        # Файл с тем же pid остался от завершенного процесса
+        self._file = open(path, 'w+b')
+        self._file.truncate(INITIAL_SIZE)
+        self._mmap = mmap.mmap(self._file.fileno(), INITIAL_SIZE)
+        self._used = _HEADER.size
+        _HEADER.pack_into(self._mmap, 0, self._used)
+        self._positions = {}
+
+    def _grow(self, required):
+        size = len(self._mmap)
+        while size < required:
+            size *= 2
+        self._mmap.close()
+        self._file.truncate(size)
+        self._mmap = mmap.mmap(self._file.fileno(), size)
+
+    def _append(self, key):
+        encoded = key.encode()
+        position = self._used + _KEY_LENGTH.size + _padded(len(encoded))
+        end = position + _VALUE.size
+        if end > len(self._mmap):
+            self._grow(end)
+        _KEY_LENGTH.pack_into(self._mmap, self._used, len(encoded))
+        start = self._used + _KEY_LENGTH.size
+        self._mmap[start:start + len(encoded)] = encoded
+        _VALUE.pack_into(self._mmap, position, 0.0)
+        self._used = end
+        _HEADER.pack_into(self._mmap, 0, end)
+        self._positions[key] = position
+        return position
+
+    def increment(self, key, amount):
+        position = self._positions.get(key)
+        if position is None:
+            position = self._append(key)
+        value, = _VALUE.unpack_from(self._mmap, position)
+        _VALUE.pack_into(self._mmap, position, value + amount)
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+
+def _file_pid(name):
+    stem, _, extension = name.partition('.')
+    if extension != 'metrics' or not stem.isdigit():
+        return None
+    return int(stem)
+
+
+def is_alive(pid):
+    if os.name == 'nt':
+        # os.kill в Windows завершает процесс, а не проверяет его
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Процесс есть, но принадлежит другому пользователю
+        return True
+    return True
+
+
+def read_file(path):
+    with open(path, 'rb') as file:
+        data = file.read()
+    if len(data) < _HEADER.size:
+        return
+    used, = _HEADER.unpack_from(data, 0)
+    for key, value, _ in _entries(data, min(used, len(data))):
+        yield key, value
+
+
+class MetricsStore:
+    """Файлы значений всех процессов в одном каталоге."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._values = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _process_values(self):
+        # После fork воркер должен писать в собственный файл
+        pid = os.getpid()
+        if self._pid != pid:
+            os.makedirs(self.directory, exist_ok=True)
+            self.prune()
+            self._values = MmapValues(
+                os.path.join(self.directory, f'{pid}.metrics')
+            )
+            self._pid = pid
+        return self._values
+
+    def increment_many(self, amounts):
+        with self._lock:
+            values = self._process_values()
+            for key, amount in amounts:
+                values.increment(key, amount)
+
+    def _files(self):
+        """Файлы и pid процессов, записавших их."""
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            pid = _file_pid(name)
+            if pid is not None:
+                yield name, pid
+
+    def prune(self):
+        """Удаляет файлы завершившихся процессов."""
+        for name, pid in self._files():
+            if pid != os.getpid() and not is_alive(pid):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+
+    def collect(self):
+        """Суммы значений по всем живым процессам."""
+        totals = defaultdict(float)
+        for name, pid in self._files():
+            if pid != os.getpid() and not is_alive(pid):
+                continue
+            try:
+                for key, value in read_file(
+                        os.path.join(self.directory, name)):
+                    totals[key] += value
+            except FileNotFoundError:
+                continue
+        return totals
+
+
+store = MetricsStore(METRICS_DIR)
+
+
+@lru_cache(maxsize=4096)
+def _key(sample, labels):
+    return json.dumps([sample, labels], ensure_ascii=False)
+
+
+def _escape(value):
+    return (value.replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'))
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{_escape(value)}"' for name, value in pairs
+    ) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def amounts(self, labels, amount=1):
+        return [(_key(self.name, labels), amount)]
+
+    def samples(self, values):
+        for labels, value in sorted(values.get(self.name, {}).items()):
+            yield self.name, zip(self.labelnames, labels), value
+
+
+class Histogram:
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._bounds = [_format_value(float(bound)) for bound in buckets]
+
+    def amounts(self, labels, value):
+        # В файле хранится число наблюдений в каждом интервале, а
+        # накопленные значения ``le`` считаются при выдаче
+        index = bisect_left(self.buckets, value)
+        bound = (self._bounds[index] if index < len(self.buckets)
+                 else '+Inf')
+        return [
+            (_key(f'{self.name}_bucket', (*labels, bound)), 1),
+            (_key(f'{self.name}_sum', labels), value),
+            (_key(f'{self.name}_count', labels), 1),
+        ]
+
+    def samples(self, values):
+        buckets = defaultdict(dict)
+        for labels, value in values.get(f'{self.name}_bucket', {}).items():
+            buckets[labels[:-1]][labels[-1]] = value
+        sums = values.get(f'{self.name}_sum', {})
+        counts = values.get(f'{self.name}_count', {})
+        for labels in sorted(counts):
+            pairs = list(zip(self.labelnames, labels))
+            cumulative = 0.0
+            for bound in (*self._bounds, '+Inf'):
+                cumulative += buckets[labels].get(bound, 0.0)
+                yield (f'{self.name}_bucket', [*pairs, ('le', bound)],
+                       cumulative)
+            yield f'{self.name}_sum', pairs, sums.get(labels, 0.0)
+            yield f'{self.name}_count', pairs, counts[labels]
+
+
+class CacheHitRatio:
+    """Доля попаданий, вычисляемая из счетчика обращений к кэшу."""
+    type = 'gauge'
+
+    def __init__(self, name, documentation, requests):
+        self.name = name
+        self.documentation = documentation
+        self.requests = requests
+
+    def samples(self, values):
+        results = defaultdict(dict)
+        for (cache, result), value in values.get(
+                self.requests.name, {}).items():
+            results[cache][result] = value
+        for cache, counts in sorted(results.items()):
+            total = sum(counts.values())
+            yield (self.name, [('cache', cache)],
+                   counts.get('hit', 0.0) / total if total else 0.0)
+
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+requests_total = Counter(
+    'yatube_http_requests_total',
+    'Число запросов по действию и коду ответа.',
+    ('view', 'status'),
+)
+request_duration = Histogram(
+    'yatube_http_request_duration_seconds',
+    'Время обработки запроса.',
+    ('view',), LATENCY_BUCKETS,
+)
+db_queries = Histogram(
+    'yatube_db_queries_per_request',
+    'Число SQL-запросов на один запрос к API (по выборке).',
+    ('view',), QUERY_BUCKETS,
+)
+db_duration = Histogram(
+    'yatube_db_duration_seconds',
+    'Суммарное время SQL-запросов на один запрос к API (по выборке).',
+    ('view',), LATENCY_BUCKETS,
+)
+cache_requests = Counter(
+    'yatube_cache_requests_total',
+    'Обращения к кэшам API: hit или miss.',
+    ('cache', 'result'),
+)
+cache_hit_ratio = CacheHitRatio(
+    'yatube_cache_hit_ratio',
+    'Доля попаданий в кэш.',
+    cache_requests,
+)
+
+METRICS = (
+    requests_total, request_duration, db_queries, db_duration,
+    cache_requests, cache_hit_ratio,
+)
+
+
+def action_label(request):
+    """Метка действия: ``posts.list``, ``comments.create``, ``jwt_create``."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        # Не плодим метки по произвольным адресам с ответом 404
+        return 'unmatched'
+    func = match.func
+    actions = getattr(func, 'actions', None)
+    basename = getattr(func, 'initkwargs', {}).get('basename')
+    if actions and basename:
+        method = request.method.lower()
+        action = actions.get(method) or actions.get(
+            'get' if method == 'head' else method)
+        return f'{basename}.{action or method}'
+    return match.url_name or match.view_name or match._func_path
+
+
+def observe_request(request, response, duration, sample=None):
+    """Учитывает запрос; ``sample`` — замеры SQL запроса из выборки."""
+    labels = (action_label(request),)
+    amounts = [
+        *requests_total.amounts((*labels, str(response.status_code))),
+        *request_duration.amounts(labels, duration),
+    ]
+    if sample is not None:
+        amounts += [
+            *db_queries.amounts(labels, sample.queries),
+            *db_duration.amounts(labels, sample.db),
+        ]
+    store.increment_many(amounts)
+
+
+def cache_lookup(cache, hit):
+    if METRICS_ENABLED:
+        store.increment_many(
+            cache_requests.amounts((cache, 'hit' if hit else 'miss'))
+        )
+
+
+def exposition():
+    values = defaultdict(dict)
+    for key, value in store.collect().items():
+        sample, labels = json.loads(key)
+        values[sample][tuple(labels)] = value
+    lines = []
+    for metric in METRICS:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.type}')
+        for sample, pairs, value in metric.samples(values):
+            lines.append(
+                f'{sample}{_format_labels(pairs)} {_format_value(value)}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    return HttpResponse(exposition(), content_type=CONTENT_TYPE)
@@ -0,0 +1,31 @@
+import asyncio
+
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework.permissions import SAFE_METHODS
+
+from api.replicas import pin_to_primary
+
+
+def _pin_after_write(request, response):
+    # DRF сохраняет аутентифицированного пользователя в request.user
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        pin_to_primary(request, response)
+
+
+@sync_and_async_middleware
+def replica_pinning_middleware(get_response):
+    """Закрепляет чтения за основной базой после успешной записи.
+
+    Поддерживает оба режима, чтобы под ASGI не добавлять переход в поток.
+    """
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            response = await get_response(request)
+            _pin_after_write(request, response)
+            return response
+    else:
+        def middleware(request):
+            response = get_response(request)
+            _pin_after_write(request, response)
+            return response
+    return middleware
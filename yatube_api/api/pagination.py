@@ -1,8 +1,228 @@
-from rest_framework.pagination import LimitOffsetPagination
+import base64
+import binascii
+import datetime
+import json
+import math
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Курсорная (keyset) пагинация по составному ключу сортировки.
+
+    Позиция курсора — значения всех полей сортировки последней/первой
+    записи страницы, поэтому следующая страница выбирается условием
+    ``(pub_date, id) < (x, y)`` по индексу, без OFFSET и без COUNT(*).
+    """
+    ordering = ('-pub_date', '-id')
+    page_size = api_settings.PAGE_SIZE or 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+        position, reverse = self.decode_cursor(request)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self._invert(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_position_filter(queryset, ordering, position)
+            )
+
+        # Берем на одну запись больше, чтобы узнать, есть ли еще страница
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, queryset, view):
+        # Явная сортировка выборки (например, по релевантности поиска)
+        # важнее ключа, заданного вьюсетом
+        ordering = queryset.query.order_by
+        if ordering and all(isinstance(field, str) for field in ordering):
+            return tuple(ordering)
+        # Вьюсет может задать собственный ключ сортировки
+        ordering = getattr(view, 'keyset_ordering', None) or self.ordering
+        return tuple(ordering)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[0]), True)
+
+    def get_position(self, instance):
+        return [
+            self._get_value(instance, field.lstrip('-'))
+            for field in self.ordering
+        ]
+
+    def get_position_filter(self, queryset, ordering, position):
+        # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y)
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            value = self._to_python(queryset.model, name, value)
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps(
+            {'p': [self._dump_value(value) for value in position],
+             'r': int(reverse)},
+            separators=(',', ':'),
+        )
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, 'limit')
+        url = remove_query_param(url, 'offset')
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position = payload['p']
+            reverse = bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if (not isinstance(position, list)
+                or len(position) != len(self.ordering)
+                or not all(map(self._is_scalar, position))):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def _to_python(self, model, name, value):
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Аннотации (например, ранг поиска) храним в курсоре как есть
+            return value
+        try:
+            return field.to_python(value)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _is_scalar(value):
+        # null, объекты и списки в позиции — признак подделанного курсора;
+        # числа вне 64 бит база не примет
+        if isinstance(value, bool):
+            return False
+        if isinstance(value, int):
+            return -2 ** 63 <= value < 2 ** 63
+        if isinstance(value, float):
+            return math.isfinite(value)
+        return isinstance(value, str)
+
+    @staticmethod
+    def _get_value(instance, name):
+        if isinstance(instance, dict):
+            return instance[name]
+        return getattr(instance, name)
+
+    @staticmethod
+    def _dump_value(value):
+        if isinstance(value, (datetime.datetime, datetime.date)):
+            return value.isoformat()
+        return value
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
 
 
 class ConditionalPagination(LimitOffsetPagination):
+    """Пагинация по запросу клиента.
+
+    * ``?page_size=`` или ``?cursor=`` — курсорная пагинация без COUNT(*);
+    * ``?limit=``/``?offset=`` — прежний режим LimitOffset для совместимости;
+    * без параметров — полный список, как и раньше.
+    """
+    keyset_class = KeysetPagination
+
+    def is_limit_offset(self, request):
+        params = request.query_params
+        return 'limit' in params or 'offset' in params
+
+    def is_keyset(self, request):
+        params = request.query_params
+        return (self.keyset_class.cursor_query_param in params
+                or self.keyset_class.page_size_query_param in params)
+
+    def wants_pagination(self, request):
+        return self.is_limit_offset(request) or self.is_keyset(request)
+
     def paginate_queryset(self, queryset, request, view=None):
-        if 'limit' in request.query_params or 'offset' in request.query_params:
+        self.keyset = None
+        if self.is_limit_offset(request):
             return super().paginate_queryset(queryset, request, view)
-        return None  # отключаем пагинацию, если нет limit/offset
+        if self.is_keyset(request):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return None  # отключаем пагинацию, если нет параметров
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,48 @@
+import json
+
+from rest_framework.compat import LONG_SEPARATORS, SHORT_SEPARATORS
+from rest_framework.renderers import (
+    BaseRenderer,
+    BrowsableAPIRenderer,
+    JSONRenderer,
+)
+
+from api.instrumentation import TimedRendererMixin
+
+
+def dumps(data):
+    """Сериализует данные побайтно так же, как ``JSONRenderer``."""
+    content = json.dumps(
+        data,
+        cls=JSONRenderer.encoder_class,
+        ensure_ascii=JSONRenderer.ensure_ascii,
+        allow_nan=not JSONRenderer.strict,
+        separators=(
+            SHORT_SEPARATORS if JSONRenderer.compact else LONG_SEPARATORS
+        ),
+    )
+    # Как и JSONRenderer, экранируем разделители строк для JavaScript
+    content = content.replace('\u2028', '\\u2028')
+    content = content.replace('\u2029', '\\u2029')
+    return content.encode()
+
+
+class TimedJSONRenderer(TimedRendererMixin, JSONRenderer):
+    pass
+
+
+class TimedBrowsableAPIRenderer(TimedRendererMixin, BrowsableAPIRenderer):
+    pass
+
+
+class NDJSONRenderer(TimedRendererMixin, BaseRenderer):
+    """Newline-delimited JSON: по одному объекту на строку."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return b''.join(dumps(row) + b'\n' for row in rows)
@@ -0,0 +1,176 @@
+"""Чтение из реплик базы данных с «прилипанием» к основной после записи.
+
+Вьюсеты с ``ReplicaReadMixin`` отмечают безопасные запросы (GET, HEAD,
+OPTIONS), и ``ReplicaRouter`` направляет их чтения в реплику, выбранную
+по весам из ``DATABASE_REPLICAS``. Недоступная реплика исключается из
+выбора на ``REPLICA_RETRY_SECONDS``. После записи
+``replica_pinning_middleware`` закрепляет чтения пользователя за основной
+базой на ``REPLICA_PIN_SECONDS`` — через cookie и через кэш по id
+пользователя, — чтобы он сразу видел собственные изменения. Закрепления
+хранятся в кэше ``REPLICA_PIN_CACHE_ALIAS``: при нескольких воркерах он
+должен быть общим, иначе закрепление видно только записавшему воркеру.
+
+Кэш ответов и валидаторы условных запросов (``api.cache``,
+``api.conditional``) читают базу через ``primary_reads()``, чтобы отставшая
+реплика не попала в кэш и не подтвердила ответом 304 устаревшие данные.
+"""
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+DATABASE_REPLICAS = getattr(settings, 'DATABASE_REPLICAS', {})
+REPLICA_PIN_SECONDS = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+REPLICA_PIN_COOKIE = 'primary_pin'
+REPLICA_PIN_CACHE_ALIAS = getattr(settings, 'REPLICA_PIN_CACHE_ALIAS',
+                                  'default')
+# Период проверки доступности и время исключения упавшей реплики
+REPLICA_CHECK_SECONDS = getattr(settings, 'REPLICA_CHECK_SECONDS', 10)
+REPLICA_RETRY_SECONDS = getattr(settings, 'REPLICA_RETRY_SECONDS', 30)
+
+# Псевдоним реплики для чтений текущего запроса (None — основная база)
+_read_alias = ContextVar('replica_read_alias', default=None)
+
+
+class ReplicaPool:
+    """Взвешенный выбор реплики с учетом ее доступности."""
+
+    def __init__(self, weights):
+        self.weights = dict(weights)
+        self._checked = {}
+        self._down_until = {}
+        self._lock = threading.Lock()
+
+    def check(self, alias):
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return True
+        except Exception:
+            return False
+
+    def is_healthy(self, alias):
+        now = time.monotonic()
+        with self._lock:
+            if self._down_until.get(alias, 0) > now:
+                return False
+            if now - self._checked.get(alias, -REPLICA_CHECK_SECONDS) < (
+                    REPLICA_CHECK_SECONDS):
+                return True
+            self._checked[alias] = now
+        healthy = self.check(alias)
+        if not healthy:
+            self.mark_down(alias)
+        return healthy
+
+    def mark_down(self, alias):
+        with self._lock:
+            self._down_until[alias] = (
+                time.monotonic() + REPLICA_RETRY_SECONDS
+            )
+
+    def choose(self):
+        """Возвращает псевдоним реплики или None, если доступных нет."""
+        aliases = [
+            alias for alias, weight in self.weights.items()
+            if weight > 0 and self.is_healthy(alias)
+        ]
+        if not aliases:
+            return None
+        weights = [self.weights[alias] for alias in aliases]
+        return random.choices(aliases, weights)[0]
+
+
+pool = ReplicaPool(DATABASE_REPLICAS)
+
+
+def _pin_key(user_id):
+    return f'replica:pin:{user_id}'
+
+
+def pin_to_primary(request, response):
+    """Закрепляет чтения автора записи за основной базой."""
+    response.set_cookie(
+        REPLICA_PIN_COOKIE, '1',
+        max_age=REPLICA_PIN_SECONDS, httponly=True, samesite='Lax'
+    )
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        # Клиенты API часто не хранят cookie
+        caches[REPLICA_PIN_CACHE_ALIAS].set(
+            _pin_key(user.pk), True, REPLICA_PIN_SECONDS
+        )
+
+
+def is_pinned(request):
+    if REPLICA_PIN_COOKIE in request.COOKIES:
+        return True
+    user = request.user
+    return user.is_authenticated and bool(
+        caches[REPLICA_PIN_CACHE_ALIAS].get(_pin_key(user.pk))
+    )
+
+
+def read_alias():
+    """Реплика, из которой читает текущий запрос, или None."""
+    return _read_alias.get()
+
+
+@contextmanager
+def primary_reads():
+    """Чтения внутри блока идут в основную базу."""
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaReadMixin:
+    """Читает безопасные запросы из реплики, если пользователь не закреплен."""
+    # Пользователь недавно писал: кэш ответов его чтения не обслуживает
+    read_pinned = False
+
+    def dispatch(self, request, *args, **kwargs):
+        # Выбор реплики действует только до конца запроса
+        token = _read_alias.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Пользователь уже аутентифицирован: проверяем закрепление
+        if DATABASE_REPLICAS and request.method in SAFE_METHODS:
+            self.read_pinned = is_pinned(request)
+            if not self.read_pinned:
+                _read_alias.set(pool.choose())
+
+
+class ReplicaRouter:
+    """Чтения отмеченных запросов — в реплику, запись — в основную базу."""
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        # Внутри транзакции читаем то же, что пишем
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему вместе с данными основной базы
+        return db not in DATABASE_REPLICAS
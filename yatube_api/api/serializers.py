@@ -1,34 +1,87 @@
+from django.conf import settings
 from rest_framework import serializers
+from api.fast_serializers import FastListSerializer
+from api.instrumentation import TimedListSerializer, TimedSerializerMixin
+from api.sparse import SparseFieldsSerializerMixin
+from posts.images import variant_url
 from posts.models import Post, Group, Comment, Follow
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+FOLLOW_BATCH_LIMIT = getattr(settings, 'FOLLOW_BATCH_LIMIT', 100)
+COMMENT_BATCH_POSTS = getattr(settings, 'COMMENT_BATCH_POSTS', 100)
+COMMENT_BATCH_LIMIT = getattr(settings, 'COMMENT_BATCH_LIMIT', 20)
+SYNC_PAGE_SIZE = getattr(settings, 'SYNC_PAGE_SIZE', 500)
+SYNC_MAX_PAGE_SIZE = getattr(settings, 'SYNC_MAX_PAGE_SIZE', 5000)
 
-class PostSerializer(serializers.ModelSerializer):
-    author = serializers.StringRelatedField(read_only=True)
+
+class AuthorSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Автор, встроенный в публикацию или комментарий (``?expand=author``)."""
 
     class Meta:
-        model = Post
-        fields = '__all__'
+        model = User
+        fields = ('id', 'username', 'first_name', 'last_name')
 
 
-class GroupSerializer(serializers.ModelSerializer):
+class GroupSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Group
         fields = '__all__'
+        list_serializer_class = TimedListSerializer
+
+
+class PostSerializer(SparseFieldsSerializerMixin, TimedSerializerMixin,
+                     serializers.ModelSerializer):
+    author = serializers.StringRelatedField(read_only=True)
+    image_variants = serializers.SerializerMethodField()
+    # Столбцы, которые читает get_image_variants на быстром пути списков
+    fast_read_columns = {'image_variants': ('image_variants',)}
+    expandable_fields = {
+        'author': AuthorSerializer,
+        'group': GroupSerializer,
+    }
+
+    class Meta:
+        model = Post
+        fields = '__all__'
+        list_serializer_class = FastListSerializer
+
+    def get_image_variants(self, obj):
+        # Варианты появляются после фоновой обработки изображения
+        request = self.context.get('request')
+        return {
+            name: variant_url(path, request)
+            for name, path in obj.image_variants.items()
+        }
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsSerializerMixin, TimedSerializerMixin,
+                        serializers.ModelSerializer):
     author = serializers.StringRelatedField(read_only=True)
     post = serializers.PrimaryKeyRelatedField(read_only=True)
+    expandable_fields = {'author': AuthorSerializer}
 
     class Meta:
         model = Comment
         fields = '__all__'
+        list_serializer_class = FastListSerializer
+
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    # Значения берутся из UserStats, см. UserViewSet.get_queryset
+    posts_count = serializers.IntegerField(read_only=True)
+    followers_count = serializers.IntegerField(read_only=True)
+    following_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = User
+        fields = ('id', 'username', 'first_name', 'last_name',
+                  'posts_count', 'followers_count', 'following_count')
+        list_serializer_class = TimedListSerializer
 
 
-class FollowSerializer(serializers.ModelSerializer):
+class FollowSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     user = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username'
@@ -41,6 +94,7 @@ class FollowSerializer(serializers.ModelSerializer):
     class Meta:
         model = Follow
         fields = ('user', 'following')
+        list_serializer_class = TimedListSerializer
 
     def validate_following(self, value):
         request_user = self.context['request'].user
@@ -60,3 +114,63 @@ class FollowSerializer(serializers.ModelSerializer):
                 'Подписка на данного автора уже существует.'
             )
         return data
+
+
+class FollowBatchSerializer(serializers.Serializer):
+    follow = serializers.ListField(
+        child=serializers.CharField(max_length=150),
+        max_length=FOLLOW_BATCH_LIMIT,
+        required=False,
+    )
+    unfollow = serializers.ListField(
+        child=serializers.CharField(max_length=150),
+        max_length=FOLLOW_BATCH_LIMIT,
+        required=False,
+    )
+
+    def validate(self, data):
+        if not data.get('follow') and not data.get('unfollow'):
+            raise serializers.ValidationError(
+                'Укажите имена в списке follow или unfollow.'
+            )
+        return data
+
+
+class SyncQuerySerializer(serializers.Serializer):
+    # Номер последнего полученного изменения; 0 — первая синхронизация
+    since = serializers.IntegerField(
+        min_value=0, max_value=2 ** 63 - 1, default=0
+    )
+    limit = serializers.IntegerField(
+        min_value=1, max_value=SYNC_MAX_PAGE_SIZE, default=SYNC_PAGE_SIZE
+    )
+
+
+class CommentBatchQuerySerializer(serializers.Serializer):
+    # Идентификаторы публикаций через запятую: ?posts=1,2,3
+    posts = serializers.CharField()
+    limit = serializers.IntegerField(
+        min_value=1, max_value=COMMENT_BATCH_LIMIT, default=3
+    )
+
+    def validate_posts(self, value):
+        try:
+            ids = list(dict.fromkeys(
+                int(pk) for pk in value.split(',') if pk.strip()
+            ))
+        except ValueError:
+            ids = None
+        # Идентификатор вне BIGINT база не примет
+        if ids is None or not all(0 < pk < 2 ** 63 for pk in ids):
+            raise serializers.ValidationError(
+                'Ожидаются идентификаторы публикаций через запятую.'
+            )
+        if not ids:
+            raise serializers.ValidationError(
+                'Укажите хотя бы одну публикацию.'
+            )
+        if len(ids) > COMMENT_BATCH_POSTS:
+            raise serializers.ValidationError(
+                f'Не больше {COMMENT_BATCH_POSTS} публикаций за запрос.'
+            )
+        return ids
@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from api.authentication import invalidate_token, invalidate_user
+from api.cache import invalidate
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+def after_commit(func, *args):
+    # Версия меняется только после фиксации: иначе параллельный запрос
+    # прочитал бы еще старую строку и сохранил ее под новой версией
+    transaction.on_commit(lambda: func(*args))
+
+
+@receiver([post_save, post_delete], sender=Group)
+def invalidate_groups(sender, instance, **kwargs):
+    # Удаление группы обнуляет поле group у публикаций, поэтому область
+    # groups входит и в ключи публикаций
+    after_commit(invalidate, 'groups')
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    after_commit(invalidate, f'post:{instance.pk}')
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_post_list(sender, instance, **kwargs):
+    # Удаление не меняет MAX(updated), поэтому меняем версию списка
+    after_commit(invalidate, 'posts')
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def invalidate_post_comments(sender, instance, **kwargs):
+    after_commit(invalidate, f'post:{instance.post_id}')
+
+
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_list(sender, instance, **kwargs):
+    after_commit(invalidate, f'comments:{instance.post_id}')
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_auth_user(sender, instance, **kwargs):
+    # Деактивация, смена пароля и удаление сбрасывают кэш аутентификации
+    after_commit(invalidate_user, instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_auth_token(sender, instance, **kwargs):
+    after_commit(invalidate_token, instance.key)
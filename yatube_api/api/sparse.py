@@ -0,0 +1,180 @@
+"""Выбор полей ответа (``?fields=``) и встраивание связей (``?expand=``).
+
+``?fields=id,text`` оставляет в ответе только перечисленные поля,
+``?expand=group,author`` заменяет идентификатор или имя связанного
+объекта его представлением. Вьюсет с ``SparseFieldsetMixin`` передает
+выбор сериализатору через контекст и сужает выборку: ``only()`` читает
+лишь столбцы выбранных полей, а ``select_related`` соединяет только
+встраиваемые и действительно нужные связи. Быстрый путь списков
+(``api.fast_serializers``) читает столбцы оставшихся полей сам.
+
+Параметры действуют только на чтение (GET и HEAD): поля записи не
+меняются.
+"""
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.db import models
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+def _split(value):
+    return tuple(dict.fromkeys(
+        name.strip() for name in (value or '').split(',') if name.strip()
+    ))
+
+
+class SparseFieldsSerializerMixin:
+    """Учитывает ``sparse_fields`` и ``expand`` из контекста.
+
+    ``expandable_fields`` — имя поля и класс сериализатора связанного
+    объекта. Выбор применяется только к сериализатору верхнего уровня, а
+    не к встроенным.
+    """
+    expandable_fields = {}
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_root():
+            return fields
+        for name in self.context.get('expand', ()):
+            fields[name] = self.expandable_fields[name](read_only=True)
+        selected = self.context.get('sparse_fields')
+        if selected:
+            fields = type(fields)(
+                (name, field) for name, field in fields.items()
+                if name in selected
+            )
+        return fields
+
+
+class UnsupportedField(Exception):
+    pass
+
+
+def _related_paths(name, field, model_field):
+    related = model_field.related_model
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        return [name], []
+    if isinstance(field, serializers.SlugRelatedField):
+        return [name, f'{name}__{field.slug_field}'], [name]
+    if (isinstance(field, serializers.StringRelatedField)
+            and related.__str__ is AbstractBaseUser.__str__):
+        return [name, f'{name}__{related.USERNAME_FIELD}'], [name]
+    raise UnsupportedField(name)
+
+
+def _field_paths(serializer, name, field):
+    """Пути для ``only()`` и связи для ``select_related`` одного поля."""
+    if isinstance(field, serializers.SerializerMethodField):
+        columns = getattr(serializer, 'fast_read_columns', {}).get(name)
+        if columns is None:
+            raise UnsupportedField(name)
+        return list(columns), []
+    source = field.source
+    if '.' in source or source == '*':
+        raise UnsupportedField(name)
+    try:
+        model_field = serializer.Meta.model._meta.get_field(source)
+    except Exception:
+        raise UnsupportedField(name)
+    if isinstance(model_field, models.ForeignObjectRel):
+        raise UnsupportedField(name)
+    if isinstance(field, serializers.BaseSerializer):
+        # Встроенный объект: все его столбцы через соединение
+        paths, related = [source], [source]
+        for sub_name, sub_field in field.fields.items():
+            sub_paths, sub_related = _field_paths(field, sub_name, sub_field)
+            paths += [f'{source}__{path}' for path in sub_paths]
+            related += [f'{source}__{path}' for path in sub_related]
+        return paths, related
+    if isinstance(field, serializers.RelatedField):
+        return _related_paths(source, field, model_field)
+    return [source], []
+
+
+def _prefixed(prefix, paths):
+    return [f'{prefix}__{path}' if prefix else path for path in paths]
+
+
+class SparseFieldsetMixin:
+    """Параметры ``?fields=`` и ``?expand=`` для чтения вьюсета.
+
+    ``sparse_prefix`` — путь к модели сериализатора от модели выборки
+    (например, ``post`` для записей ленты).
+    """
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+    sparse_prefix = ''
+
+    def get_sparse_options(self):
+        if not hasattr(self, '_sparse_options'):
+            self._sparse_options = self.parse_sparse_options(self.request)
+        return self._sparse_options
+
+    def parse_sparse_options(self, request):
+        if request is None or request.method not in READ_METHODS:
+            return None
+        fields = _split(request.query_params.get(self.fields_query_param))
+        expand = _split(request.query_params.get(self.expand_query_param))
+        if not fields and not expand:
+            return None
+        serializer_class = self.get_serializer_class()
+        expandable = getattr(serializer_class, 'expandable_fields', {})
+        unknown = [name for name in expand if name not in expandable]
+        if unknown:
+            raise ValidationError({self.expand_query_param: (
+                f'Нельзя встроить: {", ".join(unknown)}. '
+                f'Доступно: {", ".join(expandable) or "нет"}.'
+            )})
+        available = serializer_class(context={'request': request}).fields
+        unknown = [name for name in fields if name not in available]
+        if unknown:
+            raise ValidationError({self.fields_query_param: (
+                f'Неизвестные поля: {", ".join(unknown)}.'
+            )})
+        return {'sparse_fields': fields, 'expand': expand}
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context.update(self.get_sparse_options() or {})
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        options = self.get_sparse_options()
+        if options is None:
+            return queryset
+        serializer = self.get_serializer_class()(
+            context=self.get_serializer_context()
+        )
+        try:
+            paths, related = [], []
+            for name, field in serializer.fields.items():
+                field_paths, field_related = _field_paths(
+                    serializer, name, field
+                )
+                paths += field_paths
+                related += field_related
+        except UnsupportedField:
+            return queryset
+        prefix = self.sparse_prefix
+        # Поля сортировки нужны курсору, чтобы построить ссылки
+        ordering = [field.lstrip('-') for field in
+                    getattr(self, 'keyset_ordering', None) or ()]
+        related = _prefixed(prefix, related)
+        if prefix:
+            related.insert(0, prefix)
+        return queryset.select_related(None).select_related(
+            *dict.fromkeys(related)
+        ).only(*dict.fromkeys(
+            [*ordering, *([prefix] if prefix else []),
+             *_prefixed(prefix, paths)]
+        ))
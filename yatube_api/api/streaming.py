@@ -0,0 +1,88 @@
+"""Потоковая выдача больших списков без пагинации.
+
+Вместо построения полного списка словарей и одной большой JSON-строки
+выборка читается порциями через ``QuerySet.iterator()``, каждая запись
+сериализуется отдельно, а ответ отдается ``StreamingHttpResponse``.
+Пиковое потребление памяти не зависит от размера результата.
+
+Тело ответа читается из базы уже после выхода из представления и
+промежуточных слоев. Поэтому база для чтения (реплика) выбирается при
+построении выборки, а время потоковой выдачи и ее запросы не попадают в
+``Server-Timing`` и метрики ``/metrics``: в них учтена только подготовка
+ответа.
+"""
+from django.http import StreamingHttpResponse
+from rest_framework.settings import api_settings
+
+from api.renderers import NDJSONRenderer, dumps
+
+
+class StreamingListMixin:
+    """Потоковый режим ``list`` для запросов без пагинации.
+
+    Включается заголовком ``Accept: application/x-ndjson`` (NDJSON) или
+    параметром ``?stream=1`` (JSON-массив).
+    """
+    renderer_classes = [
+        *api_settings.DEFAULT_RENDERER_CLASSES,
+        NDJSONRenderer,
+    ]
+    stream_query_param = 'stream'
+    stream_chunk_size = 500
+    # Размер буфера, после которого порция отправляется клиенту
+    stream_buffer_size = 64 * 1024
+
+    def should_stream(self, request):
+        paginator = self.paginator
+        wants_pagination = getattr(paginator, 'wants_pagination', None)
+        if paginator is not None and (
+                wants_pagination is None or wants_pagination(request)):
+            return False
+        if isinstance(request.accepted_renderer, NDJSONRenderer):
+            return True
+        value = request.query_params.get(self.stream_query_param, '')
+        return value.lower() in ('1', 'true', 'yes')
+
+    def list(self, request, *args, **kwargs):
+        if not self.should_stream(request):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        # Выбор реплики сбрасывается в конце dispatch, раньше чтения тела
+        queryset = queryset.using(queryset.db)
+        if isinstance(request.accepted_renderer, NDJSONRenderer):
+            content = self.stream_ndjson(queryset)
+            content_type = NDJSONRenderer.media_type
+        else:
+            content = self.stream_json_array(queryset)
+            content_type = 'application/json'
+        return StreamingHttpResponse(content, content_type=content_type)
+
+    def iter_rows(self, queryset):
+        # Один экземпляр сериализатора на весь поток: поля связываются
+        # один раз, а не для каждой записи
+        serializer = self.get_serializer()
+        for instance in queryset.iterator(chunk_size=self.stream_chunk_size):
+            yield dumps(serializer.to_representation(instance))
+
+    def buffered(self, chunks):
+        buffer = bytearray()
+        for chunk in chunks:
+            buffer += chunk
+            if len(buffer) >= self.stream_buffer_size:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+
+    def stream_json_array(self, queryset):
+        def chunks():
+            yield b'['
+            for index, row in enumerate(self.iter_rows(queryset)):
+                yield b',' + row if index else row
+            yield b']'
+        return self.buffered(chunks())
+
+    def stream_ndjson(self, queryset):
+        return self.buffered(
+            row + b'\n' for row in self.iter_rows(queryset)
+        )
@@ -0,0 +1,114 @@
+"""Ограничение частоты запросов: «ведро токенов» в общем кэше.
+
+Используется вариант GCRA: на ключ хранится одно целое число — момент
+(в микросекундах), когда ведро снова станет полным (TAT). Запрос
+разрешен, если TAT отстоит от текущего момента не дальше емкости ведра.
+Пока ведро занято, TAT сдвигается атомарным ``cache.incr`` без
+блокировок и без чтения-записи списка времен запросов, как в
+``SimpleRateThrottle``. На разрешенном пути — одно чтение и одно
+``incr``. Кэш ``THROTTLE_CACHE_ALIAS`` должен быть общим для воркеров
+и поддерживать атомарный ``incr`` (Memcached, Redis), чтобы лимит
+действовал на весь узел.
+
+Ставки задаются в ``DEFAULT_THROTTLE_RATES`` отдельно для чтения и
+записи, для пользователей и анонимных клиентов (по IP):
+``user_read``, ``user_write``, ``anon_read``, ``anon_write``.
+"""
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+THROTTLE_CACHE_ALIAS = getattr(
+    settings, 'THROTTLE_CACHE_ALIAS',
+    getattr(settings, 'API_CACHE_ALIAS', 'default')
+)
+MICROSECONDS = 1000000
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+# Ключ живет дольше периода: его потеря лишь обнуляет ведро
+KEY_TIMEOUT_PERIODS = 10
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'100/min' → (интервал между токенами, емкость) в микросекундах."""
+    num, period = rate.split('/')
+    duration = PERIODS[period[0]] * MICROSECONDS
+    interval = duration // int(num)
+    return interval, duration - interval
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+    methods = ()
+    timer = time.time
+
+    def __init__(self):
+        self.wait_time = None
+
+    def get_rate_name(self, request):
+        kind = 'user' if request.user.is_authenticated else 'anon'
+        return f'{kind}_{self.scope}'
+
+    def get_cache_key(self, request, view, rate_name):
+        user = request.user
+        ident = user.pk if user.is_authenticated else self.get_ident(request)
+        # Отдельное ведро для каждого класса представления
+        return f'throttle:{rate_name}:{type(view).__name__}:{ident}'
+
+    def allow_request(self, request, view):
+        if request.method not in self.methods:
+            return True
+        rate_name = self.get_rate_name(request)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(rate_name)
+        if rate is None:
+            return True
+        interval, capacity = parse_rate(rate)
+        key = self.get_cache_key(request, view, rate_name)
+        return self.consume(key, interval, capacity)
+
+    def consume(self, key, interval, capacity):
+        cache = caches[THROTTLE_CACHE_ALIAS]
+        now = int(self.timer() * MICROSECONDS)
+        tat = cache.get(key)
+        if tat is None or tat <= now:
+            # Ведро полное: начинаем отсчет заново. Гонка здесь может
+            # пропустить лишний запрос, но не заблокировать лишний
+            timeout = KEY_TIMEOUT_PERIODS * (interval + capacity)
+            cache.set(key, now + interval, timeout // MICROSECONDS)
+            return True
+        if tat - now > capacity:
+            return self.deny(tat - now - capacity)
+        try:
+            tat = cache.incr(key, interval)
+        except ValueError:
+            # Ключ истек между чтением и incr
+            return True
+        if tat - interval - now > capacity:
+            # Параллельный запрос занял последний токен: возвращаем свой
+            cache.decr(key, interval)
+            return self.deny(tat - interval - now - capacity)
+        return True
+
+    def deny(self, wait):
+        self.wait_time = wait / MICROSECONDS
+        return False
+
+    def wait(self):
+        return self.wait_time
+
+
+class ReadRateThrottle(TokenBucketThrottle):
+    """Лимит чтения: ``user_read`` или ``anon_read``."""
+    scope = 'read'
+    methods = SAFE_METHODS
+
+
+class WriteRateThrottle(TokenBucketThrottle):
+    """Лимит записи: ``user_write`` или ``anon_write``."""
+    scope = 'write'
+    methods = ('POST', 'PUT', 'PATCH', 'DELETE')
@@ -1,6 +1,17 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
-from api.views import PostViewSet, GroupViewSet, CommentViewSet, FollowViewSet
+from api.views import (
+    AuthorPostViewSet,
+    GroupPostViewSet,
+    PostViewSet,
+    GroupViewSet,
+    CommentBatchViewSet,
+    CommentViewSet,
+    FollowViewSet,
+    FeedViewSet,
+    SyncViewSet,
+    UserViewSet,
+)
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
@@ -10,10 +21,18 @@ from rest_framework_simplejwt.views import (
 
 router = DefaultRouter()
 router.register('follow', FollowViewSet, basename='follow')
+router.register('feed', FeedViewSet, basename='feed')
+router.register('users', UserViewSet, basename='users')
 router.register('posts', PostViewSet, basename='posts')
 router.register('groups', GroupViewSet, basename='groups')
+router.register('sync', SyncViewSet, basename='sync')
+router.register(r'groups/(?P<group_id>\d+)/posts',
+                GroupPostViewSet, basename='group-posts')
+router.register(r'users/(?P<username>[^/]+)/posts',
+                AuthorPostViewSet, basename='author-posts')
 router.register(r'posts/(?P<post_id>\d+)/comments',
                 CommentViewSet, basename='comments')
+router.register('comments', CommentBatchViewSet, basename='comment-batch')
 
 urlpatterns = [
     # DRF Token auth (не JWT)
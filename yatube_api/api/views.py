@@ -1,36 +1,82 @@
-from api.pagination import ConditionalPagination
+from api.cache import CachedResponseMixin
+from api.conditional import ConditionalGetMixin
+from api.database import LockRetryMixin
+from api.filters import FollowSearchFilter, PostFilter, PostSearchFilter
+from api.pagination import ConditionalPagination, KeysetPagination
+from api.replicas import ReplicaReadMixin
+from api.sparse import SparseFieldsetMixin
+from api.streaming import StreamingListMixin
 
-from rest_framework import viewsets, mixins, filters
+from django.contrib.auth import get_user_model
+from django.db.models.functions import Coalesce
+from rest_framework import viewsets, mixins, status
+from rest_framework.decorators import action
 from rest_framework.permissions import (
     IsAuthenticated,
     IsAuthenticatedOrReadOnly
 )
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
-from posts.models import Post, Group, Comment, Follow
+from posts.changes import read_changes
+from posts.comments import latest_comments
+from posts.feed import backfill_follow, fan_out_post, pull_feed
+from posts.follows import follow_users, unfollow_users
+from posts.images import schedule_image_processing
+from posts.models import Change, Post, Group, Comment, Follow, FeedEntry
 from api.serializers import (
     PostSerializer,
     GroupSerializer,
+    CommentBatchQuerySerializer,
     CommentSerializer,
-    FollowSerializer
+    FollowBatchSerializer,
+    FollowSerializer,
+    SyncQuerySerializer,
+    UserSerializer,
 )
 
+User = get_user_model()
 
-class PostViewSet(viewsets.ModelViewSet):
-    queryset = Post.objects.all()
+
+class PostViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedResponseMixin,
+                  LockRetryMixin, StreamingListMixin, SparseFieldsetMixin,
+                  viewsets.ModelViewSet):
+    queryset = Post.objects.select_related('author', 'group')
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = ConditionalPagination  # Используем кастомный пагинатор
+    keyset_ordering = ('-pub_date', '-id')
+    filter_backends = [PostFilter, PostSearchFilter]
+    cache_actions = ('retrieve',)  # Кэшируем только чтение публикации
+
+    def get_cache_scopes(self):
+        return [f'post:{self.kwargs[self.lookup_field]}', 'groups']
+
+    def get_conditional_scopes(self):
+        # Удаление группы обнуляет group у публикаций без изменения updated
+        if self.action == 'list':
+            return ['posts', 'groups']
+        return ['groups']
 
     def perform_create(self, serializer):
         # Автоматически устанавливаем текущего пользователя как автора
-        serializer.save(author=self.request.user)
+        post = serializer.save(author=self.request.user)
+        # Раскладываем публикацию по лентам подписчиков
+        fan_out_post(post)
+        # Уменьшенные копии изображения готовятся в фоне
+        schedule_image_processing(post)
 
     def perform_update(self, serializer):
         # Проверяем, что пользователь является автором публикации
         if serializer.instance.author != self.request.user:
             raise PermissionDenied('Редактирование чужих публикаций запрещено!')
-        serializer.save()
+        if 'image' not in serializer.validated_data:
+            serializer.save()
+            return
+        # Прежние варианты относятся к старому изображению
+        post = serializer.save(image_variants={})
+        schedule_image_processing(post)
 
     def perform_destroy(self, instance):
         # Проверяем, что пользователь является автором публикации
@@ -39,21 +85,46 @@ class PostViewSet(viewsets.ModelViewSet):
         instance.delete()
 
 
-class GroupViewSet(viewsets.ReadOnlyModelViewSet):
+class GroupPostViewSet(PostViewSet):
+    """Публикации группы: ``/groups/{group_id}/posts/``."""
+    http_method_names = ['get', 'head', 'options']
+
+
+class AuthorPostViewSet(PostViewSet):
+    """Публикации автора: ``/users/{username}/posts/``."""
+    http_method_names = ['get', 'head', 'options']
+
+
+class GroupViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedResponseMixin,
+                   viewsets.ReadOnlyModelViewSet):
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = None  # Отключаем пагинацию для групп
 
+    def get_cache_scopes(self):
+        return ['groups']
+
+    def get_conditional_scopes(self):
+        return ['groups']
+
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ReplicaReadMixin, ConditionalGetMixin, LockRetryMixin,
+                     StreamingListMixin, SparseFieldsetMixin,
+                     viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    pagination_class = None  # Отключаем пагинацию для комментариев
+    pagination_class = ConditionalPagination
+    keyset_ordering = ('created', 'id')
 
     def get_queryset(self):
         # Получаем только комментарии для конкретного поста
-        return Comment.objects.filter(post=self.kwargs['post_id'])
+        return Comment.objects.filter(
+            post=self.kwargs['post_id']
+        ).select_related('author')
+
+    def get_conditional_scopes(self):
+        return [f'comments:{self.kwargs["post_id"]}']
 
     def perform_create(self, serializer):
         # Создаем комментарий с автором и привязкой к посту
@@ -75,19 +146,184 @@ class CommentViewSet(viewsets.ModelViewSet):
         instance.delete()
 
 
+class CommentBatchViewSet(ReplicaReadMixin, viewsets.GenericViewSet):
+    """Последние комментарии нескольких публикаций одним запросом.
+
+    ``/comments/?posts=1,2,3&limit=3`` возвращает словарь «публикация —
+    не больше ``limit`` ее последних комментариев»; публикации без
+    комментариев получают пустой список.
+    """
+    serializer_class = CommentSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def list(self, request):
+        params = CommentBatchQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        post_ids = params.validated_data['posts']
+        comments = self.get_serializer(
+            latest_comments(post_ids, params.validated_data['limit'])
+            .select_related('author'),
+            many=True
+        ).data
+        result = {str(post_id): [] for post_id in post_ids}
+        for comment in comments:
+            result[str(comment['post'])].append(comment)
+        return Response(result)
+
+
 class FollowViewSet(mixins.CreateModelMixin,
                    mixins.ListModelMixin,
                    viewsets.GenericViewSet):
     serializer_class = FollowSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['following__username']
-    pagination_class = None  # Отключаем пагинацию для подписок
+    filter_backends = [FollowSearchFilter]  # Поиск по индексу имен
+    pagination_class = ConditionalPagination
+    keyset_ordering = ('id',)
 
     def get_queryset(self):
         # Получаем только подписки текущего пользователя
-        return Follow.objects.filter(user=self.request.user)
+        return Follow.objects.filter(
+            user=self.request.user
+        ).select_related('user', 'following')
+
+    lookup_url_kwarg = 'username'
+    lookup_value_regex = '[^/]+'
+
+    def create(self, request, *args, **kwargs):
+        # Подписка одним INSERT ... ON CONFLICT DO NOTHING без проверок;
+        # тело-массив и прочие не-словари разбирает сериализатор
+        following = (request.data.get('following')
+                     if isinstance(request.data, dict) else None)
+        if isinstance(following, str) and follow_users(
+                request.user, [following]):
+            return Response(
+                {'user': request.user.username, 'following': following},
+                status=status.HTTP_201_CREATED
+            )
+        # Ошибку (нет автора, подписка на себя, повтор) описывает сериализатор
+        return super().create(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         # Автоматически устанавливаем текущего пользователя как подписчика
-        serializer.save(user=self.request.user)
+        follow = serializer.save(user=self.request.user)
+        # Добавляем в ленту последние публикации автора
+        backfill_follow(follow)
+
+    def destroy(self, request, *args, **kwargs):
+        if not unfollow_users(request.user, [kwargs['username']]):
+            raise NotFound('Подписка на данного автора не найдена.')
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        serializer = FollowBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        followed = follow_users(request.user, data.get('follow', []))
+        unfollowed = unfollow_users(request.user, data.get('unfollow', []))
+        return Response(
+            {'followed': len(followed), 'unfollowed': len(unfollowed)}
+        )
+
+
+class UserViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    serializer_class = UserSerializer
+    lookup_field = 'username'
+    lookup_value_regex = '[^/]+'  # Имена пользователей могут содержать точку
+    # Счетчики читаются из UserStats одним запросом; пользователь без
+    # строки счетчиков (до reconcile_counters) получает нули
+    queryset = User.objects.annotate(
+        posts_count=Coalesce('stats__posts_count', 0),
+        followers_count=Coalesce('stats__followers_count', 0),
+        following_count=Coalesce('stats__following_count', 0),
+    )
+
+
+class FeedViewSet(SparseFieldsetMixin, mixins.ListModelMixin,
+                  viewsets.GenericViewSet):
+    serializer_class = PostSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination  # Лента всегда читается курсором
+    keyset_ordering = ('-pub_date', '-post_id')
+    sparse_prefix = 'post'  # Поля ?fields= относятся к публикации
+
+    def get_queryset(self):
+        # Лента пользователя — диапазон индекса (user, pub_date, post)
+        return FeedEntry.objects.filter(
+            user=self.request.user
+        ).select_related('post__author', 'post__group')
+
+    def list(self, request, *args, **kwargs):
+        # Публикации авторов с fan-out-on-read добавляем перед чтением
+        pull_feed(request.user)
+        page = self.paginate_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        serializer = self.get_serializer(
+            [entry.post for entry in page], many=True
+        )
+        return self.get_paginated_response(serializer.data)
+
+
+class SyncViewSet(ReplicaReadMixin, viewsets.GenericViewSet):
+    """Изменения публикаций и комментариев после номера ``?since=``.
+
+    Страница — ``limit`` записей журнала изменений подряд. Клиент
+    сохраняет ``token`` из ответа и передает его как ``since`` при
+    следующей синхронизации; пока ``has_more`` истинно, ``next`` ведет на
+    продолжение. Созданные и измененные объекты приходят целиком (по
+    одному запросу на тип), удаленные — списком идентификаторов.
+    """
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    # Сериализатор и выборка для каждого типа объектов журнала
+    sync_models = {
+        Change.POST: (
+            'posts', PostSerializer,
+            Post.objects.select_related('author', 'group'),
+        ),
+        Change.COMMENT: (
+            'comments', CommentSerializer,
+            Comment.objects.select_related('author'),
+        ),
+    }
+
+    def list(self, request):
+        params = SyncQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        changes, token, has_more = read_changes(**params.validated_data)
+        data = {
+            'token': token,
+            'has_more': has_more,
+            'next': replace_query_param(
+                request.build_absolute_uri(), 'since', token
+            ) if has_more else None,
+        }
+        for kind, (name, serializer_class, queryset) in (
+                self.sync_models.items()):
+            data[name] = self.serialize_changes(
+                changes[kind], serializer_class, queryset
+            )
+        return Response(data)
+
+    def serialize_changes(self, changes, serializer_class, queryset):
+        created = set(changes[Change.CREATED])
+        ids = [*created, *changes[Change.UPDATED]]
+        result = {
+            Change.CREATED: [],
+            Change.UPDATED: [],
+            Change.DELETED: changes[Change.DELETED],
+        }
+        if not ids:
+            return result
+        items = serializer_class(
+            queryset.filter(pk__in=ids).order_by('pk'), many=True,
+            context=self.get_serializer_context()
+        ).data
+        for item in items:
+            action = (Change.CREATED if item['id'] in created
+                      else Change.UPDATED)
+            result[action].append(item)
+        # Удален после последней прочитанной записи журнала
+        found = {item['id'] for item in items}
+        result[Change.DELETED] += [pk for pk in ids if pk not in found]
+        return result
@@ -0,0 +1,12 @@
+"""Бенчмарки производительности API.
+
+Каждый модуль запускается из каталога ``yatube_api``::
+
+    python -m benchmarks.serializers --rows 20000
+
+и работает на временной тестовой базе, не затрагивая рабочие данные.
+Сквозной прогон всех эндпоинтов с наполнением базы заданного масштаба
+(``benchmarks.suite``) запускается командой::
+
+    python manage.py benchmark --scale 100k --output results.json
+"""
@@ -0,0 +1,146 @@
+"""Запросов в секунду на чтение: WSGI, ASGI с синхронными и async-view.
+
+    python -m benchmarks.asgi --concurrency 64 --requests 2000
+
+Приложения вызываются в процессе, без сетевого сервера: WSGI — из пула
+потоков (как многопоточный воркер), ASGI — конкурентными задачами в
+одном цикле событий. ``--db-latency-ms`` добавляет задержку к каждому
+запросу к базе, имитируя сетевую СУБД вместо локального файла SQLite.
+"""
+import argparse
+import asyncio
+import io
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.utils import seed_posts, setup_django
+
+PATHS = ('/api/v1/posts/', '/api/v1/groups/')
+QUERY = 'limit=20'
+
+
+def add_latency(seconds):
+    from django.db.backends.signals import connection_created
+
+    def delay(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        if delay not in connection.execute_wrappers:
+            connection.execute_wrappers.append(delay)
+
+    connection_created.connect(install, weak=False)
+
+
+def wsgi_get(application, path):
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': QUERY,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'HTTP_HOST': 'localhost',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': io.StringIO(),
+    }
+    statuses = []
+    body = b''.join(application(
+        environ, lambda status, headers: statuses.append(status)
+    ))
+    assert statuses[0].startswith('200'), statuses[0]
+    return body
+
+
+async def asgi_get(application, path):
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path,
+        'raw_path': path.encode(), 'query_string': QUERY.encode(),
+        'headers': [(b'host', b'localhost')],
+        'server': ('localhost', 80), 'client': ('127.0.0.1', 50000),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    assert messages[0]['status'] == 200, messages[0]['status']
+    return b''.join(message.get('body', b'') for message in messages[1:])
+
+
+def bench_wsgi(application, requests, concurrency):
+    paths = [PATHS[index % len(PATHS)] for index in range(requests)]
+    with ThreadPoolExecutor(concurrency) as executor:
+        started = time.perf_counter()
+        list(executor.map(lambda path: wsgi_get(application, path), paths))
+        return requests / (time.perf_counter() - started)
+
+
+def bench_asgi(application, requests, concurrency):
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+        # Пул для sync_to_async(thread_sensitive=False) того же размера,
+        # что и пул потоков WSGI
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(concurrency)
+        )
+
+        async def one(index):
+            async with semaphore:
+                await asgi_get(application, PATHS[index % len(PATHS)])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(index) for index in range(requests)))
+        return requests / (time.perf_counter() - started)
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--posts', type=int, default=200)
+    parser.add_argument('--db-latency-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['DATABASE_PATH'] = os.path.join(directory, 'bench.db')
+        run(args)
+
+
+def run(args):
+    setup_django()
+    from django.core.asgi import get_asgi_application
+    from django.core.management import call_command
+    from django.core.wsgi import get_wsgi_application
+
+    call_command('migrate', verbosity=0)
+    seed_posts(args.posts)
+    if args.db_latency_ms:
+        add_latency(args.db_latency_ms / 1000)
+
+    from yatube_api.asgi import application as async_application
+    cases = (
+        ('WSGI, потоки', bench_wsgi, get_wsgi_application()),
+        ('ASGI, синхронные представления', bench_asgi,
+         get_asgi_application()),
+        ('ASGI, async-представления', bench_asgi, async_application),
+    )
+    results = {}
+    for name, bench, application in cases:
+        results[name] = bench(application, args.requests, args.concurrency)
+        print(f'{name:32} {results[name]:8,.0f} запросов/с '
+              f'(конкурентность {args.concurrency})')
+    return results
+
+
+if __name__ == '__main__':
+    main()
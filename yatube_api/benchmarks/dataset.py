@@ -0,0 +1,128 @@
+"""Воспроизводимый набор данных заданного масштаба для бенчмарков.
+
+Пользователи, группы, публикации, комментарии и подписки создаются через
+``bulk_create`` порциями, поэтому даже масштаб ``1m`` не требует держать
+все объекты в памяти. Выбор авторов, групп и подписок детерминирован
+(``random.Random(seed)``), так что два запуска на разных коммитах
+работают с одинаковыми данными. Сигналы при ``bulk_create`` не
+срабатывают: счетчики, поисковые индексы, журнал изменений и лента
+пользователя-клиента после наполнения строятся командами и функциями
+обслуживания.
+"""
+import io
+import random
+from itertools import islice
+
+SCALES = {
+    '1k': {'posts': 1000, 'users': 100, 'groups': 10,
+           'comments_per_post': 2, 'follows_per_user': 10},
+    '100k': {'posts': 100000, 'users': 5000, 'groups': 100,
+             'comments_per_post': 2, 'follows_per_user': 20},
+    '1m': {'posts': 1000000, 'users': 20000, 'groups': 200,
+           'comments_per_post': 1, 'follows_per_user': 20},
+}
+BATCH_SIZE = 5000
+CLIENT_USERNAME = 'bench_client'
+CLIENT_PASSWORD = 'bench-password-42'
+
+
+def _bulk_create(model, objects):
+    objects = iter(objects)
+    while True:
+        batch = list(islice(objects, BATCH_SIZE))
+        if not batch:
+            return
+        model.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def _seed_follows(users, per_user, rng):
+    from posts.models import Follow
+
+    def follows():
+        for user_id in users:
+            for following_id in rng.sample(users, min(per_user, len(users))):
+                if following_id != user_id:
+                    yield Follow(user_id=user_id, following_id=following_id)
+    _bulk_create(Follow, follows())
+
+
+def _seed_changes():
+    from posts.models import Change, Comment, Post
+
+    for kind, model in ((Change.POST, Post), (Change.COMMENT, Comment)):
+        ids = model.objects.order_by('pk').values_list('pk', flat=True)
+        _bulk_create(Change, (
+            Change(kind=kind, object_id=pk, action=Change.CREATED)
+            for pk in ids.iterator()
+        ))
+
+
+def _finish_indexes(client):
+    """Счетчики, индексы поиска и лента клиента, как после обычной записи."""
+    from django.core.management import call_command
+    from posts.feed import backfill_follow
+    from posts.models import Follow
+
+    _seed_changes()
+    for command in ('reconcile_counters', 'rebuild_search_index',
+                    'rebuild_username_index'):
+        call_command(command, stdout=io.StringIO())
+    for follow in Follow.objects.filter(user=client):
+        backfill_follow(follow)
+
+
+def seed(posts, users, groups, comments_per_post, follows_per_user,
+         seed=0):
+    """Наполняет базу и возвращает пользователя для запросов с токеном."""
+    from django.contrib.auth import get_user_model
+    from posts.models import Comment, Group, Post
+
+    User = get_user_model()
+    rng = random.Random(seed)
+    client = User.objects.create_user(CLIENT_USERNAME,
+                                      password=CLIENT_PASSWORD)
+    _bulk_create(User, (
+        User(username=f'bench_user_{index}') for index in range(users)
+    ))
+    user_ids = [client.pk, *User.objects.filter(
+        username__startswith='bench_user_'
+    ).order_by('pk').values_list('pk', flat=True)]
+    _bulk_create(Group, (
+        Group(title=f'Группа {index}', slug=f'bench-group-{index}',
+              description=f'Описание группы {index}')
+        for index in range(groups)
+    ))
+    group_ids = list(Group.objects.order_by('pk').values_list('pk',
+                                                              flat=True))
+    _bulk_create(Post, (
+        Post(
+            text=f'Текст публикации номер {index} ' * 5,
+            author_id=rng.choice(user_ids),
+            group_id=rng.choice(group_ids) if index % 3 else None,
+            image=f'posts/bench_{index}.jpg' if index % 4 == 0 else None,
+        )
+        for index in range(posts)
+    ))
+    if comments_per_post:
+        post_ids = list(
+            Post.objects.order_by('pk').values_list('pk', flat=True)
+        )
+        _bulk_create(Comment, (
+            Comment(post_id=post_id, author_id=rng.choice(user_ids),
+                    text=f'Комментарий {index}')
+            for post_id in post_ids
+            for index in range(comments_per_post)
+        ))
+    _seed_follows(user_ids, follows_per_user, rng)
+    _finish_indexes(client)
+    return client
+
+
+def counts():
+    """Размер набора данных для отчета."""
+    from django.contrib.auth import get_user_model
+    from posts.models import Comment, Follow, Group, Post
+    return {
+        model._meta.model_name: model.objects.count()
+        for model in (get_user_model(), Group, Post, Comment, Follow)
+    }
@@ -0,0 +1,104 @@
+"""Параллельная запись публикаций и комментариев из нескольких процессов.
+
+    python -m benchmarks.db_concurrency --workers 8 --writes 200
+
+Для каждого профиля базы (development, production) создается отдельный
+файл SQLite, и воркеры одновременно пишут в него. Профиль development
+пишет без повторов, как раньше; production — с PRAGMA из настроек и
+повтором записи при блокировке (api.database.run_with_retry).
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.utils import setup_django
+
+PROFILES = ('development', 'production')
+
+
+def _setup(profile, path):
+    os.environ['DATABASE_PROFILE'] = profile
+    os.environ['DATABASE_PATH'] = path
+    setup_django()
+
+
+def prepare(profile, path, workers):
+    _setup(profile, path)
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+    User = get_user_model()
+    for index in range(workers):
+        User.objects.create(username=f'writer_{index}')
+
+
+def write(user, index):
+    from posts.models import Comment, Post
+
+    # Как в API: сериализатор читает связанные объекты до записи, и
+    # транзакция переходит от чтения к записи
+    Post.objects.filter(author=user).exists()
+    post = Post.objects.create(text=f'Публикация {index}', author=user)
+    Comment.objects.create(post=post, author=user, text='Комментарий')
+
+
+def worker(profile, path, index, writes):
+    _setup(profile, path)
+    from django.contrib.auth import get_user_model
+    from django.db import OperationalError, transaction
+
+    from api.database import run_with_retry
+
+    user = get_user_model().objects.get(username=f'writer_{index}')
+    done = errors = 0
+    started = time.perf_counter()
+    for number in range(writes):
+        try:
+            if profile == 'production':
+                run_with_retry(write, user, number)
+            else:
+                with transaction.atomic():
+                    write(user, number)
+            done += 1
+        except OperationalError:
+            errors += 1
+    return done, errors, time.perf_counter() - started
+
+
+def run_profile(profile, workers, writes):
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.sqlite3')
+        with ProcessPoolExecutor(1, mp_context=context) as executor:
+            executor.submit(prepare, profile, path, workers).result()
+        started = time.perf_counter()
+        with ProcessPoolExecutor(workers, mp_context=context) as executor:
+            results = list(executor.map(
+                worker,
+                [profile] * workers, [path] * workers,
+                range(workers), [writes] * workers,
+            ))
+        elapsed = time.perf_counter() - started
+    done = sum(result[0] for result in results)
+    errors = sum(result[1] for result in results)
+    print(f'{profile:12} воркеров {workers}: записано {done}, '
+          f'ошибок блокировки {errors}, {done / elapsed:,.0f} записей/с')
+    return {'done': done, 'errors': errors, 'writes_per_sec': done / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=200)
+    parser.add_argument('--profile', choices=PROFILES, action='append')
+    args = parser.parse_args()
+    for profile in args.profile or PROFILES:
+        run_profile(profile, args.workers, args.writes)
+
+
+if __name__ == '__main__':
+    main()
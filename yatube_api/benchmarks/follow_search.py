@@ -0,0 +1,84 @@
+"""Поиск подписок по имени автора: LIKE '%q%' против индекса имен.
+
+    python -m benchmarks.follow_search --follows 100000
+
+Синтетический граф: один «тяжелый» пользователь подписан на всех авторов,
+остальные подписки распределены случайно.
+"""
+import argparse
+import random
+
+from benchmarks.utils import measure, setup_django, temporary_database
+
+
+def seed_graph(authors, follows, readers=1000):
+    from django.contrib.auth import get_user_model
+    from posts import user_search
+    from posts.models import Follow
+
+    User = get_user_model()
+    User.objects.bulk_create(
+        [User(username=f'reader_{index}') for index in range(readers)]
+        + [User(username=f'author_{index:06d}') for index in range(authors)],
+        batch_size=1000
+    )
+    reader_ids = list(User.objects.filter(username__startswith='reader_')
+                      .values_list('pk', flat=True))
+    author_ids = list(User.objects.filter(username__startswith='author_')
+                      .values_list('pk', flat=True))
+    heavy = reader_ids[0]
+    rows = {(heavy, author_id) for author_id in author_ids}
+    generator = random.Random(0)
+    while len(rows) < follows:
+        rows.add((generator.choice(reader_ids), generator.choice(author_ids)))
+    Follow.objects.bulk_create(
+        [Follow(user_id=user_id, following_id=following_id)
+         for user_id, following_id in rows],
+        batch_size=1000
+    )
+    user_search.FOLLOW_SEARCH_TRIGRAMS = True
+    user_search.rebuild()
+    return User.objects.get(pk=heavy)
+
+
+def run(authors, follows, repeat):
+    from posts import user_search
+    from posts.models import Follow
+
+    user = seed_graph(authors, follows)
+    follows = Follow.objects.filter(user=user)
+    cases = {
+        'LIKE %q% (SearchFilter)': lambda query: follows.filter(
+            following__username__icontains=query
+        ),
+        'префикс по индексу': lambda query: follows.filter(
+            following_id__in=user_search.prefix_user_ids(query)
+        ),
+        'триграммы': lambda query: follows.filter(
+            following_id__in=user_search.infix_user_ids(query)
+        ),
+    }
+    results = {}
+    for query in ('author_0012', '00123', 'author_019999'):
+        for name, search in cases.items():
+            found = len(search(query))
+            elapsed = measure(lambda: list(search(query)), repeat)
+            results[(query, name)] = elapsed
+            print(f'{query!r:16} {name:26} {found:6} строк '
+                  f'{elapsed * 1000:8.2f} мс')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--authors', type=int, default=20000)
+    parser.add_argument('--follows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    setup_django()
+    with temporary_database():
+        run(args.authors, args.follows, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
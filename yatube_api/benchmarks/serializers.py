@@ -0,0 +1,66 @@
+"""Сравнение обычной и быстрой сериализации списков публикаций.
+
+    python -m benchmarks.serializers --rows 20000
+"""
+import argparse
+
+from benchmarks.utils import (
+    measure,
+    seed_posts,
+    setup_django,
+    temporary_database,
+)
+
+
+def run(rows, repeat):
+    from rest_framework import serializers
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIRequestFactory
+
+    from api.serializers import CommentSerializer, PostSerializer
+    from posts.models import Comment, Post
+
+    seed_posts(rows, comments_per_post=1)
+    context = {'request': APIRequestFactory().get('/api/v1/posts/')}
+    renderer = JSONRenderer()
+    cases = (
+        ('posts', PostSerializer,
+         lambda: Post.objects.select_related('author', 'group')),
+        ('comments', CommentSerializer,
+         lambda: Comment.objects.select_related('author')),
+    )
+    results = {}
+    for name, serializer_class, queryset in cases:
+        def regular():
+            return renderer.render(serializers.ListSerializer(
+                queryset(), child=serializer_class(), context=context
+            ).data)
+
+        def fast():
+            return renderer.render(serializer_class(
+                queryset(), many=True, context=context
+            ).data)
+
+        assert regular() == fast(), f'{name}: ответы различаются'
+        count = queryset().count()
+        before = count / measure(regular, repeat)
+        after = count / measure(fast, repeat)
+        results[name] = {'rows': count, 'regular_rows_per_sec': before,
+                         'fast_rows_per_sec': after}
+        print(f'{name}: {count} строк, обычный путь {before:,.0f} строк/с, '
+              f'быстрый {after:,.0f} строк/с (x{after / before:.1f})')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    setup_django()
+    with temporary_database():
+        run(args.rows, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,449 @@
+"""Сквозной бенчмарк эндпоинтов API на наборе данных заданного масштаба.
+
+    python manage.py benchmark --scale 100k --output results.json
+    python manage.py benchmark --compare results.json
+
+Каждый эндпоинт из ``api/urls.py`` прогоняется двумя способами: тестовым
+клиентом Django (в процессе, без сети) и HTTP-запросами к настоящему
+WSGI-серверу (``wsgiref`` в отдельном потоке). Для каждого эндпоинта
+считаются задержки p50/p95/p99, число SQL-запросов на запрос (из
+заголовка ``Server-Timing``, см. ``api.instrumentation``) и пиковое
+выделение памяти (``tracemalloc``, только для тестового клиента).
+
+Изменения и удаления публикаций и комментариев работают с объектами
+пользователя-клиента. Объект для удаления и подписка для отписки
+создаются перед каждым запросом вне замера, а перед подпиской прошлая
+подписка удаляется, поэтому каждый запрос выполняет настоящую запись.
+
+Лимиты частоты запросов подняты так, чтобы не срабатывать, но сами
+проверки выполняются. Кэши очищаются перед каждым эндпоинтом, а первые
+``--warmup`` запросов не учитываются, поэтому чтения кэшируемых списков
+измеряются с прогретым кэшем ответов. Результат — JSON с отсортированными
+ключами, который удобно сравнивать между коммитами (``--compare``).
+"""
+import http.client
+import json
+import logging
+import math
+import platform
+import re
+import resource
+import statistics
+import subprocess
+import threading
+import time
+import tracemalloc
+from urllib.parse import quote
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+from benchmarks import dataset
+
+DRIVERS = ('client', 'wsgi')
+MEMORY_REQUESTS = 3
+UNLIMITED_RATE = '1000000/s'
+QUERIES_RE = re.compile(r'"(\d+) queries"')
+
+
+class Case:
+    """Запрос к эндпоинту; путь и тело подставляются из контекста."""
+
+    def __init__(self, name, method, path, data=None, auth=False,
+                 limit=None, setup=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.data = data
+        self.auth = auth
+        # Хеширование пароля дорогое: такие эндпоинты — меньше повторов
+        self.limit = limit
+        # Готовит данные перед запросом и дополняет контекст
+        self.setup = setup
+
+    def build(self, context, index):
+        if self.setup is not None:
+            context = {**context, **self.setup(context, index)}
+        data = self.data(context, index) if callable(self.data) else (
+            self.data and {key: value.format(**context)
+                           if isinstance(value, str) else value
+                           for key, value in self.data.items()}
+        )
+        return self.path.format(**context), data
+
+
+def _follow_batch(context, index):
+    # Четные запросы подписывают, нечетные отписывают: данные не растут
+    names = [context['target']]
+    return {'follow': names} if index % 2 == 0 else {'unfollow': names}
+
+
+def _new_post(context, index):
+    from posts.models import Post
+    post = Post.objects.create(author_id=context['client'],
+                               text='Публикация для удаления')
+    return {'new_post': post.pk}
+
+
+def _new_comment(context, index):
+    from posts.models import Comment
+    comment = Comment.objects.create(
+        post_id=context['own_post'], author_id=context['client'],
+        text='Комментарий для удаления'
+    )
+    return {'new_comment': comment.pk}
+
+
+def _not_following(context, index):
+    from posts.models import Follow
+    Follow.objects.filter(user_id=context['client'],
+                          following_id=context['target_id']).delete()
+    return {}
+
+
+def _following(context, index):
+    from posts.models import Follow
+    Follow.objects.get_or_create(user_id=context['client'],
+                                 following_id=context['target_id'])
+    return {}
+
+
+def _credentials(context, index):
+    return {'username': dataset.CLIENT_USERNAME,
+            'password': dataset.CLIENT_PASSWORD}
+
+
+CASES = (
+    Case('posts.list', 'GET', '/api/v1/posts/?limit=20'),
+    Case('posts.list_cursor', 'GET', '/api/v1/posts/?page_size=20'),
+    Case('posts.list_sparse', 'GET',
+         '/api/v1/posts/?page_size=20&fields=id,author,pub_date'),
+    Case('posts.list_expand', 'GET',
+         '/api/v1/posts/?page_size=20&expand=group,author'),
+    Case('posts.search', 'GET', '/api/v1/posts/?search=номер&limit=20'),
+    Case('posts.retrieve', 'GET', '/api/v1/posts/{post}/'),
+    Case('group-posts.list', 'GET',
+         '/api/v1/groups/{group}/posts/?page_size=20'),
+    Case('author-posts.list', 'GET',
+         '/api/v1/users/{username}/posts/?page_size=20'),
+    Case('posts.create', 'POST', '/api/v1/posts/',
+         {'text': 'Публикация бенчмарка', 'group': '{group}'}, auth=True),
+    Case('posts.update', 'PUT', '/api/v1/posts/{own_post}/',
+         {'text': 'Измененная публикация', 'group': '{group}'}, auth=True),
+    Case('posts.partial_update', 'PATCH', '/api/v1/posts/{own_post}/',
+         {'text': 'Исправленная публикация'}, auth=True),
+    Case('posts.destroy', 'DELETE', '/api/v1/posts/{new_post}/', auth=True,
+         setup=_new_post),
+    Case('comments.list', 'GET', '/api/v1/posts/{post}/comments/'),
+    Case('comment-batch.list', 'GET',
+         '/api/v1/comments/?posts={post_ids}&limit=3'),
+    Case('comments.retrieve', 'GET',
+         '/api/v1/posts/{post}/comments/{comment}/'),
+    Case('comments.create', 'POST', '/api/v1/posts/{post}/comments/',
+         {'text': 'Комментарий бенчмарка'}, auth=True),
+    Case('comments.update', 'PUT',
+         '/api/v1/posts/{own_post}/comments/{own_comment}/',
+         {'text': 'Измененный комментарий'}, auth=True),
+    Case('comments.partial_update', 'PATCH',
+         '/api/v1/posts/{own_post}/comments/{own_comment}/',
+         {'text': 'Исправленный комментарий'}, auth=True),
+    Case('comments.destroy', 'DELETE',
+         '/api/v1/posts/{own_post}/comments/{new_comment}/', auth=True,
+         setup=_new_comment),
+    Case('groups.list', 'GET', '/api/v1/groups/'),
+    Case('groups.retrieve', 'GET', '/api/v1/groups/{group}/'),
+    Case('follow.list', 'GET', '/api/v1/follow/', auth=True),
+    Case('follow.search', 'GET', '/api/v1/follow/?search=bench_user_1',
+         auth=True),
+    Case('follow.create', 'POST', '/api/v1/follow/',
+         {'following': '{target}'}, auth=True, setup=_not_following),
+    Case('follow.destroy', 'DELETE', '/api/v1/follow/{target}/', auth=True,
+         setup=_following),
+    Case('follow.batch', 'POST', '/api/v1/follow/batch/', _follow_batch,
+         auth=True),
+    Case('feed.list', 'GET', '/api/v1/feed/?page_size=20', auth=True),
+    Case('users.retrieve', 'GET', '/api/v1/users/{username}/'),
+    Case('sync.list', 'GET', '/api/v1/sync/?limit=100'),
+    Case('sync.list_recent', 'GET', '/api/v1/sync/?since={sync_since}'),
+    Case('jwt_create', 'POST', '/api/v1/jwt/create/', _credentials,
+         limit=20),
+    Case('jwt_refresh', 'POST', '/api/v1/jwt/refresh/',
+         {'refresh': '{refresh}'}),
+    Case('jwt_verify', 'POST', '/api/v1/jwt/verify/', {'token': '{access}'}),
+    Case('api_token_auth', 'POST', '/api/v1/api-token-auth/', _credentials,
+         limit=20),
+)
+
+
+def build_context(client):
+    """Идентификаторы объектов, которые подставляются в пути запросов."""
+    from django.contrib.auth import get_user_model
+    from posts.models import Change, Comment, Follow, Group, Post
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    comment = Comment.objects.order_by('pk').first()
+    # Публикация и комментарий клиента для изменений
+    own_post = Post.objects.create(author=client, text='Публикация клиента')
+    own_comment = Comment.objects.create(post=own_post, author=client,
+                                         text='Комментарий клиента')
+    followed = Follow.objects.filter(user=client).values_list(
+        'following_id', flat=True)
+    target = (get_user_model().objects.exclude(pk__in=followed)
+              .exclude(pk=client.pk).order_by('pk').first())
+    refresh = RefreshToken.for_user(client)
+    return {
+        'post': comment.post_id,
+        'comment': comment.pk,
+        # Страница ленты из 20 публикаций
+        'post_ids': ','.join(map(str, Post.objects.values_list(
+            'pk', flat=True)[:20])),
+        'group': Group.objects.order_by('pk').values_list(
+            'pk', flat=True).first(),
+        'username': comment.author.username,
+        'client': client.pk,
+        'own_post': own_post.pk,
+        'own_comment': own_comment.pk,
+        'target': target.username,
+        'target_id': target.pk,
+        # Клиент, отставший на 20 изменений
+        'sync_since': max(Change.objects.order_by('-pk').values_list(
+            'pk', flat=True).first() - 20, 0),
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+    }
+
+
+class ClientDriver:
+    """Тестовый клиент Django: весь стек без сети."""
+    name = 'client'
+
+    def __init__(self):
+        from django.test import Client
+        self.client = Client()
+
+    def request(self, method, path, data, headers):
+        extra = {f'HTTP_{name.upper()}': value
+                 for name, value in headers.items()}
+        response = self.client.generic(
+            method, path,
+            json.dumps(data) if data is not None else '',
+            content_type='application/json', **extra
+        )
+        return response.status_code, response.get('Server-Timing', '')
+
+    def close(self):
+        pass
+
+
+class QuietHandler(WSGIRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+class WSGIServerDriver:
+    """HTTP-запросы к WSGI-серверу ``wsgiref`` в отдельном потоке."""
+    name = 'wsgi'
+
+    def __init__(self):
+        from django.core.wsgi import get_wsgi_application
+        self.server = make_server('127.0.0.1', 0, get_wsgi_application(),
+                                  handler_class=QuietHandler)
+        self.port = self.server.server_port
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       daemon=True)
+        self.thread.start()
+
+    def request(self, method, path, data, headers):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port)
+        try:
+            connection.request(
+                method, quote(path, safe='/?&='),
+                json.dumps(data).encode() if data is not None else None,
+                {'Content-Type': 'application/json', **headers},
+            )
+            response = connection.getresponse()
+            response.read()
+            return response.status, response.getheader('Server-Timing', '')
+        finally:
+            connection.close()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def percentile(values, fraction):
+    """Перцентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * fraction) - 1)]
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def _reset_caches():
+    from django.core.cache import caches
+    for cache in caches.all():
+        cache.clear()
+
+
+def run_case(driver, case, context, options):
+    headers = ({'Authorization': f"Bearer {context['access']}"}
+               if case.auth else {})
+    requests = min(options['requests'], case.limit or options['requests'])
+    warmup = min(options['warmup'], requests)
+    _reset_caches()
+    latencies, queries, statuses = [], [], set()
+    for index in range(warmup + requests):
+        path, data = case.build(context, index)
+        started = time.perf_counter()
+        status, timing = driver.request(case.method, path, data, headers)
+        elapsed = time.perf_counter() - started
+        if index < warmup:
+            continue
+        latencies.append(elapsed)
+        statuses.add(status)
+        match = QUERIES_RE.search(timing)
+        if match:
+            queries.append(int(match.group(1)))
+    result = {
+        'requests': requests,
+        'statuses': sorted(statuses),
+        'p50_ms': _ms(percentile(latencies, 0.5)),
+        'p95_ms': _ms(percentile(latencies, 0.95)),
+        'p99_ms': _ms(percentile(latencies, 0.99)),
+        'mean_ms': _ms(statistics.fmean(latencies)),
+        'queries_per_request': (statistics.median(queries)
+                                if queries else None),
+    }
+    if driver.name == 'client':
+        result['peak_memory_kib'] = measure_memory(
+            driver, case, context, headers
+        )
+    return result
+
+
+def measure_memory(driver, case, context, headers):
+    tracemalloc.start()
+    try:
+        for index in range(MEMORY_REQUESTS):
+            path, data = case.build(context, index)
+            tracemalloc.reset_peak()
+            driver.request(case.method, path, data, headers)
+        return tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _measurement_settings():
+    """Замер каждого запроса и лимиты частоты, которые не срабатывают."""
+    from django.conf import settings
+    from django.test.utils import override_settings
+
+    from api import instrumentation
+    instrumentation.PERFORMANCE_SAMPLE_RATE = 1
+    # get_wsgi_application() заново применяет LOGGING, поэтому строки лога
+    # отправляются в отдельный логгер без вывода
+    silent = logging.getLogger('benchmarks.performance')
+    silent.addHandler(logging.NullHandler())
+    silent.propagate = False
+    instrumentation.logger = silent
+    rates = settings.REST_FRAMEWORK.get('DEFAULT_THROTTLE_RATES', {})
+    return override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': dict.fromkeys(rates, UNLIMITED_RATE),
+    })
+
+
+def run(options, write=print):
+    """Наполняет базу и прогоняет эндпоинты; возвращает результаты."""
+    import django
+
+    scale = {**dataset.SCALES[options['scale']]}
+    if options.get('posts'):
+        scale['posts'] = options['posts']
+    started = time.perf_counter()
+    client = dataset.seed(**scale, seed=options['seed'])
+    seed_seconds = time.perf_counter() - started
+    # Размер до прогона: эндпоинты записи добавляют строки
+    counts = dataset.counts()
+    write(f"Данные ({options['scale']}): {counts}, {seed_seconds:.1f} с")
+    context = build_context(client)
+    cases = [case for case in CASES
+             if not options['case'] or any(
+                 case.name.startswith(prefix) for prefix in options['case'])]
+    drivers = {'client': ClientDriver, 'wsgi': WSGIServerDriver}
+    results = {}
+    with _measurement_settings():
+        for driver_name in options['driver'] or DRIVERS:
+            driver = drivers[driver_name]()
+            try:
+                results[driver_name] = {}
+                for case in cases:
+                    result = run_case(driver, case, context, options)
+                    results[driver_name][case.name] = result
+                    write(format_result(driver_name, case.name, result))
+            finally:
+                driver.close()
+    return {
+        'meta': {
+            'commit': _commit(),
+            'scale': options['scale'],
+            'python': platform.python_version(),
+            'django': django.get_version(),
+        },
+        'dataset': {**counts, 'seed_seconds': round(seed_seconds, 1)},
+        'max_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'results': results,
+    }
+
+
+def format_result(driver, name, result):
+    queries = result['queries_per_request']
+    return (
+        f"{driver:6} {name:24} p50 {result['p50_ms']:8.2f} мс  "
+        f"p95 {result['p95_ms']:8.2f} мс  p99 {result['p99_ms']:8.2f} мс  "
+        f"SQL {'-' if queries is None else queries:>4}  "
+        f"{','.join(map(str, result['statuses']))}"
+    )
+
+
+def _change(old, new):
+    if not old:
+        return ''
+    return f'{(new - old) / old:+.0%}'
+
+
+def compare(baseline, current, write=print):
+    """Печатает изменение задержек и числа запросов относительно базы."""
+    for driver, cases in current['results'].items():
+        for name, result in cases.items():
+            old = baseline.get('results', {}).get(driver, {}).get(name)
+            if old is None:
+                continue
+            write(
+                f"{driver:6} {name:24} "
+                f"p50 {old['p50_ms']:.2f} → {result['p50_ms']:.2f} мс "
+                f"{_change(old['p50_ms'], result['p50_ms']):>5}  "
+                f"p95 {old['p95_ms']:.2f} → {result['p95_ms']:.2f} мс "
+                f"{_change(old['p95_ms'], result['p95_ms']):>5}  "
+                f"SQL {old['queries_per_request']} → "
+                f"{result['queries_per_request']}"
+            )
+
+
+def dump(results, path):
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=2, sort_keys=True,
+                  ensure_ascii=False)
+        file.write('\n')
@@ -0,0 +1,72 @@
+"""Накладные расходы ограничения частоты на разрешенном пути.
+
+    python -m benchmarks.throttling --calls 10000
+
+Сравнивает ``ReadRateThrottle`` (ведро токенов) с ``UserRateThrottle``
+из DRF (список времен запросов в кэше) при лимите, который не
+достигается: история DRF растет с каждым запросом периода. База данных
+не нужна.
+"""
+import argparse
+import time
+
+from benchmarks.utils import setup_django
+
+
+class User:
+    pk = 1
+    is_authenticated = True
+
+
+class View:
+    pass
+
+
+def per_call(throttle_class, request, calls):
+    view = View()
+    started = time.perf_counter()
+    for _ in range(calls):
+        if not throttle_class().allow_request(request, view):
+            raise AssertionError('лимит не должен достигаться')
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def run(calls):
+    from django.core.cache import caches
+    from django.test import override_settings
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from rest_framework.throttling import UserRateThrottle
+
+    from api.throttling import ReadRateThrottle
+
+    class DRFThrottle(UserRateThrottle):
+        rate = f'{calls * 2}/day'
+
+    request = Request(APIRequestFactory().get('/api/v1/posts/'))
+    request.user = User()
+    rates = {'user_read': f'{calls * 2}/day'}
+    with override_settings(REST_FRAMEWORK={
+            'DEFAULT_THROTTLE_RATES': rates}):
+        results = {}
+        for name, throttle_class in (
+            ('ведро токенов', ReadRateThrottle),
+            ('DRF UserRateThrottle', DRFThrottle),
+        ):
+            for cache in caches.all():
+                cache.clear()
+            results[name] = per_call(throttle_class, request, calls)
+            print(f'{name:22} {results[name]:8.2f} мкс на запрос')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=10000)
+    args = parser.parse_args()
+    setup_django()
+    run(args.calls)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import os
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube_api.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def temporary_database(verbosity=0, name=None):
+    """Создает тестовую базу (как test runner) и удаляет ее по выходе.
+
+    ``name`` — путь к файлу базы: нужен, если к ней обращаются другие
+    потоки или процессы.
+    """
+    from django.db import connection
+    from django.test.utils import (
+        setup_test_environment,
+        teardown_test_environment,
+    )
+    if name is not None:
+        connection.settings_dict['TEST']['NAME'] = name
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(
+        verbosity=verbosity, autoclobber=True, keepdb=False
+    )
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        teardown_test_environment()
+
+
+def seed_posts(count, authors=10, groups=5, comments_per_post=0):
+    """Быстро наполняет базу через bulk_create."""
+    from django.contrib.auth import get_user_model
+    from posts.models import Comment, Group, Post
+
+    User = get_user_model()
+    User.objects.bulk_create(
+        User(username=f'bench_user_{index}') for index in range(authors)
+    )
+    # bulk_create в SQLite не заполняет pk
+    users = list(User.objects.filter(username__startswith='bench_user_'))
+    Group.objects.bulk_create(
+        Group(title=f'Группа {index}', slug=f'bench-group-{index}',
+              description='')
+        for index in range(groups)
+    )
+    group_list = list(Group.objects.filter(slug__startswith='bench-group-'))
+    posts = [
+        Post(
+            text=f'Текст публикации номер {index} ' * 5,
+            author=users[index % len(users)],
+            group=group_list[index % len(group_list)] if index % 3 else None,
+            image=f'posts/bench_{index}.jpg' if index % 4 == 0 else None,
+        )
+        for index in range(count)
+    ]
+    Post.objects.bulk_create(posts, batch_size=1000)
+    if comments_per_post:
+        post_ids = list(Post.objects.values_list('pk', flat=True))
+        Comment.objects.bulk_create(
+            (
+                Comment(post_id=post_id, author=users[index % len(users)],
+                        text=f'Комментарий {index}')
+                for post_id in post_ids
+                for index in range(comments_per_post)
+            ),
+            batch_size=1000,
+        )
+    return users
+
+
+def measure(func, repeat=3):
+    """Лучшее время из ``repeat`` запусков, в секундах."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import Comment, Group, Post
+from .search import search_posts
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -9,6 +10,12 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по индексу вместо LIKE '%...%' по всей таблице
+        if not search_term:
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
@@ -0,0 +1,80 @@
+"""Журнал изменений публикаций и комментариев для синхронизации.
+
+Каждое сохранение и удаление добавляет в ``Change`` запись с новым
+номером; сигналы пишут ее в той же транзакции, что и само изменение,
+поэтому изменения из админки и каскадное удаление комментариев вместе с
+публикацией тоже попадают в журнал. Клиент хранит номер последнего
+полученного изменения и запрашивает только то, что случилось после него:
+страница журнала — диапазон первичного ключа.
+
+Номер выдается при вставке, а не при фиксации транзакции. В SQLite
+запись идет в одну транзакцию за раз, и номера видны строго по порядку;
+на базе с параллельной записью клиенту стоит отступать от полученного
+номера на небольшое окно.
+
+Журнал растет с каждой правкой; команда ``compact_changes`` удаляет
+записи, перекрытые более поздними для того же объекта. Надгробия
+удаленных объектов остаются, поэтому любой ранее выданный номер
+остается корректным. После сжатия созданный объект может прийти как
+измененный, так что клиенту стоит применять оба списка как «вставить или
+заменить».
+"""
+from django.db.models import Count, Max
+
+from .models import Change
+
+
+def record_change(kind, object_id, action):
+    Change.objects.create(kind=kind, object_id=object_id, action=action)
+
+
+def read_changes(since, limit):
+    """Изменения после номера ``since``, не больше ``limit`` записей.
+
+    Возвращает ``({kind: {'created': ids, 'updated': ids, 'deleted':
+    ids}}, token, has_more)``, где ``token`` — номер последней прочитанной
+    записи. Несколько записей об одном объекте сворачиваются: созданный и
+    затем измененный объект считается созданным, удаленный — удаленным.
+    """
+    entries = list(
+        Change.objects.filter(id__gt=since).order_by('id').values_list(
+            'id', 'kind', 'object_id', 'action'
+        )[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    first, last = {}, {}
+    for _, kind, object_id, action in entries:
+        first.setdefault((kind, object_id), action)
+        last[(kind, object_id)] = action
+    changes = {
+        kind: {Change.CREATED: [], Change.UPDATED: [], Change.DELETED: []}
+        for kind, _ in Change.KINDS
+    }
+    for key, action in last.items():
+        if action != Change.DELETED and first[key] == Change.CREATED:
+            action = Change.CREATED
+        changes[key[0]][action].append(key[1])
+    token = entries[-1][0] if entries else since
+    return changes, token, has_more
+
+
+def compact_changes():
+    """Удаляет записи, после которых у объекта есть более поздние.
+
+    Возвращает число удаленных записей.
+    """
+    superseded = list(
+        Change.objects.values('kind', 'object_id').annotate(
+            last_id=Max('id'), entries=Count('id')
+        ).filter(entries__gt=1).order_by().values_list(
+            'kind', 'object_id', 'last_id'
+        )
+    )
+    deleted = 0
+    for kind, object_id, last_id in superseded:
+        # Диапазон индекса (kind, object_id, id)
+        deleted += Change.objects.filter(
+            kind=kind, object_id=object_id, id__lt=last_id
+        ).delete()[0]
+    return deleted
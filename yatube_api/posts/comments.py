@@ -0,0 +1,35 @@
+"""Последние комментарии сразу для нескольких публикаций.
+
+Вместо запроса на каждую публикацию комментарии выбираются одним
+запросом: оконная функция ``ROW_NUMBER() OVER (PARTITION BY post_id
+ORDER BY created DESC, id DESC)`` нумерует комментарии внутри каждой
+публикации, и внешний запрос оставляет первые ``limit`` номеров. Окно
+читает покрывающий индекс ``(post, created, id)`` диапазоном на
+публикацию; сортируются только комментарии внутри одной публикации.
+"""
+from django.db.models import F, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+
+from .models import Comment
+
+
+def latest_comments(post_ids, limit):
+    """Выборка не более ``limit`` последних комментариев каждой публикации.
+
+    Комментарии одной публикации идут подряд в порядке создания, как и в
+    ``/posts/{id}/comments/``.
+    """
+    ranked = Comment.objects.filter(post_id__in=post_ids).annotate(
+        row_number=Window(
+            RowNumber(),
+            partition_by=[F('post_id')],
+            order_by=[F('created').desc(), F('id').desc()],
+        )
+    ).order_by().values('id', 'row_number')
+    sql, params = ranked.query.sql_with_params()
+    # Django 3.2 не фильтрует по оконным выражениям: окно — подзапрос
+    return Comment.objects.filter(id__in=RawSQL(
+        f'SELECT "id" FROM ({sql}) AS "ranked" WHERE "row_number" <= %s',
+        (*params, limit)
+    )).order_by('post_id', 'created', 'id')
@@ -0,0 +1,155 @@
+"""Денормализованные счетчики публикаций, комментариев и подписок.
+
+Счетчики меняются выражениями ``F()`` одним ``UPDATE``, поэтому
+параллельные запросы не теряют изменений. Массовые операции без сигналов
+(``bulk_create``, ``QuerySet.update``) счетчики не трогают — расхождения
+исправляет команда ``reconcile_counters``.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Comment, Follow, Post, UserStats
+
+User = get_user_model()
+
+RECONCILE_BATCH_SIZE = 1000
+
+# Счетчик пользователя → (модель, поле со ссылкой на пользователя)
+USER_COUNTERS = {
+    'posts_count': (Post, 'author'),
+    'followers_count': (Follow, 'following'),
+    'following_count': (Follow, 'user'),
+}
+
+
+def _actual_stats(user_id):
+    return {
+        counter: model.objects.filter(**{field: user_id}).count()
+        for counter, (model, field) in USER_COUNTERS.items()
+    }
+
+
+def change_user_stats(user_id, **deltas):
+    """Прибавляет к счетчикам пользователя значения ``deltas``."""
+    changes = {}
+    condition = Q()
+    for counter, delta in deltas.items():
+        changes[counter] = F(counter) + delta
+        if delta < 0:
+            # Счетчик не уходит в минус даже при расхождении
+            condition &= Q(**{f'{counter}__gte': -delta})
+    updated = UserStats.objects.filter(condition, user_id=user_id).update(
+        **changes
+    )
+    # Строку создаем только при увеличении: уменьшение без строки бывает
+    # при каскадном удалении пользователя вместе с его счетчиками
+    if updated or any(delta < 0 for delta in deltas.values()):
+        return
+    if UserStats.objects.filter(user_id=user_id).exists():
+        return
+    # Строки еще нет (например, пользователь создан через bulk_create):
+    # считаем значения по данным, которые уже включают это изменение
+    UserStats.objects.bulk_create(
+        [UserStats(user_id=user_id, **_actual_stats(user_id))],
+        ignore_conflicts=True
+    )
+
+
+def change_many_user_stats(user_ids, counter, delta):
+    """Меняет один счетчик сразу у нескольких пользователей."""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    condition = Q(user_id__in=user_ids)
+    if delta < 0:
+        condition &= Q(**{f'{counter}__gte': -delta})
+    updated = UserStats.objects.filter(condition).update(
+        **{counter: F(counter) + delta}
+    )
+    if updated == len(user_ids) or delta < 0:
+        return
+    missing = user_ids - set(
+        UserStats.objects.filter(user_id__in=user_ids)
+        .values_list('user_id', flat=True)
+    )
+    UserStats.objects.bulk_create(
+        [UserStats(user_id=user_id, **_actual_stats(user_id))
+         for user_id in missing],
+        ignore_conflicts=True
+    )
+
+
+def change_comment_count(post_id, delta):
+    condition = Q(pk=post_id)
+    if delta < 0:
+        condition &= Q(comment_count__gte=-delta)
+    # Число комментариев входит в ответ, поэтому меняется и дата изменения
+    Post.objects.filter(condition).update(
+        comment_count=F('comment_count') + delta,
+        updated=timezone.now()
+    )
+
+
+def _count_subquery(model, field):
+    counts = (
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def _batches(ids):
+    for start in range(0, len(ids), RECONCILE_BATCH_SIZE):
+        yield ids[start:start + RECONCILE_BATCH_SIZE]
+
+
+def reconcile_comment_counts():
+    """Исправляет ``Post.comment_count``; возвращает число исправленных."""
+    actual = _count_subquery(Comment, 'post')
+    drifted = list(
+        Post.objects.annotate(actual=actual)
+        .exclude(comment_count=F('actual'))
+        .values_list('pk', flat=True)
+    )
+    for ids in _batches(drifted):
+        # Значение пересчитывается в самом UPDATE, а не берется из выборки
+        Post.objects.filter(pk__in=ids).update(
+            comment_count=_count_subquery(Comment, 'post')
+        )
+    return len(drifted)
+
+
+def reconcile_user_stats():
+    """Создает недостающие ``UserStats`` и исправляет счетчики."""
+    missing = list(
+        User.objects.filter(stats__isnull=True).values_list('pk', flat=True)
+    )
+    UserStats.objects.bulk_create(
+        [UserStats(user_id=pk) for pk in missing],
+        batch_size=RECONCILE_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+    annotations = {
+        f'actual_{counter}': _count_subquery(model, field)
+        for counter, (model, field) in USER_COUNTERS.items()
+    }
+    drift = Q()
+    for counter in USER_COUNTERS:
+        drift |= ~Q(**{counter: F(f'actual_{counter}')})
+    # Подзапросы коррелируют по pk, а у UserStats он совпадает с user_id
+    drifted = list(
+        UserStats.objects.annotate(**annotations)
+        .filter(drift)
+        .values_list('pk', flat=True)
+    )
+    for ids in _batches(drifted):
+        UserStats.objects.filter(pk__in=ids).update(**{
+            counter: _count_subquery(model, field)
+            for counter, (model, field) in USER_COUNTERS.items()
+        })
+    return len(drifted)
@@ -0,0 +1,128 @@
+"""Материализованная лента публикаций по подпискам.
+
+Публикации обычных авторов раскладываются по лентам подписчиков при
+записи (fan-out-on-write). Для авторов с очень большим числом подписчиков
+раскладка при записи слишком дорога: их публикации подтягиваются в ленту
+читателя при чтении (fan-out-on-read), начиная с ``Follow.feed_synced``.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import FeedEntry, Follow, Post
+
+# Порог числа подписчиков, после которого автор читается «по запросу»
+FEED_FANOUT_LIMIT = getattr(settings, 'FEED_FANOUT_LIMIT', 1000)
+# Сколько последних публикаций автора попадает в ленту при подписке
+FEED_BACKFILL_SIZE = getattr(settings, 'FEED_BACKFILL_SIZE', 50)
+FEED_BATCH_SIZE = 500
+PULL_AUTHOR_CACHE_TIMEOUT = 600
+
+
+def _pull_author_key(author_id):
+    return f'feed:pull-author:{author_id}'
+
+
+def _create_entries(entries):
+    FeedEntry.objects.bulk_create(
+        entries, batch_size=FEED_BATCH_SIZE, ignore_conflicts=True
+    )
+
+
+def fan_out_post(post):
+    """Раскладывает новую публикацию по лентам подписчиков автора."""
+    followers = list(
+        Follow.objects.filter(following_id=post.author_id)
+        .values_list('user_id', flat=True)[:FEED_FANOUT_LIMIT + 1]
+    )
+    is_pull_author = len(followers) > FEED_FANOUT_LIMIT
+    cache.set(
+        _pull_author_key(post.author_id),
+        is_pull_author,
+        PULL_AUTHOR_CACHE_TIMEOUT
+    )
+    if is_pull_author:
+        return
+    _create_entries([
+        FeedEntry(user_id=user_id, post_id=post.pk, pub_date=post.pub_date)
+        for user_id in followers
+    ])
+
+
+def backfill_follow(follow):
+    """Добавляет в ленту подписчика последние публикации нового автора."""
+    posts = (
+        Post.objects.filter(author_id=follow.following_id)
+        .order_by('-pub_date')
+        .values_list('pk', 'pub_date')[:FEED_BACKFILL_SIZE]
+    )
+    entries = [
+        FeedEntry(user_id=follow.user_id, post_id=pk, pub_date=pub_date)
+        for pk, pub_date in posts
+    ]
+    _create_entries(entries)
+    # Дальнейшие публикации «тяжелых» авторов подтягиваются при чтении
+    follow.feed_synced = max(
+        (entry.pub_date for entry in entries), default=None
+    )
+    Follow.objects.filter(pk=follow.pk).update(
+        feed_synced=follow.feed_synced
+    )
+
+
+def get_pull_authors(author_ids):
+    """Возвращает авторов, чьи публикации раскладываются при чтении."""
+    keys = {_pull_author_key(author_id): author_id
+            for author_id in author_ids}
+    cached = cache.get_many(keys)
+    missing = [author_id for key, author_id in keys.items()
+               if key not in cached]
+    pull_authors = {keys[key] for key, value in cached.items() if value}
+    if missing:
+        heavy = set(
+            Follow.objects.filter(following_id__in=missing)
+            .values('following_id')
+            .annotate(followers=Count('id'))
+            .filter(followers__gt=FEED_FANOUT_LIMIT)
+            .values_list('following_id', flat=True)
+        )
+        cache.set_many(
+            {_pull_author_key(author_id): author_id in heavy
+             for author_id in missing},
+            PULL_AUTHOR_CACHE_TIMEOUT
+        )
+        pull_authors |= heavy
+    return pull_authors
+
+
+def pull_feed(user):
+    """Подтягивает в ленту публикации авторов с fan-out-on-read."""
+    follows = dict(
+        Follow.objects.filter(user=user)
+        .values_list('following_id', 'feed_synced')
+    )
+    pull_authors = get_pull_authors(follows)
+    if not pull_authors:
+        return
+    condition = Q()
+    for author_id in pull_authors:
+        author_condition = Q(author_id=author_id)
+        if follows[author_id] is not None:
+            # gte: уже добавленные записи отсеет unique_feed_entry
+            author_condition &= Q(pub_date__gte=follows[author_id])
+        condition |= author_condition
+    posts = list(
+        Post.objects.filter(condition)
+        .values_list('pk', 'author_id', 'pub_date')
+    )
+    _create_entries([
+        FeedEntry(user_id=user.pk, post_id=pk, pub_date=pub_date)
+        for pk, _, pub_date in posts
+    ])
+    synced = {}
+    for _, author_id, pub_date in posts:
+        synced[author_id] = max(pub_date, synced.get(author_id, pub_date))
+    for author_id, pub_date in synced.items():
+        Follow.objects.filter(user=user, following_id=author_id).update(
+            feed_synced=pub_date
+        )
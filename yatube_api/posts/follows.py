@@ -0,0 +1,139 @@
+"""Подписки и отписки по именам пользователей за один запрос к базе.
+
+Вместо проверки ``exists()`` перед вставкой подписка полагается на
+ограничение ``unique_follow``: ``INSERT ... SELECT ... ON CONFLICT DO
+NOTHING RETURNING`` находит авторов по имени, пропускает существующие
+подписки и возвращает только созданные строки. Так же ``DELETE ...
+RETURNING`` возвращает удаленные подписки. Сигналы моделей при этом не
+срабатывают, поэтому счетчики и ленты обновляются здесь же.
+
+Если база не поддерживает ``RETURNING``, используется ``bulk_create`` с
+``ignore_conflicts=True`` и обычное удаление через ORM.
+"""
+from sqlite3 import sqlite_version_info
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+
+from .counters import change_many_user_stats, change_user_stats
+from .feed import backfill_follow
+from .models import FeedEntry, Follow
+
+User = get_user_model()
+
+
+def _returning_supported():
+    # Django 3.2 не использует RETURNING в SQLite, хотя SQLite 3.35+
+    # его поддерживает, поэтому версию проверяем сами
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        return sqlite_version_info >= (3, 35)
+    return False
+
+
+def _placeholders(values):
+    return ', '.join(['%s'] * len(values))
+
+
+def _insert_follows(user, usernames):
+    qn = connection.ops.quote_name
+    follow_meta = Follow._meta
+    user_meta = User._meta
+    user_pk = qn(user_meta.pk.column)
+    # WHERE обязателен: без него SQLite путает ON CONFLICT с JOIN ... ON
+    sql = (
+        f'INSERT INTO {qn(follow_meta.db_table)} '
+        f'({qn("user_id")}, {qn("following_id")}) '
+        f'SELECT %s, {user_pk} FROM {qn(user_meta.db_table)} '
+        f'WHERE {qn(User.USERNAME_FIELD)} IN ({_placeholders(usernames)}) '
+        f'AND {user_pk} <> %s '
+        f'ON CONFLICT DO NOTHING '
+        f'RETURNING {qn(follow_meta.pk.column)}, {qn("following_id")}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [user.pk, *usernames, user.pk])
+        rows = cursor.fetchall()
+    return [
+        Follow(pk=pk, user_id=user.pk, following_id=following_id)
+        for pk, following_id in rows
+    ]
+
+
+def _bulk_create_follows(user, usernames):
+    authors = set(
+        User.objects.filter(**{f'{User.USERNAME_FIELD}__in': usernames})
+        .exclude(pk=user.pk)
+        .values_list('pk', flat=True)
+    )
+    authors -= set(
+        Follow.objects.filter(user=user, following_id__in=authors)
+        .values_list('following_id', flat=True)
+    )
+    Follow.objects.bulk_create(
+        [Follow(user=user, following_id=author_id) for author_id in authors],
+        ignore_conflicts=True
+    )
+    return list(Follow.objects.filter(user=user, following_id__in=authors))
+
+
+def follow_users(user, usernames):
+    """Подписывает пользователя на авторов; возвращает новые подписки."""
+    usernames = list(dict.fromkeys(usernames))
+    if not usernames:
+        return []
+    with transaction.atomic():
+        if _returning_supported():
+            follows = _insert_follows(user, usernames)
+        else:
+            follows = _bulk_create_follows(user, usernames)
+        if follows:
+            change_user_stats(user.pk, following_count=len(follows))
+            change_many_user_stats(
+                [follow.following_id for follow in follows],
+                'followers_count', 1
+            )
+    for follow in follows:
+        backfill_follow(follow)
+    return follows
+
+
+def _delete_follows(user, usernames):
+    qn = connection.ops.quote_name
+    user_meta = User._meta
+    sql = (
+        f'DELETE FROM {qn(Follow._meta.db_table)} '
+        f'WHERE {qn("user_id")} = %s AND {qn("following_id")} IN ('
+        f'SELECT {qn(user_meta.pk.column)} FROM {qn(user_meta.db_table)} '
+        f'WHERE {qn(User.USERNAME_FIELD)} IN ({_placeholders(usernames)})'
+        f') RETURNING {qn("following_id")}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [user.pk, *usernames])
+        return [following_id for following_id, in cursor.fetchall()]
+
+
+def unfollow_users(user, usernames):
+    """Отписывает пользователя от авторов; возвращает id авторов."""
+    usernames = list(dict.fromkeys(usernames))
+    if not usernames:
+        return []
+    with transaction.atomic():
+        if _returning_supported():
+            authors = _delete_follows(user, usernames)
+            if authors:
+                change_user_stats(user.pk, following_count=-len(authors))
+                change_many_user_stats(authors, 'followers_count', -1)
+        else:
+            # Счетчики обновят сигналы post_delete
+            follows = Follow.objects.filter(
+                user=user,
+                **{f'following__{User.USERNAME_FIELD}__in': usernames}
+            )
+            authors = list(follows.values_list('following_id', flat=True))
+            follows.delete()
+        # Публикации бывших авторов убираем из ленты
+        FeedEntry.objects.filter(
+            user=user, post__author_id__in=authors
+        ).delete()
+    return authors
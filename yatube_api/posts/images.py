@@ -0,0 +1,93 @@
+"""Фоновая подготовка уменьшенных копий изображений публикаций.
+
+Оригинал сохраняется в запросе как есть, а варианты (``thumb``, ``medium``,
+``webp``) строятся в локальном пуле процессов после фиксации транзакции.
+Пути к готовым вариантам записываются в ``Post.image_variants``.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+
+from .imaging import DEFAULT_VARIANTS, render_variants
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+IMAGE_PROCESSING_ASYNC = getattr(settings, 'IMAGE_PROCESSING_ASYNC', True)
+IMAGE_PROCESSING_WORKERS = getattr(settings, 'IMAGE_PROCESSING_WORKERS', 2)
+IMAGE_VARIANTS = getattr(settings, 'IMAGE_VARIANTS', DEFAULT_VARIANTS)
+VARIANTS_DIR = 'posts/variants'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: дочерние процессы не наследуют соединения с базой
+            # и потоки веб-сервера
+            _executor = ProcessPoolExecutor(
+                max_workers=IMAGE_PROCESSING_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+    return _executor
+
+
+def variant_url(path, request=None):
+    url = default_storage.url(path)
+    return request.build_absolute_uri(url) if request else url
+
+
+def _store_variants(post_id, image_name, rendered):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or post.image.name != image_name:
+        # Публикацию удалили или заменили изображение, пока шла обработка
+        return
+    variants = {}
+    for name, (extension, content) in rendered.items():
+        path = f'{VARIANTS_DIR}/{post_id}/{name}.{extension}'
+        default_storage.delete(path)
+        variants[name] = default_storage.save(path, ContentFile(content))
+    post.image_variants = variants
+    post.save(update_fields=['image_variants', 'updated'])
+
+
+def _on_done(post_id, image_name):
+    def callback(future):
+        try:
+            _store_variants(post_id, image_name, future.result())
+        except Exception:
+            logger.exception(
+                'Не удалось обработать изображение публикации %s', post_id
+            )
+        finally:
+            # Колбэк выполняется в служебном потоке пула
+            close_old_connections()
+    return callback
+
+
+def process_post_image(post):
+    if not post.image:
+        return
+    with post.image.open('rb') as image_file:
+        data = image_file.read()
+    if not IMAGE_PROCESSING_ASYNC:
+        _store_variants(post.pk, post.image.name,
+                        render_variants(data, IMAGE_VARIANTS))
+        return
+    future = get_executor().submit(render_variants, data, IMAGE_VARIANTS)
+    future.add_done_callback(_on_done(post.pk, post.image.name))
+
+
+def schedule_image_processing(post):
+    """Ставит обработку изображения в очередь после фиксации транзакции."""
+    if post.image:
+        transaction.on_commit(lambda: process_post_image(post))
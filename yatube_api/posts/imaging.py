@@ -0,0 +1,39 @@
+"""Обработка изображений в отдельном процессе.
+
+Модуль не зависит от Django: функции выполняются в процессах пула
+``concurrent.futures`` и получают/возвращают только байты.
+"""
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+# name: (максимальная сторона, формат, расширение)
+DEFAULT_VARIANTS = {
+    'thumb': (320, 'JPEG', 'jpg'),
+    'medium': (1080, 'JPEG', 'jpg'),
+    'webp': (1080, 'WEBP', 'webp'),
+}
+QUALITY = 85
+
+
+def render_variants(data, variants=None):
+    """Возвращает словарь ``name -> (расширение, байты)``.
+
+    Изображение поворачивается по EXIF-ориентации, после чего сохраняется
+    заново без метаданных (EXIF, GPS, ICC-профили камеры не копируются).
+    """
+    variants = variants or DEFAULT_VARIANTS
+    with Image.open(BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        image.load()
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+
+    result = {}
+    for name, (size, image_format, extension) in variants.items():
+        variant = image.copy()
+        variant.thumbnail((size, size), Image.LANCZOS)
+        buffer = BytesIO()
+        variant.save(buffer, image_format, quality=QUALITY, optimize=True)
+        result[name] = (extension, buffer.getvalue())
+    return result
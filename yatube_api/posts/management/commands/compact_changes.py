@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts.changes import compact_changes
+
+
+class Command(BaseCommand):
+    help = 'Удаляет из журнала изменений перекрытые более поздними записи.'
+
+    def handle(self, *args, **options):
+        deleted = compact_changes()
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено записей журнала: {deleted}.'
+        ))
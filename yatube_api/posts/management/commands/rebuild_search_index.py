@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс по тексту публикаций.'
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        backend.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f'Индекс перестроен ({backend.name}).')
+        )
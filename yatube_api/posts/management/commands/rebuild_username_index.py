@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts import user_search
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает индекс имен пользователей для поиска подписок.'
+
+    def handle(self, *args, **options):
+        user_search.rebuild()
+        trigrams = (
+            'с триграммами' if user_search.FOLLOW_SEARCH_TRIGRAMS
+            else 'без триграмм'
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Индекс имен перестроен ({trigrams}).')
+        )
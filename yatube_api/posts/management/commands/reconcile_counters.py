@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import reconcile_comment_counts, reconcile_user_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счетчики по данным.'
+
+    def handle(self, *args, **options):
+        posts = reconcile_comment_counts()
+        users = reconcile_user_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено публикаций: {posts}, пользователей: {users}.'
+        ))
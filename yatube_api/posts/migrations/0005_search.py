@@ -0,0 +1,54 @@
+# Generated by Django 3.2 on 2026-10-18 19:24
+
+from django.db import migrations, models
+from django.db.utils import OperationalError
+import django.db.models.deletion
+
+FTS_TABLE = 'posts_post_fts'
+
+
+def create_fts_table(apps, schema_editor):
+    # FTS5 есть только в SQLite, и то не в каждой сборке: без него
+    # поиск использует таблицу PostSearchToken
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+            "text, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    except OperationalError:
+        return
+    schema_editor.execute(
+        f'INSERT INTO {FTS_TABLE} (rowid, text) '
+        'SELECT id, text FROM posts_post'
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_updated'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Слово')),
+                ('weight', models.PositiveIntegerField(verbose_name='Частота')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='posts.post', verbose_name='Публикация')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='postsearchtoken',
+            constraint=models.UniqueConstraint(fields=('term', 'post'), name='unique_search_token'),
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 3.2 on 2026-10-18 19:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_search_names(apps, schema_editor):
+    # Триграммы заполняет rebuild_username_index после их включения
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    UserSearchName = apps.get_model('posts', 'UserSearchName')
+    UserSearchName.objects.bulk_create(
+        [UserSearchName(user_id=pk, name=username.lower())
+         for pk, username in User.objects.values_list('pk', 'username')],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0007_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchName',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_name', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('name', models.CharField(db_index=True, max_length=150, verbose_name='Имя')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UsernameTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3, verbose_name='Триграмма')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='username_trigrams', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='usernametrigram',
+            constraint=models.UniqueConstraint(fields=('trigram', 'user'), name='unique_username_trigram'),
+        ),
+        migrations.RunPython(fill_search_names, migrations.RunPython.noop),
+    ]
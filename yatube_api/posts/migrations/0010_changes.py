@@ -0,0 +1,43 @@
+# Generated by Django 3.2 on 2026-10-18 20:15
+
+from django.db import migrations, models
+
+
+def fill_changes(apps, schema_editor):
+    # Уже существующие объекты попадают в журнал как созданные
+    Change = apps.get_model('posts', 'Change')
+    for kind, model in (('post', 'Post'), ('comment', 'Comment')):
+        ids = apps.get_model('posts', model).objects.order_by(
+            'pk').values_list('pk', flat=True)
+        Change.objects.bulk_create(
+            [Change(kind=kind, object_id=pk, action='created')
+             for pk in ids.iterator()],
+            batch_size=1000
+        )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('post', 'Публикация'), ('comment', 'Комментарий')], max_length=16, verbose_name='Тип объекта')),
+                ('object_id', models.BigIntegerField(verbose_name='Идентификатор объекта')),
+                ('action', models.CharField(choices=[('created', 'Создание'), ('updated', 'Изменение'), ('deleted', 'Удаление')], max_length=16, verbose_name='Действие')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата изменения')),
+            ],
+            options={
+                'ordering': ('id',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(fields=['kind', 'object_id', 'id'], name='change_object_idx'),
+        ),
+        migrations.RunPython(fill_changes, migrations.RunPython.noop),
+    ]
@@ -9,6 +9,11 @@ class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    updated = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+        db_index=True
+    )
 
     def __str__(self):
         return self.title
@@ -20,28 +25,92 @@ class Post(models.Model):
         'Дата публикации',
         auto_now_add=True
     )
+    updated = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+        db_index=True
+    )
+    # Отдельные индексы по author и group не нужны: эти поля — первые
+    # в составных индексах из Meta
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='posts'
+        related_name='posts',
+        db_index=False
     )
     image = models.ImageField(
         upload_to='posts/',
         null=True,
         blank=True
     )
+    # Пути к уменьшенным копиям изображения, см. posts/images.py
+    image_variants = models.JSONField(
+        'Варианты изображения',
+        default=dict,
+        blank=True,
+        editable=False
+    )
     group = models.ForeignKey(
         Group,
         on_delete=models.SET_NULL,
         related_name='posts',
         blank=True,
-        null=True
+        null=True,
+        db_index=False
+    )
+    # Поддерживается сигналами, см. posts/counters.py
+    comment_count = models.PositiveIntegerField(
+        'Число комментариев',
+        default=0,
+        editable=False
     )
 
+    class Meta:
+        # id — второй ключ: публикации с одинаковой датой идут в
+        # постоянном порядке, и страницы LIMIT/OFFSET не пересекаются
+        ordering = ('-pub_date', '-id')
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.text[:50]
 
 
+class PostSearchToken(models.Model):
+    """Инвертированный индекс по тексту публикаций (переносимый поиск)."""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='search_tokens',
+        verbose_name='Публикация'
+    )
+    term = models.CharField('Слово', max_length=64)
+    weight = models.PositiveIntegerField('Частота')
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=['term', 'post'],
+                name='unique_search_token'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.term} → {self.post_id}'
+
+
 class Comment(models.Model):
     author = models.ForeignKey(
         User,
@@ -49,19 +118,35 @@ class Comment(models.Model):
         related_name='comments',
         verbose_name='Автор комментария'
     )
+    # Комментарии всегда читаются по публикации: индекс по post входит
+    # в составной индекс из Meta
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
         related_name='comments',
-        verbose_name='Публикация'
+        verbose_name='Публикация',
+        db_index=False
     )
     text = models.TextField(verbose_name='Текст комментария')
     created = models.DateTimeField(
         'Время добавления',
-        auto_now_add=True,
+        auto_now_add=True
+    )
+    updated = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
         db_index=True
     )
 
+    class Meta:
+        ordering = ('created', 'id')
+        indexes = [
+            models.Index(
+                fields=['post', 'created', 'id'],
+                name='comment_post_created_idx'
+            ),
+        ]
+
     def __str__(self):
         return f'{self.author}: {self.text[:30]}'
 
@@ -79,6 +164,11 @@ class Follow(models.Model):
         related_name='following',
         verbose_name='Автор'
     )
+    feed_synced = models.DateTimeField(
+        'Лента синхронизирована до',
+        null=True,
+        blank=True
+    )
 
     class Meta:
         constraints = [
@@ -90,3 +180,133 @@ class Follow(models.Model):
 
     def __str__(self):
         return f'{self.user.username} → {self.following.username}'
+
+
+class UserStats(models.Model):
+    """Счетчики пользователя, поддерживаемые сигналами."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Пользователь'
+    )
+    posts_count = models.PositiveIntegerField('Публикации', default=0)
+    followers_count = models.PositiveIntegerField('Подписчики', default=0)
+    following_count = models.PositiveIntegerField('Подписки', default=0)
+
+    def __str__(self):
+        return f'{self.user_id}: {self.posts_count}/{self.followers_count}'
+
+
+class UserSearchName(models.Model):
+    """Имя пользователя в нижнем регистре для поиска по префиксу."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='search_name',
+        verbose_name='Пользователь'
+    )
+    name = models.CharField('Имя', max_length=150, db_index=True)
+
+    def __str__(self):
+        return self.name
+
+
+class UsernameTrigram(models.Model):
+    """Триграммы имени пользователя для поиска по подстроке."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='username_trigrams',
+        verbose_name='Пользователь'
+    )
+    trigram = models.CharField('Триграмма', max_length=3)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=['trigram', 'user'],
+                name='unique_username_trigram'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.trigram} → {self.user_id}'
+
+
+class FeedEntry(models.Model):
+    """Запись материализованной ленты: публикация автора для подписчика."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Читатель'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Публикация'
+    )
+    # Копия Post.pub_date: лента читается одним диапазоном по индексу
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_feed_entry'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='feed_user_pub_date_idx'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} ← {self.post_id}'
+
+
+class Change(models.Model):
+    """Запись журнала изменений публикаций и комментариев.
+
+    Журнал только дополняется: ``id`` — монотонный номер изменения, по
+    которому клиенты синхронизации запрашивают все, что случилось после
+    известного им номера. Удаление оставляет запись-надгробие.
+    """
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ACTIONS = (
+        (CREATED, 'Создание'),
+        (UPDATED, 'Изменение'),
+        (DELETED, 'Удаление'),
+    )
+    POST = 'post'
+    COMMENT = 'comment'
+    KINDS = (
+        (POST, 'Публикация'),
+        (COMMENT, 'Комментарий'),
+    )
+
+    kind = models.CharField('Тип объекта', max_length=16, choices=KINDS)
+    # Без внешнего ключа: надгробие переживает удаленный объект
+    object_id = models.BigIntegerField('Идентификатор объекта')
+    action = models.CharField('Действие', max_length=16, choices=ACTIONS)
+    created = models.DateTimeField('Дата изменения', auto_now_add=True)
+
+    class Meta:
+        ordering = ('id',)
+        indexes = [
+            models.Index(
+                fields=['kind', 'object_id', 'id'],
+                name='change_object_idx'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.id}: {self.action} {self.kind} {self.object_id}'
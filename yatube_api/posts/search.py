@@ -0,0 +1,165 @@
+"""Полнотекстовый поиск по тексту публикаций.
+
+На SQLite с модулем FTS5 используется виртуальная таблица
+``posts_post_fts``. На остальных базах (или при ``SEARCH_BACKEND =
+'tokens'``) работает переносимый инвертированный индекс — модель
+``PostSearchToken``. Оба варианта добавляют к выборке публикаций
+аннотацию ``search_rank``: чем меньше значение, тем выше релевантность.
+"""
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.expressions import RawSQL
+
+from .models import Post, PostSearchToken
+
+SEARCH_BACKEND = getattr(settings, 'SEARCH_BACKEND', 'auto')
+FTS_TABLE = 'posts_post_fts'
+TERM_MAX_LENGTH = 64
+BATCH_SIZE = 1000
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    return [
+        term[:TERM_MAX_LENGTH]
+        for term in TOKEN_RE.findall(text.lower())
+        if len(term) > 1 or term.isdigit()
+    ]
+
+
+class FTS5Backend:
+    name = 'fts5'
+
+    @staticmethod
+    def match_expression(terms):
+        # Каждое слово — отдельная фраза в кавычках: пользовательский ввод
+        # не интерпретируется как синтаксис запроса FTS5
+        return ' '.join('"%s"' % term.replace('"', '""') for term in terms)
+
+    def index(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.pk]
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, text) VALUES (%s, %s)',
+                [post.pk, post.text]
+            )
+
+    def remove(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id]
+            )
+
+    def rebuild(self):
+        table = Post._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, text) '
+                f'SELECT id, text FROM {table}'
+            )
+
+    def search(self, queryset, terms):
+        match = self.match_expression(terms)
+        table = Post._meta.db_table
+        return queryset.filter(
+            pk__in=RawSQL(
+                f'SELECT rowid FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s',
+                (match,)
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT bm25({FTS_TABLE}) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s '
+                f'AND {FTS_TABLE}.rowid = {table}.id',
+                (match,)
+            )
+        )
+
+
+class TokenBackend:
+    name = 'tokens'
+
+    @staticmethod
+    def build_tokens(post):
+        return [
+            PostSearchToken(post_id=post.pk, term=term, weight=weight)
+            for term, weight in Counter(tokenize(post.text)).items()
+        ]
+
+    def index(self, post):
+        self.remove(post.pk)
+        PostSearchToken.objects.bulk_create(self.build_tokens(post))
+
+    def remove(self, post_id):
+        PostSearchToken.objects.filter(post_id=post_id).delete()
+
+    def rebuild(self):
+        PostSearchToken.objects.all().delete()
+        tokens = []
+        for post in Post.objects.only('pk', 'text').iterator(BATCH_SIZE):
+            tokens.extend(self.build_tokens(post))
+            if len(tokens) >= BATCH_SIZE:
+                PostSearchToken.objects.bulk_create(tokens)
+                tokens = []
+        PostSearchToken.objects.bulk_create(tokens)
+
+    def search(self, queryset, terms):
+        terms = sorted(set(terms))
+        matches = PostSearchToken.objects.filter(term__in=terms)
+        # Публикация должна содержать все слова запроса
+        matched_posts = (
+            matches.values('post')
+            .annotate(matched=Count('term'))
+            .filter(matched=len(terms))
+            .values('post')
+        )
+        # Вес — суммарная частота слов; со знаком минус, чтобы, как и у
+        # bm25, меньшее значение означало более релевантный результат
+        rank = (
+            matches.filter(post=OuterRef('pk'))
+            .values('post')
+            .annotate(rank=-Sum('weight'))
+            .values('rank')
+        )
+        return queryset.filter(pk__in=matched_posts).annotate(
+            search_rank=Subquery(rank)
+        )
+
+
+_backend = None
+
+
+def fts5_available():
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        return FTS_TABLE in connection.introspection.table_names(cursor)
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if SEARCH_BACKEND == 'tokens' or not fts5_available():
+            _backend = TokenBackend()
+        else:
+            _backend = FTS5Backend()
+    return _backend
+
+
+def search_posts(queryset, query):
+    """Фильтрует публикации по запросу и сортирует по релевантности."""
+    terms = tokenize(query)
+    if not terms:
+        return queryset.none()
+    return get_backend().search(queryset, terms).order_by(
+        'search_rank', '-id'
+    )
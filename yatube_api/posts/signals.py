@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .changes import record_change
+from .counters import change_comment_count, change_user_stats
+from .models import Change, Comment, Follow, Post, UserStats
+from .search import get_backend
+from .user_search import index_user
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    # Индекс поиска обновляется только при изменении текста
+    update_fields = kwargs.get('update_fields')
+    if update_fields is None or 'text' in update_fields:
+        get_backend().index(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_index(sender, instance, **kwargs):
+    get_backend().remove(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def create_user_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=User)
+def index_username(sender, instance, raw=False, update_fields=None,
+                   **kwargs):
+    # Например, last_login меняется при каждом входе, имя — нет
+    if raw or (update_fields is not None
+               and User.USERNAME_FIELD not in update_fields):
+        return
+    index_user(instance)
+
+
+@receiver(post_save, sender=Post)
+def count_created_post(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        change_user_stats(instance.author_id, posts_count=1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    change_user_stats(instance.author_id, posts_count=-1)
+
+
+@receiver(post_save, sender=Comment)
+def count_created_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        change_comment_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    change_comment_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def count_created_follow(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        change_user_stats(instance.user_id, following_count=1)
+        change_user_stats(instance.following_id, followers_count=1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_deleted_follow(sender, instance, **kwargs):
+    change_user_stats(instance.user_id, following_count=-1)
+    change_user_stats(instance.following_id, followers_count=-1)
+
+
+@receiver(post_save, sender=Post)
+def log_saved_post(sender, instance, created, **kwargs):
+    record_change(Change.POST, instance.pk,
+                  Change.CREATED if created else Change.UPDATED)
+
+
+@receiver(post_delete, sender=Post)
+def log_deleted_post(sender, instance, **kwargs):
+    record_change(Change.POST, instance.pk, Change.DELETED)
+
+
+@receiver(post_save, sender=Comment)
+def log_saved_comment(sender, instance, created, **kwargs):
+    record_change(Change.COMMENT, instance.pk,
+                  Change.CREATED if created else Change.UPDATED)
+    if created:
+        # У публикации изменился счетчик комментариев
+        record_change(Change.POST, instance.post_id, Change.UPDATED)
+
+
+@receiver(post_delete, sender=Comment)
+def log_deleted_comment(sender, instance, **kwargs):
+    record_change(Change.COMMENT, instance.pk, Change.DELETED)
+    record_change(Change.POST, instance.post_id, Change.UPDATED)
@@ -0,0 +1,106 @@
+"""Поиск подписок по имени автора через индекс.
+
+``LIKE '%q%'`` по соединению с таблицей пользователей не использует
+индекс. Здесь имена хранятся в нижнем регистре в ``UserSearchName``, и
+префикс ищется диапазоном ``name >= q AND name < q + U+10FFFF`` по
+индексу. При ``FOLLOW_SEARCH_TRIGRAMS = True`` поддерживается таблица
+триграмм ``UsernameTrigram``: кандидаты на совпадение по подстроке
+находятся по индексу триграмм и затем проверяются точно.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count
+
+from .models import UserSearchName, UsernameTrigram
+
+User = get_user_model()
+
+FOLLOW_SEARCH_TRIGRAMS = getattr(settings, 'FOLLOW_SEARCH_TRIGRAMS', False)
+# Наибольший символ Юникода: верхняя граница диапазона для префикса
+PREFIX_UPPER_BOUND = '\U0010ffff'
+BATCH_SIZE = 1000
+
+
+def normalize(username):
+    return username.lower()
+
+
+def trigrams(name):
+    return {name[index:index + 3] for index in range(len(name) - 2)}
+
+
+def _trigram_rows(user_id, name):
+    return [
+        UsernameTrigram(user_id=user_id, trigram=trigram)
+        for trigram in trigrams(name)
+    ]
+
+
+def index_user(user):
+    name = normalize(user.get_username())
+    with transaction.atomic():
+        UserSearchName.objects.update_or_create(
+            user_id=user.pk, defaults={'name': name}
+        )
+        if FOLLOW_SEARCH_TRIGRAMS:
+            UsernameTrigram.objects.filter(user_id=user.pk).delete()
+            UsernameTrigram.objects.bulk_create(
+                _trigram_rows(user.pk, name), ignore_conflicts=True
+            )
+
+
+def rebuild():
+    """Перестраивает индекс имен (и триграмм, если они включены)."""
+    names = [
+        UserSearchName(user_id=pk, name=normalize(username))
+        for pk, username in User.objects.values_list(
+            'pk', User.USERNAME_FIELD
+        )
+    ]
+    with transaction.atomic():
+        UserSearchName.objects.all().delete()
+        UserSearchName.objects.bulk_create(names, batch_size=BATCH_SIZE)
+        UsernameTrigram.objects.all().delete()
+        if FOLLOW_SEARCH_TRIGRAMS:
+            UsernameTrigram.objects.bulk_create(
+                [row for item in names
+                 for row in _trigram_rows(item.user_id, item.name)],
+                batch_size=BATCH_SIZE
+            )
+
+
+def prefix_user_ids(query):
+    name = normalize(query)
+    return UserSearchName.objects.filter(
+        name__gte=name, name__lt=name + PREFIX_UPPER_BOUND
+    ).values('user_id')
+
+
+def infix_user_ids(query):
+    name = normalize(query)
+    grams = trigrams(name)
+    candidates = (
+        UsernameTrigram.objects.filter(trigram__in=grams)
+        .values('user_id')
+        .annotate(matched=Count('trigram'))
+        .filter(matched=len(grams))
+        .values('user_id')
+    )
+    # Совпадение всех триграмм не гарантирует подстроку: проверяем точно
+    return UserSearchName.objects.filter(
+        user_id__in=candidates, name__contains=name
+    ).values('user_id')
+
+
+def search_follows(queryset, query, field='following_id'):
+    """Оставляет подписки на авторов, чье имя содержит ``query``.
+
+    Без таблицы триграмм (или для запросов короче трех символов) имя
+    должно начинаться с ``query``.
+    """
+    if FOLLOW_SEARCH_TRIGRAMS and len(query) >= 3:
+        user_ids = infix_user_ids(query)
+    else:
+        user_ids = prefix_user_ids(query)
+    return queryset.filter(**{f'{field}__in': user_ids})
@@ -7,10 +7,80 @@ For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 """
 
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
 
-from django.core.asgi import get_asgi_application
+import django
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connections
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube_api.settings')
 
-application = get_asgi_application()
+
+def _close_streaming(response):
+    try:
+        response.close()
+    finally:
+        # Поток служит одному ответу, его соединения больше не нужны
+        connections.close_all()
+
+
+class APIASGIHandler(ASGIHandler):
+    """Подключает маршруты с асинхронными обработчиками чтения.
+
+    ``ASGIHandler`` Django 3.2 перебирает ``StreamingHttpResponse`` прямо в
+    цикле событий, где ORM запрещен. Здесь порции потокового ответа
+    (``?stream=1``, NDJSON, файлы) читаются по одной в отдельном потоке и
+    отправляются с ``more_body``: следующая порция читается только после
+    отправки предыдущей, и память не зависит от размера ответа. Поток один
+    на весь ответ, потому что курсор выборки привязан к соединению потока.
+    """
+    urlconf = 'yatube_api.urls_asgi'
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = self.urlconf
+        return request, error_response
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        headers = [
+            (header.encode('ascii') if isinstance(header, str) else header,
+             value.encode('latin1') if isinstance(value, str) else value)
+            for header, value in response.items()
+        ]
+        headers += [
+            (b'Set-Cookie', cookie.output(header='').encode('ascii').strip())
+            for cookie in response.cookies.values()
+        ]
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': headers,
+        })
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1)
+        parts = iter(response)
+        try:
+            while True:
+                part = await loop.run_in_executor(executor, next, parts, None)
+                if part is None:
+                    break
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    })
+            await send({'type': 'http.response.body'})
+        finally:
+            await loop.run_in_executor(executor, _close_streaming, response)
+            executor.shutdown(wait=False)
+
+
+# Как get_asgi_application(), но со своим обработчиком
+django.setup(set_prefix=False)
+application = APIASGIHandler()
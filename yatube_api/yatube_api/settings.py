@@ -1,5 +1,7 @@
 """Django settings for yatube project."""
 
+import os
+import tempfile
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -29,6 +31,10 @@ INSTALLED_APPS = [
     'rest_framework.authtoken',
 ]
 
+# Под нагрузкой классы аутентификации можно заменить на версии с кэшем
+# пользователей (см. api/authentication.py):
+# 'api.authentication.CachedTokenAuthentication',
+# 'api.authentication.CachedJWTAuthentication'.
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication',
@@ -39,9 +45,77 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 10,
+    # Рендереры DRF с замером времени (см. api/instrumentation.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.TimedJSONRenderer',
+        'api.renderers.TimedBrowsableAPIRenderer',
+    ],
+    # Ведро токенов в кэше THROTTLE_CACHE_ALIAS, см. api/throttling.py
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.ReadRateThrottle',
+        'api.throttling.WriteRateThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'user_read': '1200/min',
+        'user_write': '120/min',
+        'anon_read': '600/min',
+        'anon_write': '30/min',
+    },
 }
 
+# Доля запросов с замерами производительности (заголовок Server-Timing и
+# строка JSON в логгере api.performance)
+PERFORMANCE_SAMPLE_RATE = 0.05
+
+# Метрики для Prometheus (GET /metrics): каждый процесс пишет значения в
+# свой файл в METRICS_DIR, обработчик суммирует файлы живых процессов.
+# Файлы завершившихся процессов удаляются автоматически
+METRICS_ENABLED = True
+METRICS_DIR = os.getenv(
+    'METRICS_DIR', os.path.join(tempfile.gettempdir(), 'yatube-metrics')
+)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.performance': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# Кэш пользователей в классах аутентификации (в каждом процессе)
+AUTH_CACHE_SIZE = 1024
+AUTH_CACHE_TTL = 60
+
+# Лента подписок: авторы с большим числом подписчиков раскладываются
+# по лентам при чтении, а не при публикации
+FEED_FANOUT_LIMIT = 1000
+FEED_BACKFILL_SIZE = 50
+
+# Максимум имен в одном запросе к /follow/batch/
+FOLLOW_BATCH_LIMIT = 100
+# Поиск подписок по подстроке имени через таблицу триграмм; без нее
+# ?search= в /follow/ ищет по началу имени. После включения выполните
+# python manage.py rebuild_username_index
+FOLLOW_SEARCH_TRIGRAMS = False
+
+# Публикаций в одном запросе к /comments/ и комментариев на публикацию
+COMMENT_BATCH_POSTS = 100
+COMMENT_BATCH_LIMIT = 20
+
+# Записей журнала изменений на странице /sync/ по умолчанию и максимум
+SYNC_PAGE_SIZE = 500
+SYNC_MAX_PAGE_SIZE = 5000
+
 MIDDLEWARE = [
+    'api.instrumentation.performance_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -49,6 +123,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.replica_pinning_middleware',
 ]
 
 ROOT_URLCONF = 'yatube_api.urls'
@@ -77,10 +152,83 @@ WSGI_APPLICATION = 'yatube_api.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('DATABASE_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# Реплики для чтения: псевдоним → вес. Для локальной проверки реплика —
+# копия файла основной базы: DATABASE_REPLICA_PATHS=/tmp/a.db,/tmp/b.db
+DATABASE_REPLICAS = {}
+for index, path in enumerate(
+        filter(None, os.environ.get('DATABASE_REPLICA_PATHS', '').split(','))):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': path,
+        # В тестах реплика — та же база, что и основная
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS[alias] = 1
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+# Сколько секунд после записи чтения пользователя идут в основную базу
+REPLICA_PIN_SECONDS = 5
+# Кэш закреплений по id пользователя; при нескольких воркерах должен быть
+# общим для них (см. API_CACHE_BACKEND ниже)
+REPLICA_PIN_CACHE_ALIAS = 'api'
+
+# Профиль базы данных: development (по умолчанию) или production.
+# PRAGMA из SQLITE_PRAGMAS выполняются при открытии соединения
+# (см. api/database.py)
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'development')
+SQLITE_PRAGMAS = {}
+# Повторы записи при блокировке базы другим процессом
+DATABASE_LOCK_RETRIES = 8
+DATABASE_LOCK_BACKOFF = 0.05
+
+if DATABASE_PROFILE == 'production':
+    DATABASES['default'].update({
+        # Соединение живет между запросами в пределах воркера
+        'CONN_MAX_AGE': 600,
+        # Сколько секунд ждать снятия блокировки (busy timeout)
+        'OPTIONS': {'timeout': 20},
+    })
+    SQLITE_PRAGMAS = {
+        # Читатели не блокируют писателя и наоборот
+        'journal_mode': 'WAL',
+        # В режиме WAL fsync только на контрольных точках
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        # Отрицательное значение — размер в КиБ
+        'cache_size': -64 * 1024,
+        'temp_store': 'MEMORY',
+    }
+
+
+# Cache
+
+# Кэш ответов API. Для нескольких процессов можно указать файловый кэш
+# (API_CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache,
+# API_CACHE_LOCATION=/var/tmp/yatube-cache) или общий memcached-бэкенд.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': os.environ.get(
+            'API_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('API_CACHE_LOCATION', 'yatube-api'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+API_CACHE_ALIAS = 'api'
+API_CACHE_TIMEOUT = 300
+# Ведра ограничения частоты запросов. Чтобы лимит был общим для всех
+# воркеров узла, кэш должен быть общим и с атомарным incr (memcached)
+THROTTLE_CACHE_ALIAS = 'api'
+
 
 # Password validation
 
@@ -118,3 +266,7 @@ STATIC_URL = '/static/'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# Уменьшенные копии изображений публикаций строятся в пуле процессов
+IMAGE_PROCESSING_ASYNC = True
+IMAGE_PROCESSING_WORKERS = 2
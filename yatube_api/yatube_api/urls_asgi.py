@@ -0,0 +1,10 @@
+from django.urls import include, path
+
+from yatube_api.urls import urlpatterns as sync_urlpatterns
+
+# Под ASGI чтения вьюсетов из DefaultRouter обрабатываются
+# асинхронно (api/async_views.py)
+urlpatterns = [
+    path('api/v1/', include('api.async_urls')),
+    *sync_urlpatterns,
+]